@@ -2,7 +2,20 @@
 高级字符串操作节点
 Advanced String Operation Nodes
 """
+import json
+import os
 import re
+from string import Formatter, Template
+
+from .aho_corasick import Automaton, get_automaton
+from .parallel import backend, regex_is_line_local, split_text
+from .pattern_cache import PatternCache, compile_regex
+from .progress import CHUNK_CHARS, progress_for, spans
+from .regex_guard import RegexTimeout, run_regex
+from .result_cache import memoize
+from .table_rows import TABLE_FORMATS, iter_rows
+from .template_engine import compile_template
+from .text_list import TEXT_LIST, TextList, file_signature, file_stream, resolve_path
 
 
 class StringRegexReplace:
@@ -16,6 +29,10 @@ class StringRegexReplace:
                 "正则表达式": ("STRING", {"default": ""}),
                 "替换为": ("STRING", {"default": ""}),
                 "标志": (["无", "忽略大小写", "多行", "匹配所有", "忽略大小写|多行"], {"default": "无"}),
+            },
+            "optional": {
+                # >0 runs the pattern in a worker process with this budget
+                "超时毫秒": ("INT", {"default": 0, "min": 0, "max": 600000}),
             }
         }
     
@@ -23,21 +40,57 @@ class StringRegexReplace:
     RETURN_NAMES = ("结果", "数量")
     FUNCTION = "regex_replace"
     CATEGORY = "HAIGC/Text/Advanced"
+    BATCH_INPUT = "文本"
     
-    def regex_replace(self, 文本, 正则表达式, 替换为, 标志):
-        flag_value = 0
-        if "忽略大小写" in 标志:
-            flag_value |= re.IGNORECASE
-        if "多行" in 标志:
-            flag_value |= re.MULTILINE
-        if "匹配所有" in 标志:
-            flag_value |= re.DOTALL
+    @memoize
+    def regex_replace(self, 文本, 正则表达式, 替换为, 标志, 超时毫秒=0):
+        flag_value = _regex_flags(标志)
         
         try:
-            result, count = re.subn(正则表达式, 替换为, 文本, flags=flag_value)
+            if 超时毫秒 > 0:
+                result, count = run_regex(正则表达式, flag_value, "subn", 替换为, 文本, timeout_ms=超时毫秒)
+                return (result, count)
+            regex = compile_regex(正则表达式, flag_value)
+            # Split large texts at newlines when no match can cross one
+            if backend.should_split(len(文本)) and regex_is_line_local(正则表达式, flag_value):
+                chunks = split_text(文本, backend.chunk_count(len(文本)))
+                parts = backend.map_chunks(_regex_subn_chunk, chunks, 正则表达式, flag_value, 替换为)
+                result = "".join(part for part, _ in parts)
+                count = sum(found for _, found in parts)
+            else:
+                result, count = regex.subn(替换为, 文本)
             return (result, count)
+        except RegexTimeout as e:
+            return (f"正则超时: {str(e)}", 0)
         except re.error as e:
             return (f"正则错误: {str(e)}", 0)
+    
+    def regex_replace_batch(self, 文本, 正则表达式, 替换为, 标志, 超时毫秒=0):
+        if 超时毫秒 > 0:
+            return None
+        try:
+            regex = compile_regex(正则表达式, _regex_flags(标志))
+            results = [regex.subn(替换为, text) for text in 文本]
+        except re.error:
+            # Let the scalar path report the error for each element
+            return None
+        return ([result for result, _ in results], [count for _, count in results])
+
+
+def _regex_flags(标志):
+    flag_value = 0
+    if "忽略大小写" in 标志:
+        flag_value |= re.IGNORECASE
+    if "多行" in 标志:
+        flag_value |= re.MULTILINE
+    if "匹配所有" in 标志:
+        flag_value |= re.DOTALL
+    return flag_value
+
+
+def _regex_subn_chunk(text, pattern, flags, replacement):
+    """Worker side of StringRegexReplace for one chunk of lines"""
+    return compile_regex(pattern, flags).subn(replacement, text)
 
 
 class StringRegexMatch:
@@ -51,6 +104,10 @@ class StringRegexMatch:
                 "正则表达式": ("STRING", {"default": ""}),
                 "模式": (["第一个", "所有", "捕获组"], {"default": "第一个"}),
                 "标志": (["无", "忽略大小写", "多行", "匹配所有"], {"default": "无"}),
+            },
+            "optional": {
+                # >0 runs the pattern in a worker process with this budget
+                "超时毫秒": ("INT", {"default": 0, "min": 0, "max": 600000}),
             }
         }
     
@@ -59,7 +116,8 @@ class StringRegexMatch:
     FUNCTION = "regex_match"
     CATEGORY = "HAIGC/Text/Advanced"
     
-    def regex_match(self, 文本, 正则表达式, 模式, 标志):
+    @memoize
+    def regex_match(self, 文本, 正则表达式, 模式, 标志, 超时毫秒=0):
         flag_value = 0
         if 标志 == "忽略大小写":
             flag_value = re.IGNORECASE
@@ -70,28 +128,30 @@ class StringRegexMatch:
         
         try:
             if 模式 == "第一个":
-                match = re.search(正则表达式, 文本, flags=flag_value)
+                match = run_regex(正则表达式, flag_value, "search", 文本, timeout_ms=超时毫秒)
                 if match:
-                    result = match.group(0)
+                    result = match[0]
                     return (result, 1, True)
                 else:
                     return ("", 0, False)
             
             elif 模式 == "所有":
-                matches = re.findall(正则表达式, 文本, flags=flag_value)
+                matches = run_regex(正则表达式, flag_value, "findall", 文本, timeout_ms=超时毫秒)
                 count = len(matches)
                 result = "\n".join(str(m) for m in matches)
                 return (result, count, count > 0)
             
             elif 模式 == "捕获组":
-                match = re.search(正则表达式, 文本, flags=flag_value)
+                match = run_regex(正则表达式, flag_value, "search", 文本, timeout_ms=超时毫秒)
                 if match:
-                    groups = match.groups()
+                    groups = match[1]
                     result = "\n".join(str(g) for g in groups)
                     return (result, len(groups), True)
                 else:
                     return ("", 0, False)
         
+        except RegexTimeout as e:
+            return (f"正则超时: {str(e)}", 0, False)
         except re.error as e:
             return (f"正则错误: {str(e)}", 0, False)
 
@@ -106,6 +166,10 @@ class StringRegexSplit:
                 "text": ("STRING", {"default": "", "multiline": True}),
                 "pattern": ("STRING", {"default": r"\s+"}),
                 "max_split": ("INT", {"default": 0, "min": 0, "max": 1000}),
+            },
+            "optional": {
+                # >0 runs the pattern in a worker process with this budget
+                "timeout_ms": ("INT", {"default": 0, "min": 0, "max": 600000}),
             }
         }
     
@@ -114,20 +178,35 @@ class StringRegexSplit:
     FUNCTION = "regex_split"
     CATEGORY = "HAIGC/Text/Advanced"
     
-    def regex_split(self, text, pattern, max_split):
+    @memoize
+    def regex_split(self, text, pattern, max_split, timeout_ms=0):
         try:
-            if max_split == 0:
-                parts = re.split(pattern, text)
-            else:
-                parts = re.split(pattern, text, maxsplit=max_split)
+            parts = run_regex(pattern, 0, "split", text, max_split, timeout_ms=timeout_ms)
             
             result = "\n".join(parts)
             count = len(parts)
             return (result, count)
+        except RegexTimeout as e:
+            return (f"Regex Timeout: {str(e)}", 0)
         except re.error as e:
             return (f"Regex Error: {str(e)}", 0)
 
 
+_format_fields_cache = PatternCache(max_size=256)
+
+
+def _has_named_fields(template):
+    """True if a format string refers to a field by name ({name}, {a.b}, {a[0]})"""
+    def scan():
+        for _, field, _, _ in Formatter().parse(template):
+            if field:
+                head = field.split(".", 1)[0].split("[", 1)[0]
+                if head and not head.isdigit():
+                    return True
+        return False
+    return _format_fields_cache.get(template, scan)
+
+
 class StringFormat:
     """格式化字符串 / Format string"""
     
@@ -150,29 +229,95 @@ class StringFormat:
     FUNCTION = "format_string"
     CATEGORY = "HAIGC/Text/Advanced"
     
+    @memoize
     def format_string(self, template, arg1="", arg2="", arg3="", arg4="", arg5=""):
         try:
-            # Try positional formatting first
             args = [arg for arg in [arg1, arg2, arg3, arg4, arg5] if arg]
-            try:
-                result = template.format(*args)
-            except (IndexError, KeyError):
-                # Try named formatting
-                kwargs = {}
-                for i, arg in enumerate(args, 1):
-                    kwargs[f"arg{i}"] = arg
-                    # Also try common names
-                    if i == 1:
-                        kwargs["name"] = arg
-                        kwargs["value"] = arg
-                        kwargs["text"] = arg
-                result = template.format(**kwargs)
+            # Pick positional or named formatting from the template's fields
+            # instead of formatting once, failing and formatting again
+            if not _has_named_fields(template):
+                try:
+                    return (template.format(*args),)
+                except KeyError:
+                    # A name inside a nested format spec; try named formatting
+                    pass
+            
+            kwargs = {}
+            for i, arg in enumerate(args, 1):
+                kwargs[f"arg{i}"] = arg
+                # Also try common names
+                if i == 1:
+                    kwargs["name"] = arg
+                    kwargs["value"] = arg
+                    kwargs["text"] = arg
+            result = template.format(**kwargs)
             
             return (result,)
         except Exception as e:
             return (f"Format Error: {str(e)}",)
 
 
+class _CompiledTemplate:
+    """Template parsed once into literal text and $placeholder slots
+    
+    Rendering fills the slots and joins, which matches
+    string.Template.safe_substitute (missing="keep") without rescanning the
+    template for every row.
+    """
+    
+    def __init__(self, source):
+        self.parts = []
+        self.fields = []
+        self.invalid = None
+        literal = []
+        pos = 0
+        for match in Template.pattern.finditer(source):
+            literal.append(source[pos:match.start()])
+            pos = match.end()
+            name = match.group("named") or match.group("braced")
+            if match.group("escaped") is not None:
+                literal.append("$")
+            elif name is not None:
+                self.parts.append("".join(literal))
+                literal = []
+                self.fields.append((len(self.parts), name, match.group(), match.start()))
+                self.parts.append(match.group())
+            else:
+                # A lone "$" is kept as text, as safe_substitute does
+                if self.invalid is None:
+                    self.invalid = match.start()
+                literal.append(match.group())
+        literal.append(source[pos:])
+        self.parts.append("".join(literal))
+    
+    def render(self, variables, missing="keep"):
+        """Fill the placeholders; missing names are kept, emptied or raise KeyError"""
+        if missing == "error" and self.invalid is not None:
+            # Report whichever problem comes first, as Template.substitute does
+            for _, name, _, start in self.fields:
+                if start > self.invalid:
+                    break
+                if variables.get(name) is None:
+                    raise KeyError(name)
+            raise ValueError(f"Invalid placeholder in template at position {self.invalid}")
+        parts = self.parts[:]
+        for slot, name, placeholder, _ in self.fields:
+            value = variables.get(name)
+            if value is None:
+                if missing == "error":
+                    raise KeyError(name)
+                value = placeholder if missing == "keep" else ""
+            parts[slot] = value
+        return "".join(parts)
+
+
+_template_cache = PatternCache(max_size=256)
+
+
+def _compile_template(source):
+    return _template_cache.get(source, lambda: _CompiledTemplate(source))
+
+
 class StringTemplate:
     """模板字符串 / Template string with variables"""
     
@@ -189,6 +334,7 @@ class StringTemplate:
     FUNCTION = "apply_template"
     CATEGORY = "HAIGC/Text/Advanced"
     
+    @memoize
     def apply_template(self, template, variables):
         try:
             # Parse variables (format: key=value, one per line)
@@ -199,15 +345,67 @@ class StringTemplate:
                     var_dict[key.strip()] = value.strip()
             
             # Replace variables in template
-            from string import Template
-            t = Template(template)
-            result = t.safe_substitute(var_dict)
+            result = _compile_template(template).render(var_dict)
             
             return (result,)
         except Exception as e:
             return (f"Template Error: {str(e)}",)
 
 
+def _parse_variables(variables):
+    """Parse template variables: a JSON object (nested values kept for loops
+    and attribute access), or one key=value pair per line"""
+    stripped = variables.strip()
+    if stripped.startswith("{"):
+        context = json.loads(stripped)
+        if not isinstance(context, dict):
+            raise ValueError("variables JSON must be an object")
+        return context
+    
+    context = {}
+    for line in variables.splitlines():
+        if '=' in line:
+            key, value = line.split('=', 1)
+            context[key.strip()] = value.strip()
+    return context
+
+
+class StringTemplateRender:
+    """模板引擎渲染 / Render a template with conditionals, loops and filters
+    
+    {{ name }} and {{ user.name | upper }} output values, {% if %} / {% elif %}
+    / {% else %} / {% endif %}, {% for x in items %} / {% endfor %} and
+    {% set x = ... %} control the output, and {{- / -}} strip whitespace.
+    Templates are compiled to Python functions once and cached by source.
+    In strict mode rendering an undefined variable is an error.
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "template": ("STRING", {
+                    "default": "a photo of {{ subject }}{% if style %}, {{ style | lower }} style{% endif %}",
+                    "multiline": True,
+                }),
+                # JSON object, or key=value per line
+                "variables": ("STRING", {"default": "subject=a red fox\nstyle=Watercolor", "multiline": True}),
+                "strict": ("BOOLEAN", {"default": False}),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING",)
+    FUNCTION = "render"
+    CATEGORY = "HAIGC/Text/Advanced"
+    
+    @memoize
+    def render(self, template, variables, strict):
+        try:
+            return (compile_template(template, strict).render(_parse_variables(variables)),)
+        except Exception as e:
+            return (f"Template Error: {str(e)}",)
+
+
 class StringJoin:
     """连接字符串列表 / Join string list"""
     
@@ -226,6 +424,7 @@ class StringJoin:
     FUNCTION = "join_strings"
     CATEGORY = "HAIGC/Text/Advanced"
     
+    @memoize
     def join_strings(self, text, separator, prefix, suffix):
         lines = text.strip().split('\n')
         lines = [line.strip() for line in lines if line.strip()]
@@ -239,6 +438,23 @@ class StringJoin:
         return (result,)
 
 
+def pad_text(text, width, mode, fill_char):
+    """填充到指定宽度 / Pad text to width; the mode names the side the text stays on"""
+    if not fill_char:
+        fill_char = " "
+    else:
+        fill_char = fill_char[0]
+    
+    if mode == "left":
+        result = text.ljust(width, fill_char)
+    elif mode == "right":
+        result = text.rjust(width, fill_char)
+    elif mode == "center":
+        result = text.center(width, fill_char)
+    
+    return result
+
+
 class StringPad:
     """填充字符串 / Pad string"""
     
@@ -257,20 +473,9 @@ class StringPad:
     FUNCTION = "pad_string"
     CATEGORY = "HAIGC/Text/Advanced"
     
+    @memoize
     def pad_string(self, text, width, mode, fill_char):
-        if not fill_char:
-            fill_char = " "
-        else:
-            fill_char = fill_char[0]
-        
-        if mode == "left":
-            result = text.ljust(width, fill_char)
-        elif mode == "right":
-            result = text.rjust(width, fill_char)
-        elif mode == "center":
-            result = text.center(width, fill_char)
-        
-        return (result,)
+        return (pad_text(text, width, mode, fill_char),)
 
 
 class StringRemoveChars:
@@ -289,7 +494,9 @@ class StringRemoveChars:
     RETURN_TYPES = ("STRING",)
     FUNCTION = "remove_chars"
     CATEGORY = "HAIGC/Text/Advanced"
+    BATCH_INPUT = "text"
     
+    @memoize
     def remove_chars(self, text, chars_to_remove, mode):
         if mode == "all":
             result = text
@@ -303,6 +510,13 @@ class StringRemoveChars:
             result = text.strip(chars_to_remove)
         
         return (result,)
+    
+    def remove_chars_batch(self, text, chars_to_remove, mode):
+        if mode != "all":
+            return None
+        for char in chars_to_remove:
+            text = [line.replace(char, "") for line in text]
+        return (text,)
 
 
 class StringExtract:
@@ -327,6 +541,7 @@ class StringExtract:
     FUNCTION = "extract"
     CATEGORY = "HAIGC/Text/Advanced"
     
+    @memoize
     def extract(self, text, mode, start_marker, end_marker, line_start=1, line_end=1):
         if mode == "between":
             if start_marker in text and end_marker in text:
@@ -374,6 +589,7 @@ class StringCount:
     FUNCTION = "count_occurrences"
     CATEGORY = "HAIGC/Text/Advanced"
     
+    @memoize
     def count_occurrences(self, text, search, case_sensitive, overlap):
         if not search:
             return (0, "Search string is empty")
@@ -382,17 +598,214 @@ class StringCount:
             text = text.lower()
             search = search.lower()
         
-        if overlap:
+        if overlap and len(search) > 1:
+            # first char + lookahead for the rest: every overlapping
+            # occurrence is one match, found by re's literal-prefix scan
+            regex = compile_regex(re.escape(search[0]) + "(?=" + re.escape(search[1:]) + ")")
             count = 0
-            start = 0
-            while True:
-                pos = text.find(search, start)
-                if pos == -1:
-                    break
-                count += 1
-                start = pos + 1
+            # A span counts the occurrences that start in it
+            for start, end in spans(len(text), progress_for(len(text), CHUNK_CHARS)):
+                count += len(regex.findall(text, start, min(end + len(search) - 1, len(text))))
         else:
             count = text.count(search)
         
         info = f"Found '{search}' {count} times"
         return (count, info)
+
+
+class StringMultiSearch:
+    """多词搜索 / Search for many terms in one pass
+    
+    Terms (one per line) are compiled into an Aho-Corasick automaton that is
+    cached per term list, so the text is scanned once however long the list
+    is. With overlap off, each term is counted like StringCount does
+    (non-overlapping, left to right).
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"default": "", "multiline": True}),
+                "terms": ("STRING", {"default": "", "multiline": True}),
+                "case_sensitive": ("BOOLEAN", {"default": True}),
+                "overlap": ("BOOLEAN", {"default": True}),
+            }
+        }
+    
+    RETURN_TYPES = ("BOOLEAN", "STRING", "INT", "STRING")
+    RETURN_NAMES = ("found", "matched_terms", "total", "details")
+    FUNCTION = "search_terms"
+    CATEGORY = "HAIGC/Text/Advanced"
+    
+    @memoize
+    def search_terms(self, text, terms, case_sensitive, overlap):
+        automaton = get_automaton(terms.splitlines(), case_sensitive)
+        if not case_sensitive:
+            text = text.lower()
+        
+        positions = [[] for _ in automaton.terms]
+        if overlap:
+            for start, index in automaton.iter_matches(text):
+                positions[index].append(start)
+        else:
+            lengths = [len(term) for term in automaton.terms]
+            next_free = [0] * len(automaton.terms)
+            for start, index in automaton.iter_matches(text):
+                if start >= next_free[index]:
+                    positions[index].append(start)
+                    next_free[index] = start + lengths[index]
+        
+        details = {
+            term: {"count": len(found), "positions": found}
+            for term, found in zip(automaton.terms, positions) if found
+        }
+        total = sum(item["count"] for item in details.values())
+        matched = "\n".join(details)
+        return (bool(details), matched, total, json.dumps(details, ensure_ascii=False))
+
+
+def _parse_mapping(mapping):
+    """Parse a replacement table: a JSON object, or one old=new pair per line"""
+    stripped = mapping.strip()
+    if stripped.startswith("{"):
+        table = json.loads(stripped)
+        if not isinstance(table, dict):
+            raise ValueError("mapping JSON must be an object")
+        return {str(key): str(value) for key, value in table.items()}
+    
+    table = {}
+    for line in mapping.splitlines():
+        if '=' in line:
+            key, value = line.split('=', 1)
+            table[key.strip()] = value.strip()
+    return table
+
+
+def _build_replacer(mapping):
+    table = _parse_mapping(mapping)
+    automaton = Automaton(table)
+    return automaton, [table[term] for term in automaton.terms]
+
+
+_replacer_cache = PatternCache(max_size=64)
+
+
+class StringBulkReplace:
+    """批量替换 / Apply a whole replacement table in one pass
+    
+    The table is one old=new pair per line (keys and values are stripped,
+    as in StringTemplate) or a JSON object for exact whitespace. All keys
+    are matched in a single left-to-right scan; where several keys start
+    at the same position the longest one wins, and replaced text is never
+    matched again.
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"default": "", "multiline": True}),
+                "mapping": ("STRING", {"default": "old=new", "multiline": True}),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING", "INT")
+    RETURN_NAMES = ("result", "count")
+    FUNCTION = "bulk_replace"
+    CATEGORY = "HAIGC/Text/Advanced"
+    
+    @memoize
+    def bulk_replace(self, text, mapping):
+        try:
+            automaton, replacements = _replacer_cache.get(mapping, lambda: _build_replacer(mapping))
+        except ValueError as e:
+            return (f"Mapping Error: {str(e)}", 0)
+        
+        parts = []
+        position = 0
+        count = 0
+        for start, index in automaton.iter_leftmost_longest(text):
+            parts.append(text[position:start])
+            parts.append(replacements[index])
+            position = start + len(automaton.terms[index])
+            count += 1
+        
+        if not count:
+            return (text, 0)
+        parts.append(text[position:])
+        return ("".join(parts), count)
+
+
+class StringTemplateBatch:
+    """批量模板渲染 / Render a template once per row of a CSV/TSV/JSONL table
+    
+    The template is compiled once and cached by its source. Rows are
+    streamed from the table text or from table_file, one at a time. With
+    output_file the rendered lines are written as they are produced and
+    passed on as a lazy TEXT_LIST over the file, so 100k-row tables never
+    sit in memory; otherwise they come back as a TEXT_LIST and joined text.
+    With syntax "engine" the template uses the StringTemplateRender syntax
+    ({{ column }}, {% if %}, filters) instead of $column.
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "template": ("STRING", {"default": "a $color $animal", "multiline": True}),
+                "table": ("STRING", {"default": "color,animal\nred,fox\nblue,whale", "multiline": True}),
+                "table_format": (TABLE_FORMATS, {"default": "csv"}),
+                # What a $name without a column becomes
+                "missing": (["keep", "empty", "error"], {"default": "keep"}),
+            },
+            "optional": {
+                # Read rows from this file instead of the table text
+                "table_file": ("STRING", {"default": ""}),
+                # Write rendered lines to this file instead of returning them
+                "output_file": ("STRING", {"default": ""}),
+                # $name placeholders, or the StringTemplateRender engine
+                "syntax": (["dollar", "engine"], {"default": "dollar"}),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING", TEXT_LIST, "INT", "STRING")
+    RETURN_NAMES = ("result", "text_list", "count", "path")
+    FUNCTION = "render_rows"
+    CATEGORY = "HAIGC/Text/Advanced"
+    
+    @classmethod
+    def IS_CHANGED(cls, table_file=None, **kwargs):
+        return file_signature(table_file)
+    
+    @memoize(skip=lambda args: bool(args["table_file"] or args["output_file"]))
+    def render_rows(self, template, table, table_format, missing, table_file="", output_file="",
+                    syntax="dollar"):
+        try:
+            rows = iter_rows(table, resolve_path(table_file) if table_file else "", table_format)
+            if syntax == "engine":
+                # The engine renders undefined names as "", so keep == empty
+                render = compile_template(template, strict=missing == "error").render
+                rendered = (render(row) for row in rows)
+            else:
+                render = _compile_template(template).render
+                rendered = (render(row, missing) for row in rows)
+            
+            if not output_file:
+                lines = TextList(rendered)
+                return ("\n".join(lines), lines, len(lines), "")
+            
+            path = resolve_path(output_file, output=True)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            count = 0
+            with open(path, "w", encoding="utf-8", newline="\n", buffering=1024 * 1024) as f:
+                write = f.write
+                for line in rendered:
+                    write(line)
+                    write("\n")
+                    count += 1
+            return ("", file_stream(path), count, path)
+        except Exception as e:
+            return (f"Template Error: {str(e)}", TextList(), 0, "")
@@ -0,0 +1,140 @@
+"""
+多模式匹配
+Aho-Corasick automaton for matching many terms in one pass
+"""
+import hashlib
+from collections import deque
+
+from .pattern_cache import PatternCache
+
+
+class Automaton:
+    """AC自动机 / Aho-Corasick automaton over a list of terms
+
+    Empty and duplicate terms are dropped; self.terms keeps the remaining
+    terms in their original order and match results refer to them by index.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(term for term in terms if term))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._depth = [0]
+
+        for index, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._depth.append(self._depth[state] + 1)
+                state = nxt
+            self._out[state] = (index,)
+
+        # Breadth-first fail links; outputs are merged along them so every
+        # state lists all terms ending there
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = fail
+                self._out[nxt] = self._out[nxt] + self._out[fail]
+
+        self._lengths = [len(term) for term in self.terms]
+
+    def iter_matches(self, text):
+        """Yield (start, term_index) for every occurrence, overlapping included"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        lengths = self._lengths
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    yield pos - lengths[index] + 1, index
+
+    def iter_leftmost_longest(self, text):
+        """Yield non-overlapping (start, term_index) matches, leftmost first
+
+        At each position the longest term starting there wins, the same
+        priority a regex alternation sorted longest-first would give.
+        Matches are emitted as soon as their start is settled: a later match
+        can only start within the depth of the current state, so at most one
+        candidate per position of the longest term is ever pending.
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        depth = self._depth
+        lengths = self._lengths
+        pending = {}
+        first = None
+        next_free = 0
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            
+            settled = pos + 1 - depth[state]
+            if first is not None and first < settled:
+                for start in sorted(pending):
+                    if start >= settled:
+                        break
+                    index = pending.pop(start)
+                    if start >= next_free:
+                        yield start, index
+                        next_free = start + lengths[index]
+                first = min(pending) if pending else None
+            
+            for index in out[state]:
+                start = pos - lengths[index] + 1
+                if start >= next_free:
+                    best = pending.get(start)
+                    if best is None or lengths[index] > lengths[best]:
+                        pending[start] = index
+                        if first is None or start < first:
+                            first = start
+        
+        for start in sorted(pending):
+            if start >= next_free:
+                index = pending[start]
+                yield start, index
+                next_free = start + lengths[index]
+
+
+_automaton_cache = PatternCache(max_size=64)
+
+
+def get_automaton(terms, case_sensitive=True):
+    """获取(缓存的)自动机 / Build or fetch the automaton for a term list
+
+    The cache key is a digest of the term list, so large lists are not kept
+    twice. Without case sensitivity terms are lowercased; match the
+    automaton against text.lower() in that case.
+    """
+    if not case_sensitive:
+        terms = [term.lower() for term in terms]
+    h = hashlib.blake2b(digest_size=16)
+    for term in terms:
+        h.update(term.encode("utf-8", "surrogatepass"))
+        h.update(b"\x00")
+    return _automaton_cache.get(h.digest(), lambda: Automaton(terms))
+
+
+def automaton_cache_info():
+    return _automaton_cache.info()
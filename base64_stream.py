@@ -0,0 +1,141 @@
+"""
+分块Base64
+Chunked Base64 encode/decode over strings and files
+"""
+import binascii
+import codecs
+
+BASE64_VARIANTS = ["standard", "urlsafe", "mime"]
+
+# Multiple of 3 (whole base64 quanta) and of 57 (one 76-char MIME line)
+CHUNK_SIZE = 3 * 57 * 4096
+
+_URLSAFE_ENCODE = bytes.maketrans(b"+/", b"-_")
+_URLSAFE_DECODE = bytes.maketrans(b"-_", b"+/")
+_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+# Everything outside the alphabet is discarded on decode, as b64decode does
+_NON_ALPHABET = bytes(b for b in range(256) if b not in _ALPHABET)
+
+
+def iter_text_chunks(text, encoding):
+    """Encode a string slice by slice instead of all at once"""
+    for start in range(0, len(text), CHUNK_SIZE):
+        yield text[start:start + CHUNK_SIZE].encode(encoding)
+
+
+def iter_file_chunks(path):
+    """Read a file into one reused buffer, yielding memoryview slices of it
+
+    Each view is only valid until the next one is requested.
+    """
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                return
+            # readinto may return short reads before EOF; top the chunk up so
+            # every chunk but the last stays aligned
+            while size < CHUNK_SIZE:
+                more = f.readinto(view[size:])
+                if not more:
+                    break
+                size += more
+            yield view[:size]
+
+
+def encode_chunks(chunks, variant="standard"):
+    """编码 / Yield base64 output (bytes) for a stream of byte chunks"""
+    pending = bytearray()
+    for chunk in chunks:
+        if pending or len(chunk) % CHUNK_SIZE:
+            pending += chunk
+            aligned = len(pending) - len(pending) % CHUNK_SIZE
+            if aligned:
+                with memoryview(pending) as view:
+                    yield _encode_block(view[:aligned], variant)
+                del pending[:aligned]
+        else:
+            yield _encode_block(chunk, variant)
+    if pending:
+        yield _encode_block(pending, variant)
+
+
+def decode_chunks(chunks, variant="standard"):
+    """解码 / Yield raw bytes for a stream of base64 (bytes) chunks
+
+    The result is the same as b64decode of the joined chunks: input ends at
+    the first padding that completes a quantum, wherever the chunks split.
+    """
+    # Only data characters are kept, so len(pending) % 4 is the quantum position
+    pending = bytearray()
+    pads = 0
+    for chunk in chunks:
+        if variant == "urlsafe":
+            chunk = bytes(chunk).translate(_URLSAFE_DECODE)
+        data = bytes(chunk).translate(None, _NON_ALPHABET)
+        if b"=" in data:
+            data, pads, ended = _cut_at_padding(data, len(pending) % 4, pads)
+            if ended:
+                pending += data
+                yield binascii.a2b_base64(pending)
+                return
+        elif data:
+            pads = 0
+        pending += data
+        aligned = len(pending) - len(pending) % 4
+        if aligned:
+            with memoryview(pending) as view:
+                yield binascii.a2b_base64(view[:aligned])
+            del pending[:aligned]
+    if pending:
+        yield binascii.a2b_base64(pending)
+
+
+def _cut_at_padding(data, quad_pos, pads):
+    """Apply binascii.a2b_base64's padding rules to one chunk of input
+
+    quad_pos is the number of data characters before data, modulo 4, and
+    pads the run of "=" carried over from the previous chunk. Returns
+    (data, pads, ended). A run of "=" completing a quantum of two or three
+    data characters ends the input: data then stops with that quantum,
+    padded, and the rest is ignored. Every other "=" is dropped.
+    """
+    kept = []
+    start = 0
+    while True:
+        pad = data.find(b"=", start)
+        if pad == -1:
+            kept.append(data[start:])
+            if start < len(data):
+                pads = 0
+            return b"".join(kept), pads, False
+        if pad > start:
+            kept.append(data[start:pad])
+            quad_pos = (quad_pos + pad - start) % 4
+            pads = 0
+        if quad_pos >= 2:
+            pads += 1
+            if quad_pos + pads >= 4:
+                kept.append(b"=" * (4 - quad_pos))
+                return b"".join(kept), pads, True
+        start = pad + 1
+
+
+def decode_text(chunks, encoding):
+    """Decode byte chunks to one string, handling characters split across chunks"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts = [decoder.decode(chunk) for chunk in chunks]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _encode_block(data, variant):
+    if variant == "mime":
+        # 76-character lines, each ending in a newline, like base64.encodebytes
+        return b"".join(binascii.b2a_base64(data[i:i + 57]) for i in range(0, len(data), 57))
+    encoded = binascii.b2a_base64(data, newline=False)
+    if variant == "urlsafe":
+        return encoded.translate(_URLSAFE_ENCODE)
+    return encoded
@@ -0,0 +1,87 @@
+"""
+批量执行
+List/batch twins of the nodes for ComfyUI's list execution
+
+A plain node runs once per element when ComfyUI maps a list over it, and
+every one of those runs repeats the node's setup: parsing its options,
+looking up the compiled pattern, building the result tuple. batch_variant
+builds a twin class marked INPUT_IS_LIST / OUTPUT_IS_LIST that takes the
+whole lists in one call instead. The scalar node is left untouched, so
+existing graphs connect exactly as before.
+
+Shorter lists are broadcast by repeating their last element, the rule
+ComfyUI itself uses, so the twin returns what the scalar node would for
+each element. A node can set BATCH_INPUT to its main text input and define
+<FUNCTION>_batch(texts, **params): when only that input varies, the kernel
+gets the list and the remaining inputs as scalars, does the setup once and
+runs the per-element work in one tight loop. It returns one list per
+output, or None to fall back to calling the scalar method per element.
+"""
+
+
+def _rows(inputs, size):
+    """Per-element keyword arguments, broadcasting shorter lists"""
+    constants = {name: column[0] for name, column in inputs.items() if len(column) == 1}
+    varying = [name for name, column in inputs.items() if len(column) > 1]
+    if not varying:
+        yield constants
+        return
+    for i in range(size):
+        row = dict(constants)
+        for name in varying:
+            column = inputs[name]
+            row[name] = column[i] if i < len(column) else column[-1]
+        yield row
+
+
+def batch_variant(cls):
+    """批量节点 / A twin of a node class that takes and returns lists"""
+    scalar_name = cls.FUNCTION
+    output_count = len(cls.RETURN_TYPES)
+    batch_input = getattr(cls, "BATCH_INPUT", None)
+    kernel_name = f"{scalar_name}_batch"
+
+    def run_batch(self, **inputs):
+        if not inputs:
+            return tuple([value] for value in getattr(self, scalar_name)())
+        if min(len(column) for column in inputs.values()) == 0:
+            return tuple([] for _ in range(output_count))
+        size = max(len(column) for column in inputs.values())
+
+        if batch_input in inputs and all(
+                len(column) == 1 for name, column in inputs.items() if name != batch_input):
+            params = {name: column[0] for name, column in inputs.items() if name != batch_input}
+            outputs = getattr(self, kernel_name)(list(inputs[batch_input]), **params)
+            if outputs is not None:
+                return outputs
+
+        func = getattr(self, scalar_name)
+        results = [func(**row) for row in _rows(inputs, size)]
+        return tuple(list(values) for values in zip(*results))
+
+    attrs = {
+        "__doc__": f"{cls.__doc__.splitlines()[0]} (batch)",
+        "__module__": cls.__module__,
+        "__qualname__": f"{cls.__qualname__}Batch",
+        "FUNCTION": "run_batch",
+        "CATEGORY": f"{cls.CATEGORY}/Batch",
+        "INPUT_IS_LIST": True,
+        "OUTPUT_IS_LIST": (True,) * output_count,
+        "run_batch": run_batch,
+    }
+    if batch_input is None or not hasattr(cls, kernel_name):
+        # Kernels are optional; without one the loop below runs alone
+        attrs[kernel_name] = lambda self, texts, **params: None
+
+    if hasattr(cls, "IS_CHANGED"):
+        scalar_changed = cls.IS_CHANGED
+
+        def is_changed(batch_cls, **inputs):
+            if not inputs or min(len(column) for column in inputs.values()) == 0:
+                return ()
+            size = max(len(column) for column in inputs.values())
+            return tuple(scalar_changed(**row) for row in _rows(inputs, size))
+
+        attrs["IS_CHANGED"] = classmethod(is_changed)
+
+    return type(f"{cls.__name__}Batch", (cls,), attrs)
@@ -0,0 +1,433 @@
+"""
+节点性能基准
+Benchmark every registered node over synthetic corpora
+
+Run from anywhere; the pack is loaded from the directory above this file:
+
+    python benchmarks/bench_nodes.py run --sizes 1KB,1MB,16MB --output base.json
+    python benchmarks/bench_nodes.py run --sizes full --corpus cjk --nodes TextSort
+    python benchmarks/bench_nodes.py compare base.json new.json --threshold 0.10
+
+Each node is called through its FUNCTION method with the INPUT_TYPES
+defaults, the corpus on its main text input (one line per element for
+the _Batch twins), and the overrides in
+WORKLOADS so that search/replace style nodes have real work to do,
+clamped to the node's min/max. Corpora are written to a temp file in
+blocks and only read into a string when a node needs it as text. Wall
+time is the best of --repeat runs; peak memory is measured in a separate
+run under tracemalloc. compare exits with status 1 if any result regressed.
+"""
+import argparse
+import base64
+import gc
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported under its directory name, as ComfyUI does: spawned pool workers
+# re-import the pack by that name
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+SIZE_PRESETS = {
+    "default": "1KB,64KB,1MB,16MB",
+    "full": "1KB,64KB,1MB,16MB,256MB,1GB",
+}
+CORPUS_KINDS = ["ascii", "cjk"]
+
+# Corpora larger than this repeat a base block of unique lines
+_BASE_BLOCK_BYTES = 4 * 1024 * 1024
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def _vocabulary(rng, count=400):
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "qu", "th", "an", "er", "is", "on"]
+    words = {"the", "and", "prompt", "image", "style", "color", "light", "detail"}
+    while len(words) < count:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+
+class Corpus:
+    """合成语料 / A synthetic text corpus of a given kind and UTF-8 size
+
+    The corpus is generated straight into a temp file; text reads it back
+    on first use.
+    """
+
+    def __init__(self, kind, size, seed=0):
+        self.kind = kind
+        self.size = size
+        rng = random.Random(f"{kind}:{seed}")
+        self.words = _vocabulary(rng)
+        fd, self.path = tempfile.mkstemp(prefix=f"haigc_bench_{kind}_", suffix=".txt")
+        with os.fdopen(fd, "wb") as f:
+            self.size_bytes = self._generate(rng, f)
+        self._text = None
+
+    def _line(self, rng):
+        words = self.words
+        if self.kind == "cjk":
+            parts = []
+            for _ in range(rng.randint(4, 12)):
+                if rng.random() < 0.15:
+                    parts.append(f" {rng.choice(words)} ")
+                else:
+                    parts.append("".join(chr(rng.randint(0x4E00, 0x6FFF)) for _ in range(rng.randint(1, 4))))
+            parts.append(rng.choice("，。！？"))
+            line = "".join(parts)
+        else:
+            line = " ".join(rng.choice(words) for _ in range(rng.randint(4, 16)))
+        if rng.random() < 0.3:
+            line += f" {rng.randint(0, 100000)}"
+        return line
+
+    def _generate(self, rng, f):
+        """Write the base block repeatedly, cut back to the target size on a
+        line boundary; returns the number of bytes written"""
+        block = []
+        block_bytes = 0
+        while block_bytes < min(self.size, _BASE_BLOCK_BYTES):
+            line = self._line(rng)
+            block.append(line)
+            block_bytes += len(line.encode("utf-8")) + 1
+        block = ("\n".join(block) + "\n").encode("utf-8")
+
+        # The corpus is the start of block repeated, ending before the last
+        # newline within the target size (without repeats, within the block)
+        limit = self.size if self.size > len(block) else min(self.size, len(block) - 1)
+        full, rest = divmod(limit, len(block))
+        cut = block.rfind(b"\n", 0, rest)
+        if cut > 0 or (full and cut == 0):
+            end = full * len(block) + cut
+        elif full:
+            end = full * len(block) - 1
+        else:
+            # A single partial line
+            tail = block[:limit].decode("utf-8", "ignore").encode("utf-8")
+            f.write(tail)
+            return len(tail)
+
+        for _ in range(end // len(block)):
+            f.write(block)
+        f.write(block[:end % len(block)])
+        return end
+
+    @property
+    def text(self):
+        if self._text is None:
+            with open(self.path, encoding="utf-8", newline="") as f:
+                self._text = f.read()
+        return self._text
+
+    def cleanup(self):
+        self._text = None
+        # TextFileSink writes next to the corpus file
+        for path in (self.path, self.path + ".out"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _terms(corpus, count=50):
+    return "\n".join(corpus.words[:count])
+
+
+# Inputs that give a node real work; anything not listed uses its default
+WORKLOADS = {
+    "HAIGC_StringSplit": lambda c: {"分隔符": " "},
+    "HAIGC_StringReplace": lambda c: {"旧文本": "the", "新文本": "THE"},
+    "HAIGC_StringRepeat": lambda c: {"次数": 2},
+    "HAIGC_StringContains": lambda c: {"搜索": "not-in-corpus"},
+    "HAIGC_StringRegexReplace": lambda c: {"正则表达式": r"\d+", "替换为": "#"},
+    "HAIGC_StringRegexMatch": lambda c: {"正则表达式": r"\b\w{6,}\b", "模式": "所有"},
+    "HAIGC_StringRemoveChars": lambda c: {"chars_to_remove": "aeiou"},
+    "HAIGC_StringExtract": lambda c: {"start_marker": "the", "end_marker": "and"},
+    "HAIGC_StringCount": lambda c: {"search": "the"},
+    "HAIGC_StringMultiSearch": lambda c: {"terms": _terms(c)},
+    "HAIGC_StringBulkReplace": lambda c: {"mapping": "\n".join(f"{w}={w.upper()}" for w in c.words[:50])},
+    "HAIGC_StringTemplateBatch": lambda c: {"template": "a $line, ${line}!", "table": "line\n" + c.text},
+    "HAIGC_StringTemplateRender": lambda c: {
+        "template": "{% for line in lines %}{{ loop.index }}. {{ line | trim | capitalize }}\n{% endfor %}",
+        "variables": json.dumps({"lines": c.text.splitlines()}),
+    },
+    "HAIGC_TextFilter": lambda c: {"filter_value": "the"},
+    "HAIGC_TextMap": lambda c: {"value": "> "},
+    "HAIGC_TextSample": lambda c: {"k": 100},
+    "HAIGC_TextDecodeBase64": lambda c: {"text": base64.b64encode(c.text.encode("utf-8")).decode("ascii")},
+    "HAIGC_TextRandomString": lambda c: {"count": max(1, c.size_bytes // 11)},
+    "HAIGC_TextFileSource": lambda c: {"path": c.path},
+    "HAIGC_TextFileSink": lambda c: {"path": c.path + ".out"},
+}
+
+
+# Workloads sized to the whole corpus; repeated for every line of a batch
+# twin they would grow quadratically, so the twins run on the defaults
+_WHOLE_CORPUS_WORKLOADS = {"HAIGC_StringTemplateBatch", "HAIGC_StringTemplateRender", "HAIGC_TextRandomString"}
+
+
+def load_package():
+    """Import the pack from PACKAGE_DIR under PACKAGE_NAME, with caching off"""
+    if os.path.dirname(PACKAGE_DIR) not in sys.path:
+        sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+    package = importlib.import_module(PACKAGE_NAME)
+    sys.modules[f"{PACKAGE_NAME}.result_cache"].configure_result_cache(0)
+    return package
+
+
+def default_inputs(node_cls):
+    """INPUT_TYPES defaults; combo inputs take their first option, links are left out"""
+    inputs = {}
+    types = node_cls.INPUT_TYPES()
+    for section in ("required", "optional"):
+        for name, spec in types.get(section, {}).items():
+            kind = spec[0]
+            options = spec[1] if len(spec) > 1 else {}
+            if isinstance(kind, (list, tuple)):
+                inputs[name] = options.get("default", kind[0] if kind else "")
+            elif "default" in options:
+                inputs[name] = options["default"]
+            elif section == "required":
+                inputs[name] = {"INT": 0, "FLOAT": 0.0, "BOOLEAN": False, "STRING": ""}.get(kind)
+    return inputs
+
+
+def clamp_inputs(node_cls, inputs):
+    """Clamp INT and FLOAT inputs to the min/max of their INPUT_TYPES spec"""
+    types = node_cls.INPUT_TYPES()
+    for section in ("required", "optional"):
+        for name, spec in types.get(section, {}).items():
+            if name in inputs and spec[0] in ("INT", "FLOAT") and len(spec) > 1:
+                value = inputs[name]
+                if "min" in spec[1]:
+                    value = max(value, spec[1]["min"])
+                if "max" in spec[1]:
+                    value = min(value, spec[1]["max"])
+                inputs[name] = value
+    return inputs
+
+
+def text_input(node_cls):
+    """The input the corpus goes to: the first multiline STRING, else the first STRING"""
+    strings = [
+        (name, spec) for section in ("required", "optional")
+        for name, spec in node_cls.INPUT_TYPES().get(section, {}).items()
+        if spec[0] == "STRING"
+    ]
+    for name, spec in strings:
+        if len(spec) > 1 and spec[1].get("multiline"):
+            return name
+    return strings[0][0] if strings else None
+
+
+def _drain(outputs):
+    """Consume lazy TEXT_LIST streams so their work is included in the timing"""
+    for value in outputs:
+        if not isinstance(value, (str, bytes, tuple, list)) and hasattr(value, "__iter__"):
+            for _ in value:
+                pass
+
+
+def _call(func, kwargs):
+    _drain(func(**kwargs))
+
+
+def bench_node(node_id, node_cls, corpus, repeat=3, memory=True):
+    """Measure one node on one corpus; returns a result dict"""
+    result = {"node": node_id, "corpus": corpus.kind, "size_bytes": corpus.size_bytes}
+    try:
+        kwargs = default_inputs(node_cls)
+        name = text_input(node_cls)
+        if name is not None:
+            kwargs[name] = corpus.text
+        batch = getattr(node_cls, "INPUT_IS_LIST", False)
+        if not (batch and node_id.removesuffix("_Batch") in _WHOLE_CORPUS_WORKLOADS):
+            kwargs.update(WORKLOADS.get(node_id.removesuffix("_Batch"), lambda c: {})(corpus))
+        clamp_inputs(node_cls, kwargs)
+        if batch:
+            # Batch twins get one element per corpus line on the text input
+            kwargs = {key: [value] for key, value in kwargs.items()}
+            if name is not None:
+                kwargs[name] = corpus.text.splitlines()
+        func = getattr(node_cls(), node_cls.FUNCTION)
+
+        times = []
+        for _ in range(max(1, repeat)):
+            gc.collect()
+            start = time.perf_counter()
+            _call(func, kwargs)
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        result["seconds"] = seconds
+        result["mb_per_s"] = corpus.size_bytes / 1024 / 1024 / seconds if seconds > 0 else None
+
+        if memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                _call(func, kwargs)
+                result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _UNITS[unit])
+    return int(text)
+
+
+def run(args):
+    package = load_package()
+    parallel = sys.modules[f"{PACKAGE_NAME}.parallel"]
+    if args.workers is not None:
+        parallel.configure_parallel(workers=args.workers)
+    sizes = [parse_size(size) for size in SIZE_PRESETS.get(args.sizes, args.sizes).split(",")]
+    kinds = args.corpus.split(",")
+    nodes = {
+        node_id: cls for node_id, cls in package.NODE_CLASS_MAPPINGS.items()
+        if not args.nodes or any(part in node_id for part in args.nodes.split(","))
+    }
+
+    results = []
+    over_budget = set()
+    for size in sorted(sizes):
+        for kind in kinds:
+            corpus = Corpus(kind, size, args.seed)
+            try:
+                for node_id, node_cls in nodes.items():
+                    if (node_id, kind) in over_budget:
+                        results.append({"node": node_id, "corpus": kind, "size_bytes": corpus.size_bytes,
+                                        "status": "skipped"})
+                        continue
+                    fallbacks = parallel.parallel_info()["fallbacks"]
+                    result = bench_node(node_id, node_cls, corpus, args.repeat, not args.no_memory)
+                    if parallel.parallel_info()["fallbacks"] != fallbacks:
+                        # The node silently reran serially; its timing would be wrong
+                        raise RuntimeError(f"{node_id}: the process pool broke and the node ran serially")
+                    results.append(result)
+                    # Larger corpora would only take longer
+                    if result.get("seconds", 0) > args.time_budget:
+                        over_budget.add((node_id, kind))
+                    print(_format_result(result), flush=True)
+            finally:
+                corpus.cleanup()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "workers": parallel.parallel_info()["workers"],
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"wrote {len(results)} results to {args.output}")
+    return 0
+
+
+def _format_result(result):
+    head = f"{result['node']:<28} {result['corpus']:<5} {_format_size(result['size_bytes']):>9}"
+    if result["status"] != "ok":
+        return f"{head}  {result['status']} {result.get('error', '')}"
+    rate = f"{result['mb_per_s']:10.1f} MB/s" if result.get("mb_per_s") else " " * 15
+    peak = f"  peak {_format_size(result['peak_bytes'])}" if "peak_bytes" in result else ""
+    return f"{head}  {result['seconds'] * 1000:10.2f} ms {rate}{peak}"
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def compare(args):
+    """对比基线 / Flag results slower or larger than the baseline by > threshold"""
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    base = {(r["node"], r["corpus"], r["size_bytes"]): r for r in baseline if r["status"] == "ok"}
+    regressions = 0
+    compared = 0
+    for result in current:
+        old = base.get((result["node"], result["corpus"], result["size_bytes"]))
+        if old is None or result["status"] != "ok":
+            continue
+        compared += 1
+        flags = []
+        # Sub-millisecond timings are too noisy to compare
+        if old["seconds"] >= args.min_seconds or result["seconds"] >= args.min_seconds:
+            ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            if ratio > 1 + args.threshold:
+                flags.append(f"time x{ratio:.2f}")
+        if "peak_bytes" in old and "peak_bytes" in result and old["peak_bytes"] > 0:
+            ratio = result["peak_bytes"] / old["peak_bytes"]
+            if ratio > 1 + args.threshold and result["peak_bytes"] - old["peak_bytes"] > 64 * 1024:
+                flags.append(f"memory x{ratio:.2f}")
+        if flags:
+            regressions += 1
+            print(f"REGRESSION {result['node']:<28} {result['corpus']:<5} "
+                  f"{_format_size(result['size_bytes']):>9}  {', '.join(flags)}")
+
+    print(f"{compared} results compared, {regressions} regressions "
+          f"(threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HAIGC Text nodes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark nodes and write JSON results")
+    run_parser.add_argument("--sizes", default="default",
+                            help="comma-separated sizes (1KB,1MB,1GB) or a preset: "
+                                 + ", ".join(SIZE_PRESETS))
+    run_parser.add_argument("--corpus", default=",".join(CORPUS_KINDS),
+                            help="comma-separated corpus kinds: " + ", ".join(CORPUS_KINDS))
+    run_parser.add_argument("--nodes", default="", help="only node ids containing one of these, comma-separated")
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (best is kept)")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--time-budget", type=float, default=60.0,
+                            help="skip larger corpora for a node once one run exceeds this many seconds")
+    run_parser.add_argument("--workers", type=int, default=None,
+                            help="process pool size for large inputs (default: the pack's setting, 1 = serial)")
+    run_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed slowdown / memory growth as a fraction (default 0.10)")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.001,
+                                help="ignore timings below this in both runs")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
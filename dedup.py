@@ -0,0 +1,169 @@
+"""
+去重集合
+Seen-sets for line deduplication with different memory trade-offs
+"""
+import hashlib
+import math
+import sys
+from array import array
+
+DEDUP_MODES = ["exact", "digest", "bloom"]
+
+_MASK64 = (1 << 64) - 1
+# Slots of a new digest table; a power of two, doubled at 2/3 load
+_DIGEST_SLOTS = 1024
+
+
+class ExactSeen:
+    """精确去重 / Exact dedup holding every distinct line (or its lowercase copy)"""
+
+    def __init__(self, case_sensitive=True):
+        self.case_sensitive = case_sensitive
+        self._seen = set()
+
+    def is_new(self, line):
+        """Return True the first time a line is seen, recording it"""
+        key = line if self.case_sensitive else line.lower()
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def memory_bytes(self):
+        return sys.getsizeof(self._seen) + sum(map(sys.getsizeof, self._seen))
+
+    def describe(self):
+        return f"exact: {len(self._seen)} keys, {_format_bytes(self.memory_bytes())}"
+
+
+class DigestSeen:
+    """摘要去重 / Dedup on fixed-width 64-bit line hashes
+
+    Only the hash of each distinct line is kept, in an open-addressing table
+    of unsigned 64-bit slots (an array, not a set of int objects), so a line
+    costs 12-24 bytes whatever its length. Zero marks an empty slot. Two
+    distinct lines collide with probability of about n^2 / 2^65 for n
+    distinct lines, in which case the later one is dropped.
+    """
+
+    def __init__(self, case_sensitive=True):
+        self.case_sensitive = case_sensitive
+        self.count = 0
+        self._table = array("Q", bytes(8 * _DIGEST_SLOTS))
+        self._mask = _DIGEST_SLOTS - 1
+
+    def is_new(self, line):
+        key = hash(line if self.case_sensitive else line.lower()) & _MASK64 or 1
+        table = self._table
+        mask = self._mask
+        slot = key & mask
+        while True:
+            stored = table[slot]
+            if stored == key:
+                return False
+            if not stored:
+                break
+            slot = (slot + 1) & mask
+        table[slot] = key
+        self.count += 1
+        if 3 * self.count > 2 * len(table):
+            self._grow()
+        return True
+
+    def _grow(self):
+        size = 2 * len(self._table)
+        mask = size - 1
+        table = array("Q", bytes(8 * size))
+        for key in self._table:
+            if key:
+                slot = key & mask
+                while table[slot]:
+                    slot = (slot + 1) & mask
+                table[slot] = key
+        self._table = table
+        self._mask = mask
+
+    def memory_bytes(self):
+        return sys.getsizeof(self._table)
+
+    def describe(self):
+        return f"digest: {self.count} keys, {_format_bytes(self.memory_bytes())}"
+
+
+class BloomSeen:
+    """布隆过滤器去重 / Approximate dedup with a Bloom filter
+
+    Memory is fixed up front from the expected number of distinct lines and
+    the target false-positive rate. A false positive drops a line that was
+    in fact new; duplicates are never kept.
+    """
+
+    def __init__(self, case_sensitive=True, expected_lines=1000000, false_positive_rate=0.001):
+        self.case_sensitive = case_sensitive
+        expected_lines = max(1, expected_lines)
+        false_positive_rate = min(max(false_positive_rate, 1e-12), 0.5)
+        self.bit_count = max(8, math.ceil(-expected_lines * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / expected_lines * math.log(2)))
+        self.inserted = 0
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    def is_new(self, line):
+        key = line if self.case_sensitive else line.lower()
+        digest = hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self._bits
+        bit_count = self.bit_count
+        new = False
+        for i in range(self.hash_count):
+            bit = (h1 + i * h2) % bit_count
+            byte = bits[bit >> 3]
+            mask = 1 << (bit & 7)
+            if not byte & mask:
+                bits[bit >> 3] = byte | mask
+                new = True
+        if new:
+            self.inserted += 1
+        return new
+
+    def memory_bytes(self):
+        return sys.getsizeof(self._bits)
+
+    def false_positive_rate(self):
+        """Estimated rate at the current fill level"""
+        return (1 - math.exp(-self.hash_count * self.inserted / self.bit_count)) ** self.hash_count
+
+    def describe(self):
+        return (f"bloom: {self.inserted} keys, {_format_bytes(self.memory_bytes())}, "
+                f"{self.hash_count} hashes, est. false-positive rate {self.false_positive_rate():.2e}")
+
+
+def exact_unique(lines, case_sensitive=True):
+    """Yield the first occurrence of each line, testing a plain set inline
+
+    The exact mode of a streamed dedup; calling ExactSeen.is_new instead
+    would add a method call to every line.
+    """
+    seen = set()
+    for line in lines:
+        key = line if case_sensitive else line.lower()
+        if key not in seen:
+            seen.add(key)
+            yield line
+
+
+def make_seen(dedup_mode="exact", case_sensitive=True, expected_lines=1000000, false_positive_rate=0.001):
+    if dedup_mode == "exact":
+        return ExactSeen(case_sensitive)
+    elif dedup_mode == "digest":
+        return DigestSeen(case_sensitive)
+    elif dedup_mode == "bloom":
+        return BloomSeen(case_sensitive, expected_lines, false_positive_rate)
+    raise ValueError(f"Unknown dedup mode: {dedup_mode}")
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
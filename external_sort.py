@@ -0,0 +1,85 @@
+"""
+外部归并排序
+External merge sort for line sets larger than memory
+"""
+import heapq
+import marshal
+import shutil
+import sys
+import tempfile
+import weakref
+
+from .text_list import LineStream
+
+# Lines per marshal block in a run file
+_BLOCK_LINES = 4096
+
+
+def external_sort(lines, key=None, reverse=False, memory_limit=256 * 1024 * 1024, progress=None):
+    """外部排序 / Sort lines within a memory ceiling
+
+    Lines are gathered into runs of at most memory_limit bytes (estimated),
+    each run is sorted and spilled to a temp file, and the runs are k-way
+    merged with a heap. The result is stable and identical to
+    sorted(lines, key=key, reverse=reverse).
+
+    Returns (sorted_lines, spilled_runs). sorted_lines is a list when
+    nothing had to be spilled, otherwise a LineStream that merges the run
+    files on each iteration; the files are removed with the stream.
+    A progress (see progress.py) is advanced by the lines of each spilled
+    run, which is also where an interrupt can stop the sort.
+    """
+    # Rough per-line cost: the str, its list slot and (if any) its sort key
+    key_factor = 1 if key is None or key is len else 2
+    run = []
+    run_bytes = 0
+    run_paths = []
+    temp_dir = None
+
+    try:
+        for line in lines:
+            run.append(line)
+            run_bytes += sys.getsizeof(line) * key_factor + 16
+            if run_bytes >= memory_limit:
+                if temp_dir is None:
+                    temp_dir = tempfile.mkdtemp(prefix="haigc_sort_")
+                run_paths.append(_spill_run(run, key, reverse, temp_dir, len(run_paths)))
+                if progress is not None:
+                    progress.advance(len(run))
+                run = []
+                run_bytes = 0
+
+        if not run_paths:
+            run.sort(key=key, reverse=reverse)
+            return run, 0
+
+        if run:
+            run_paths.append(_spill_run(run, key, reverse, temp_dir, len(run_paths)))
+    except BaseException:
+        # Interrupted (or failed) before the stream owns the run files
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, True)
+        raise
+
+    stream = LineStream(lambda: heapq.merge(*map(_read_run, run_paths), key=key, reverse=reverse))
+    weakref.finalize(stream, shutil.rmtree, temp_dir, True)
+    return stream, len(run_paths)
+
+
+def _spill_run(run, key, reverse, temp_dir, index):
+    run.sort(key=key, reverse=reverse)
+    path = f"{temp_dir}/run_{index:05d}.bin"
+    with open(path, "wb") as f:
+        for start in range(0, len(run), _BLOCK_LINES):
+            marshal.dump(run[start:start + _BLOCK_LINES], f)
+    return path
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = marshal.load(f)
+            except EOFError:
+                return
+            yield from block
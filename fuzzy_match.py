@@ -0,0 +1,241 @@
+"""
+模糊匹配
+Bounded edit distance with the bit-parallel algorithms of Myers and Hyyrö
+
+A FuzzyPattern precomputes the per-character bitmasks of its pattern once
+and then advances one column of the dynamic-programming table per text
+character with a handful of integer operations (Myers 1999, in Hyyrö's
+2003 formulation; with transpositions, Hyyrö's optimal string alignment
+variant). Python ints make any pattern length a single "word".
+
+Two exact filters keep most lines away from the per-character loop:
+- the length difference is a lower bound on the distance;
+- a partition filter splits the pattern into k+2 pieces (2k+2 with
+  transpositions, since one swap can break two pieces), so any k edits
+  leave at least two pieces intact. Those must occur in the text, found
+  with str.find at C speed, at their pattern offsets give or take k:
+  from the start of the line for whole-line matches, relative to each
+  other for substring matches. A substring match can then only lie in a
+  window around such a pair, and only those windows are scanned.
+Patterns too short for pieces of _MIN_PAIR_PIECE characters use k+1
+pieces (2k+1) and one survivor instead, the shortest ones no filter.
+Whole-line matches also stop as soon as the distance can no longer come
+back under the bound.
+"""
+from .pattern_cache import PatternCache
+
+# Shorter pieces occur too often for two-survivor pairs to pay off over one
+_MIN_PAIR_PIECE = 6
+
+
+def _pieces(pattern, count):
+    """Split pattern into count non-empty (offset, piece) pairs of near-equal length"""
+    size, extra = divmod(len(pattern), count)
+    pieces = []
+    start = 0
+    for i in range(count):
+        end = start + size + (i < extra)
+        pieces.append((start, pattern[start:end]))
+        start = end
+    return pieces
+
+
+class FuzzyPattern:
+    """编译后的模糊模式 / A pattern with its match bitmasks precomputed
+
+    distance(text) is the Levenshtein distance between the pattern and the
+    text (with transpositions: the optimal string alignment distance), or
+    with substring=True the smallest distance to any substring of the text.
+    It returns None when that distance exceeds max_distance.
+    """
+
+    def __init__(self, pattern, max_distance, transpositions=False, substring=False):
+        self.pattern = pattern
+        self.max_distance = max_distance
+        self.transpositions = transpositions
+        self.substring = substring
+        self.length = len(pattern)
+        self.full = (1 << self.length) - 1
+        self.high = 1 << (self.length - 1) if pattern else 0
+        self.peq = {}
+        for i, char in enumerate(pattern):
+            self.peq[char] = self.peq.get(char, 0) | (1 << i)
+        # Pieces that k edits can break, plus how many must survive
+        breakable = 2 * max_distance if transpositions else max_distance
+        self.pieces = None
+        self.survivors = 0
+        for survivors, piece_length in ((2, _MIN_PAIR_PIECE), (1, 1)):
+            # piece_length 1: with fewer characters than pieces some would be empty
+            if len(pattern) >= (breakable + survivors) * piece_length:
+                self.pieces = _pieces(pattern, breakable + survivors)
+                self.survivors = survivors
+                break
+
+    def distance(self, text):
+        k = self.max_distance
+        m = self.length
+        n = len(text)
+        if self.substring:
+            if m - n > k:
+                return None
+        elif abs(m - n) > k:
+            return None
+        if m == 0:
+            return 0 if self.substring else n
+        if self.substring:
+            if self.pattern in text:
+                return 0
+            if self.pieces is not None:
+                return self._scan_windows(text)
+            return self._scan_substring(text)
+        if self.pieces is not None:
+            # An intact piece sits within k of its offset in the pattern
+            found = 0
+            for offset, piece in self.pieces:
+                if text.find(piece, max(0, offset - k), offset + len(piece) + k) != -1:
+                    found += 1
+                    if found == self.survivors:
+                        break
+            else:
+                return None
+        return self._scan_line(text)
+
+    def _scan_windows(self, text):
+        """Substring distance scanning only the text around intact pieces"""
+        k = self.max_distance
+        m = self.length
+        # Each occurrence as the position where the match would start
+        anchors = []
+        for index, (offset, piece) in enumerate(self.pieces):
+            position = text.find(piece)
+            while position != -1:
+                anchors.append((position - offset, index))
+                position = text.find(piece, position + 1)
+        if self.survivors == 2:
+            # Two different intact pieces agree on the start within k
+            anchors.sort()
+            paired = []
+            for i, (start, index) in enumerate(anchors):
+                for other, other_index in anchors[i + 1:]:
+                    if other - start > k:
+                        break
+                    if other_index != index:
+                        paired.append((start, index))
+                        paired.append((other, other_index))
+                        break
+            anchors = paired
+        if not anchors:
+            return None
+        windows = sorted((max(0, start - k), start + m + k) for start, _ in anchors)
+        merged = [list(windows[0])]
+        for start, end in windows[1:]:
+            if start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        best = None
+        for start, end in merged:
+            found = self._scan_substring(text[start:end])
+            if found is not None and (best is None or found < best):
+                best = found
+        return best
+
+    def _scan_line(self, text):
+        """Whole-line distance; stops once the remaining characters, which
+        lower it by at most one each, can no longer bring it down to k"""
+        k = self.max_distance
+        peq = self.peq.get
+        full = self.full
+        high = self.high
+        transpositions = self.transpositions
+        vp = full
+        vn = 0
+        d0 = 0
+        pm_old = 0
+        dist = self.length
+        # Lower bound on the final distance: dist - characters left
+        bound = dist - len(text)
+        for char in text:
+            x = peq(char, 0)
+            if transpositions:
+                d0 = ((((x & vp) + vp) ^ vp) | x | vn | ((((~d0) & x) << 1) & pm_old)) & full
+                pm_old = x
+            else:
+                d0 = ((((x & vp) + vp) ^ vp) | x | vn) & full
+            hp = vn | (~(d0 | vp) & full)
+            hn = d0 & vp
+            if hp & high:
+                bound += 2
+                if bound > k:
+                    return None
+            elif not hn & high:
+                bound += 1
+                if bound > k:
+                    return None
+            hp = ((hp << 1) | 1) & full
+            vp = ((hn << 1) & full) | (~(d0 | hp) & full)
+            vn = hp & d0
+        return bound if bound <= k else None
+
+    def _scan_substring(self, text):
+        """Smallest distance over all end positions; row 0 of the table is
+        all zeros because a match may start anywhere"""
+        k = self.max_distance
+        peq = self.peq.get
+        full = self.full
+        high = self.high
+        transpositions = self.transpositions
+        vp = full
+        vn = 0
+        d0 = 0
+        pm_old = 0
+        dist = best = self.length
+        for char in text:
+            x = peq(char, 0)
+            if transpositions:
+                d0 = ((((x & vp) + vp) ^ vp) | x | vn | ((((~d0) & x) << 1) & pm_old)) & full
+                pm_old = x
+            else:
+                d0 = ((((x & vp) + vp) ^ vp) | x | vn) & full
+            hp = vn | (~(d0 | vp) & full)
+            hn = d0 & vp
+            if hp & high:
+                dist += 1
+            elif hn & high:
+                dist -= 1
+                if dist < best:
+                    best = dist
+            hp = (hp << 1) & full
+            vp = ((hn << 1) & full) | (~(d0 | hp) & full)
+            vn = hp & d0
+        return best if best <= k else None
+
+    def match_lines(self, lines):
+        """Return ([matching lines], [their distances]) in input order"""
+        distance = self.distance
+        matched = []
+        distances = []
+        for line in lines:
+            found = distance(line)
+            if found is not None:
+                matched.append(line)
+                distances.append(found)
+        return matched, distances
+
+
+_fuzzy_cache = PatternCache(max_size=64)
+
+
+def compile_fuzzy(pattern, max_distance, transpositions=False, substring=False):
+    """编译模糊模式(带缓存) / Build or fetch the FuzzyPattern for these settings"""
+    if max_distance < 0:
+        raise ValueError(f"max_distance must be >= 0, got {max_distance}")
+    key = (pattern, max_distance, transpositions, substring)
+    return _fuzzy_cache.get(key, lambda: FuzzyPattern(*key))
+
+
+def edit_distance(a, b, max_distance=None, transpositions=False, substring=False):
+    """编辑距离 / Distance from pattern a to text b, None if above max_distance"""
+    if max_distance is None:
+        max_distance = max(len(a), len(b))
+    return compile_fuzzy(a, max_distance, transpositions, substring).distance(b)
@@ -0,0 +1,264 @@
+"""
+近似去重
+Near-duplicate line clustering with MinHash signatures and LSH banding
+
+Each line is normalised (lowercase, punctuation dropped) and cut into
+shingles: its set of words, which ignores word order, adjacent word pairs,
+or character 3-grams. A MinHash signature holds, for num_perm hash
+functions, the smallest hash over the shingles; two lines agree at one
+position with probability equal to the Jaccard similarity of their
+shingle sets. The hashes of a shingle are computed once per distinct
+shingle, so a signature is a column-wise minimum over cached rows: with
+numpy a minimum.reduceat over a whole chunk of lines; without it each row
+is one Python int of 33-bit lanes and the minimum is taken for all lanes
+at once with a few big-int operations (SWAR), as are the agreement counts.
+
+LSH splits the signature into bands of r rows; lines sharing any band are
+candidates, and the band count is chosen so that pairs near the threshold
+are found with high probability. Lines are clustered in one pass: a line
+joins the first candidate cluster whose representative (its first line)
+has an estimated similarity of at least the threshold, and otherwise
+starts a cluster of its own. Each line costs a constant number of dict
+lookups, so the whole run is linear in the input.
+"""
+import functools
+import hashlib
+import importlib.util
+import random
+import re
+
+SHINGLE_MODES = ["words", "word_pairs", "chars"]
+
+_HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+_MASK64 = (1 << 64) - 1
+# Packed rows: 32 value bits and a guard bit above them per lane
+_LANE_BITS = 33
+_LANE_MASK = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+")
+# Candidate clusters verified per band; more only add time on huge buckets
+_MAX_BUCKET = 4
+# Lines hashed together; bounds numpy's (shingles x num_perm) gather
+_BATCH_LINES = 4096
+
+
+def shingles(line, mode="words"):
+    """Set of shingles of a normalised line; never empty"""
+    words = _WORD_RE.findall(line.lower())
+    if mode == "words":
+        found = set(words)
+    elif mode == "word_pairs":
+        if len(words) > 1:
+            found = {f"{first} {second}" for first, second in zip(words, words[1:])}
+        else:
+            found = set(words)
+    elif mode == "chars":
+        joined = " ".join(words)
+        found = {joined[i:i + 3] for i in range(len(joined) - 2)} or {joined}
+    else:
+        raise ValueError(f"Unknown shingle mode: {mode}")
+    # Lines without any word all share one signature
+    return found or {""}
+
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8", "surrogatepass"),
+                                          digest_size=8).digest(), "little")
+
+
+@functools.lru_cache(maxsize=64)
+def lsh_params(threshold, num_perm):
+    """(bands, rows) minimising the false positive plus false negative area
+    of the candidate probability 1 - (1 - s^rows)^bands around threshold"""
+    steps = 100
+
+    def area(low, high, probability):
+        width = (high - low) / steps
+        return sum(probability(low + (i + 0.5) * width) for i in range(steps)) * width
+
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            candidate = lambda s: 1 - (1 - s ** rows) ** bands
+            error = (area(0.0, threshold, candidate)
+                     + area(threshold, 1.0, lambda s: 1 - candidate(s)))
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """MinHash签名 / MinHash signatures from cached per-shingle hash rows
+
+    The hash functions are multiply-shift ((a * x + b) mod 2^64) >> 32 with
+    fixed random a and b, which numpy's wrapping uint64 arithmetic computes
+    exactly like Python ints, so both paths give the same signatures.
+    """
+
+    def __init__(self, num_perm=128, seed=1, use_numpy=None):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self.b = [rng.getrandbits(64) for _ in range(num_perm)]
+        self.use_numpy = _HAS_NUMPY if use_numpy is None else use_numpy
+        self._ids = {}
+        if self.use_numpy:
+            import numpy
+
+            self._np = numpy
+            self._a = numpy.array(self.a, dtype=numpy.uint64)
+            self._b = numpy.array(self.b, dtype=numpy.uint64)
+            self._matrix = numpy.empty((1024, num_perm), dtype=numpy.uint32)
+        else:
+            self._rows = []
+            lanes = range(0, num_perm * _LANE_BITS, _LANE_BITS)
+            self._ones = sum(1 << shift for shift in lanes)
+            self._guards = self._ones << 32
+            self._values = self._ones * _LANE_MASK
+
+    def _add_shingles(self, new):
+        """Compute and store the hash rows of shingles not seen before"""
+        start = len(self._ids)
+        for shingle in new:
+            self._ids[shingle] = len(self._ids)
+        hashes = [_shingle_hash(shingle) for shingle in new]
+        if self.use_numpy:
+            np = self._np
+            end = len(self._ids)
+            if end > len(self._matrix):
+                grown = np.empty((max(end, 2 * len(self._matrix)), self.num_perm), dtype=np.uint32)
+                grown[:start] = self._matrix[:start]
+                self._matrix = grown
+            x = np.array(hashes, dtype=np.uint64)[:, None]
+            self._matrix[start:end] = ((self._a * x + self._b) >> np.uint64(32)).astype(np.uint32)
+        else:
+            params = list(zip(self.a, self.b))
+            for x in hashes:
+                row = 0
+                for a, b in reversed(params):
+                    row = (row << _LANE_BITS) | (((a * x + b) & _MASK64) >> 32)
+                self._rows.append(row)
+
+    def _lane_min(self, a, b):
+        # The guard bit of a lane survives (a | guard) - b exactly when a >= b
+        ge = ((a | self._guards) - b) & self._guards
+        take_b = ge - (ge >> 32)
+        return (b & take_b) | (a & (self._values ^ take_b))
+
+    def agreement(self, a, b):
+        """Number of positions where two signatures hold the same value"""
+        if self.use_numpy:
+            return int(self._np.count_nonzero(a == b))
+        # The guard bit of a lane survives subtracting one exactly when it differs
+        differ = (((a ^ b) | self._guards) - self._ones) & self._guards
+        return self.num_perm - bin(differ).count("1")
+
+    def unpack(self, signature):
+        """A signature as a list of num_perm ints"""
+        if self.use_numpy:
+            return signature.tolist()
+        return [(signature >> shift) & _LANE_MASK
+                for shift in range(0, self.num_perm * _LANE_BITS, _LANE_BITS)]
+
+    def signatures(self, shingle_sets):
+        """Signatures of a list of shingle sets: an (n, num_perm) uint32 array
+        with numpy, else a list of packed ints"""
+        ids = self._ids
+        new = {shingle for found in shingle_sets for shingle in found if shingle not in ids}
+        if new:
+            self._add_shingles(sorted(new))
+        if self.use_numpy:
+            np = self._np
+            flat = np.fromiter((ids[shingle] for found in shingle_sets for shingle in found),
+                               dtype=np.int64)
+            offsets = np.zeros(len(shingle_sets), dtype=np.int64)
+            np.cumsum([len(found) for found in shingle_sets[:-1]], out=offsets[1:])
+            return np.minimum.reduceat(self._matrix[flat], offsets, axis=0)
+        rows = self._rows
+        lane_min = self._lane_min
+        return [functools.reduce(lane_min, [rows[ids[shingle]] for shingle in found])
+                for found in shingle_sets]
+
+
+class NearDuplicates:
+    """近似重复聚类 / One-pass MinHash LSH clustering of lines
+
+    assign(lines) returns the cluster id of each line, counting clusters in
+    order of their first line across calls; representatives holds those
+    first lines.
+    """
+
+    def __init__(self, threshold=0.7, num_perm=128, shingle_mode="words", use_numpy=None):
+        if shingle_mode not in SHINGLE_MODES:
+            raise ValueError(f"Unknown shingle mode: {shingle_mode}")
+        self.threshold = threshold
+        self.shingle_mode = shingle_mode
+        self.hasher = MinHasher(num_perm, use_numpy=use_numpy)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        # A representative needs at least this many agreeing positions
+        self.min_agree = threshold * num_perm
+        self.representatives = []
+        self.lines = 0
+        self._signatures = []
+        self._buckets = [{} for _ in range(self.bands)]
+        if self.hasher.use_numpy:
+            np = self.hasher._np
+            rng = random.Random(2)
+            self._band_mult = np.array([rng.getrandbits(64) | 1 for _ in range(self.rows)], dtype=np.uint64)
+
+    def _band_keys(self, signatures):
+        """Per line, a list of one hashable key per band"""
+        r = self.rows
+        if self.hasher.use_numpy:
+            np = self.hasher._np
+            banded = signatures[:, :self.bands * r].reshape(len(signatures), self.bands, r)
+            return (banded.astype(np.uint64) * self._band_mult).sum(axis=2, dtype=np.uint64).tolist()
+        width = r * _LANE_BITS
+        band_mask = (1 << width) - 1
+        return [[(signature >> shift) & band_mask for shift in range(0, self.bands * width, width)]
+                for signature in signatures]
+
+    def assign(self, lines):
+        cluster_ids = []
+        for start in range(0, len(lines), _BATCH_LINES):
+            cluster_ids += self._assign_batch(lines[start:start + _BATCH_LINES])
+        return cluster_ids
+
+    def _assign_batch(self, lines):
+        mode = self.shingle_mode
+        signatures = self.hasher.signatures([shingles(line, mode) for line in lines])
+        keys = self._band_keys(signatures)
+        buckets = self._buckets
+        representatives = self._signatures
+        min_agree = self.min_agree
+        cluster_ids = []
+        for line, signature, line_keys in zip(lines, signatures, keys):
+            cluster = None
+            checked = set()
+            for bucket, key in zip(buckets, line_keys):
+                for candidate in bucket.get(key, ()):
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    if self.hasher.agreement(signature, representatives[candidate]) >= min_agree:
+                        cluster = candidate
+                        break
+                if cluster is not None:
+                    break
+            if cluster is None:
+                cluster = len(representatives)
+                # A copy, so a numpy row does not keep its whole chunk alive
+                representatives.append(signature.copy() if self.hasher.use_numpy else signature)
+                self.representatives.append(line)
+                for bucket, key in zip(buckets, line_keys):
+                    members = bucket.setdefault(key, [])
+                    if len(members) < _MAX_BUCKET:
+                        members.append(cluster)
+            cluster_ids.append(cluster)
+        self.lines += len(lines)
+        return cluster_ids
+
+    def describe(self):
+        backend = "numpy" if self.hasher.use_numpy else "python"
+        return (f"near: {len(self.representatives)} clusters from {self.lines} lines, "
+                f"{self.bands}x{self.rows} bands, {backend}")
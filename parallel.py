@@ -0,0 +1,278 @@
+"""
+并行执行
+Process-pool backend for CPU-heavy per-line work on large inputs
+
+Regex filtering and replacement run under the GIL, so a single call only
+uses one core. The pool is opt-in: with HAIGC_TEXT_WORKERS set to more than
+one process ("auto" for all available cores), inputs of at least
+HAIGC_TEXT_PARALLEL_MB megabytes (default 4) are split into chunks at line
+boundaries and mapped over a persistent pool; the chunk results come back
+in input order, so the output is identical to the serial path. Unset, one
+worker, or a pool that breaks, means serial execution.
+
+Workers are spawned, never forked: forking the multi-threaded ComfyUI
+server can copy locks held by other threads into the child.
+"""
+import os
+import site
+import threading
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+from .pattern_cache import PatternCache
+
+# Enough chunks per worker to even out uneven lines, few enough that the
+# per-task pickling overhead stays small
+_CHUNKS_PER_WORKER = 4
+_MIN_CHUNK_CHARS = 256 * 1024
+
+
+def _available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _configured_workers(value):
+    """HAIGC_TEXT_WORKERS: unset means serial, "auto" all available cores"""
+    if not value:
+        return 1
+    if value.strip().lower() == "auto":
+        return _available_cpus()
+    return int(value)
+
+
+def package_parent():
+    """The directory holding the pack (custom_nodes)
+
+    Spawned workers re-import the pack by module name, so they add it to
+    their own sys.path first; the server's sys.path is left alone.
+    """
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ParallelBackend:
+    """进程池后端 / Persistent process pool with a size threshold"""
+
+    def __init__(self, workers=0, min_bytes=0):
+        self.workers = workers
+        self.min_bytes = min_bytes
+        self.tasks = 0
+        self.fallbacks = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 1
+
+    def should_split(self, size):
+        """Whether an input of size characters is worth sending to the pool"""
+        return self.enabled and size >= self.min_bytes
+
+    def configure(self, workers=None, min_bytes=None):
+        with self._lock:
+            if min_bytes is not None:
+                self.min_bytes = min_bytes
+            if workers is not None and workers != self.workers:
+                self.workers = workers
+                self._shutdown()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Both are slow to import; only a pool that is used pays for them
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=site.addsitedir, initargs=(package_parent(),)
+                )
+            return self._executor
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self):
+        with self._lock:
+            self._shutdown()
+
+    def map_chunks(self, func, chunks, *args):
+        """Return [func(chunk, *args) for chunk in chunks], computed in the pool
+
+        func must be a module-level function. Exceptions raised by func are
+        re-raised here; if the pool itself dies the chunks are redone serially.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            futures = [self._pool().submit(func, chunk, *args) for chunk in chunks]
+            results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            self.shutdown()
+            self.fallbacks += 1
+            return [func(chunk, *args) for chunk in chunks]
+        self.tasks += len(chunks)
+        return results
+
+    def chunk_count(self, size):
+        return max(1, min(self.workers * _CHUNKS_PER_WORKER, size // _MIN_CHUNK_CHARS))
+
+    def info(self):
+        return {
+            "workers": self.workers,
+            "min_bytes": self.min_bytes,
+            "running": self._executor is not None,
+            "tasks": self.tasks,
+            "fallbacks": self.fallbacks,
+        }
+
+
+backend = ParallelBackend(
+    workers=_configured_workers(os.environ.get("HAIGC_TEXT_WORKERS", "")),
+    min_bytes=int(float(os.environ.get("HAIGC_TEXT_PARALLEL_MB", "4")) * 1024 * 1024),
+)
+
+
+def configure_parallel(workers=None, min_mb=None):
+    """设置并行(workers<=1为禁用) / Set the worker count and the size threshold in MB"""
+    backend.configure(workers, None if min_mb is None else int(min_mb * 1024 * 1024))
+
+
+def parallel_info():
+    return backend.info()
+
+
+def split_text(text, parts):
+    """Cut text into about parts slices, each ending just after a newline"""
+    step = len(text) // parts + 1
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + step)
+        end = len(text) if end == -1 else end + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+def split_list(items, parts):
+    step = -(-len(items) // parts)
+    return [items[i:i + step] for i in range(0, len(items), step)]
+
+
+# ---- regex analysis ----------------------------------------------------------
+
+_NEWLINE = ord("\n")
+
+# Categories that never contain "\n"; any other category is treated as matching it
+_NO_NEWLINE_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT,
+    sre_constants.CATEGORY_NOT_SPACE,
+    sre_constants.CATEGORY_WORD,
+    sre_constants.CATEGORY_NOT_LINEBREAK,
+}
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+# Line anchors are only local with MULTILINE; string anchors never are
+_LINE_ANCHORS = {sre_constants.AT_BEGINNING, sre_constants.AT_END}
+_LOCAL_ANCHORS = {
+    sre_constants.AT_BOUNDARY,
+    sre_constants.AT_NON_BOUNDARY,
+}
+
+
+def _set_has_newline(items):
+    negate = False
+    found = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            found |= av == _NEWLINE
+        elif op is sre_constants.RANGE:
+            found |= av[0] <= _NEWLINE <= av[1]
+        elif op is sre_constants.CATEGORY:
+            found |= av not in _NO_NEWLINE_CATEGORIES
+        else:
+            return True
+    return found != negate
+
+
+def _is_line_local(items, flags):
+    """No part of the pattern can match or look at a "\n", nor at the ends
+    of the whole string"""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av == _NEWLINE:
+                return False
+        elif op is sre_constants.NOT_LITERAL:
+            if av != _NEWLINE:
+                return False
+        elif op is sre_constants.ANY:
+            if flags & sre_constants.SRE_FLAG_DOTALL:
+                return False
+        elif op is sre_constants.IN:
+            if _set_has_newline(av):
+                return False
+        elif op is sre_constants.AT:
+            if av in _LINE_ANCHORS:
+                if not flags & sre_constants.SRE_FLAG_MULTILINE:
+                    return False
+            elif av not in _LOCAL_ANCHORS:
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if not _is_line_local(sub, (flags | add_flags) & ~del_flags):
+                return False
+        elif op in _REPEATS:
+            if not _is_line_local(av[2], flags):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_is_line_local(sub, flags) for sub in av[1]):
+                return False
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not _is_line_local(av[1], flags):
+                return False
+        elif op is sre_constants.GROUPREF_EXISTS:
+            _, yes, no = av
+            if not _is_line_local(yes, flags) or (no is not None and not _is_line_local(no, flags)):
+                return False
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            if not _is_line_local(av, flags):
+                return False
+        elif op is not sre_constants.GROUPREF:
+            return False
+    return True
+
+
+def _analyze(pattern, flags):
+    parsed = sre_parse.parse(pattern, flags)
+    # An empty match could occur at a chunk boundary in both chunks
+    if parsed.getwidth()[0] == 0:
+        return False
+    state = parsed.state if hasattr(parsed, "state") else parsed.pattern  # Python < 3.11
+    return _is_line_local(parsed, state.flags)
+
+
+_line_local_cache = PatternCache(max_size=256)
+
+
+def regex_is_line_local(pattern, flags=0):
+    """正则是否逐行独立 / True if every match of pattern lies within one line
+
+    Then the text can be split at newlines and substituted chunk by chunk
+    with the same result and count. Inline flags are taken into account;
+    an unsupported construct counts as not line-local.
+    """
+    return _line_local_cache.get((pattern, flags), lambda: _analyze(pattern, flags))
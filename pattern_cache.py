@@ -0,0 +1,83 @@
+"""
+编译缓存
+Bounded LRU caches for compiled patterns shared by the nodes
+"""
+import re
+import threading
+from collections import OrderedDict
+
+
+class PatternCache:
+    """有界LRU缓存 / Bounded LRU cache with hit/miss counters"""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Return the cached value for key, calling build() on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Build outside the lock; errors from build() propagate and are not cached
+        value = build()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def resize(self, max_size):
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every regex-using node; larger than re's internal cache so that
+# workflows with a few hundred distinct patterns stop recompiling.
+regex_cache = PatternCache(max_size=512)
+
+
+def compile_regex(pattern, flags=0):
+    """编译正则(带缓存) / Compile a regex through the shared cache
+
+    Raises re.error for an invalid pattern; failures are not cached.
+    """
+    return regex_cache.get((pattern, flags), lambda: re.compile(pattern, flags))
+
+
+def regex_cache_info():
+    return regex_cache.info()
+
+
+def clear_regex_cache():
+    regex_cache.clear()
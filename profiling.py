@@ -0,0 +1,199 @@
+"""
+执行统计
+Opt-in per-node execution profiling
+
+enable() wraps the FUNCTION method of every registered node to record call
+counts, a log2 latency histogram and input/output sizes; disable() puts
+the original methods back, so a disabled profiler costs nothing. Cache
+hits come from the result cache's per-node counters. Set
+HAIGC_TEXT_PROFILE=1 to enable profiling when the pack loads.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+from .result_cache import result_cache
+
+# Bucket b counts calls that took < 2**b microseconds
+_HISTOGRAM_BUCKETS = 32
+
+
+class NodeStats:
+    """单节点统计 / Aggregated timings and sizes for one node"""
+
+    __slots__ = ("calls", "errors", "total", "max", "histogram", "in_chars", "out_chars")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * _HISTOGRAM_BUCKETS
+        self.in_chars = 0
+        self.out_chars = 0
+
+    def record(self, seconds, in_chars, out_chars, failed):
+        self.calls += 1
+        self.errors += failed
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = min(int(seconds * 1e6).bit_length(), _HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+        self.in_chars += in_chars
+        self.out_chars += out_chars
+
+    def percentile(self, q):
+        """Upper bound in seconds of the histogram bucket holding quantile q"""
+        target = q * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.calls if self.calls else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+            "in_chars": self.in_chars,
+            "out_chars": self.out_chars,
+            "histogram_us": {
+                f"<{2 ** bucket}": count for bucket, count in enumerate(self.histogram) if count
+            },
+        }
+
+
+def _chars(values):
+    return sum(len(value) for value in values if isinstance(value, str))
+
+
+class Profiler:
+    """节点分析器 / Patches node methods in and out and aggregates NodeStats"""
+
+    def __init__(self):
+        self.stats = {}
+        self._patched = {}
+        self._cache_base = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self._patched)
+
+    def enable(self, node_classes):
+        for cls in node_classes:
+            name = cls.FUNCTION
+            original = cls.__dict__.get(name)
+            if cls in self._patched or original is None or getattr(cls, "PROFILE_EXCLUDE", False):
+                continue
+            self._patched[cls] = (name, original)
+            setattr(cls, name, self._wrap(cls.__name__, original))
+
+    def disable(self):
+        for cls, (name, original) in self._patched.items():
+            setattr(cls, name, original)
+        self._patched.clear()
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            # Cache counters are cumulative; remember them to report deltas
+            self._cache_base = {
+                node: (counts["hits"], counts["misses"])
+                for node, counts in result_cache.info()["nodes"].items()
+            }
+
+    def _wrap(self, node, func):
+        lock = self._lock
+        stats = self.stats
+
+        @functools.wraps(func)
+        def wrapper(instance, *args, **kwargs):
+            result = None
+            start = time.perf_counter()
+            try:
+                result = func(instance, *args, **kwargs)
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                in_chars = _chars(args) + _chars(kwargs.values())
+                out_chars = _chars(result) if isinstance(result, tuple) else 0
+                with lock:
+                    entry = stats.get(node)
+                    if entry is None:
+                        entry = stats[node] = NodeStats()
+                    entry.record(elapsed, in_chars, out_chars, result is None)
+
+        return wrapper
+
+    def snapshot(self):
+        """统计快照 / Per-node stats dicts, including result-cache hits"""
+        cache_nodes = result_cache.info()["nodes"]
+        with self._lock:
+            nodes = {node: entry.to_dict() for node, entry in self.stats.items()}
+            cache_base = dict(self._cache_base)
+        for node, counts in cache_nodes.items():
+            base_hits, base_misses = cache_base.get(node, (0, 0))
+            hits = counts["hits"] - base_hits
+            misses = counts["misses"] - base_misses
+            if node in nodes or hits or misses:
+                entry = nodes.setdefault(node, NodeStats().to_dict())
+                entry["cache_hits"] = hits
+                entry["cache_misses"] = misses
+        return nodes
+
+
+profiler = Profiler()
+
+
+def enable(node_classes=None):
+    """开启统计 / Instrument the given (default: all registered) node classes"""
+    if node_classes is None:
+        from .registry import REGISTERED_CLASSES
+        node_classes = REGISTERED_CLASSES.values()
+    profiler.enable(node_classes)
+
+
+def disable():
+    profiler.disable()
+
+
+def reset():
+    profiler.reset()
+
+
+def is_enabled():
+    return profiler.enabled
+
+
+def enable_if_requested(node_classes):
+    if os.environ.get("HAIGC_TEXT_PROFILE", "") not in ("", "0"):
+        enable(node_classes)
+
+
+def report(output_format="text"):
+    """统计报告 / The aggregated stats as JSON or as a table, slowest node first"""
+    nodes = profiler.snapshot()
+    if output_format == "json":
+        return json.dumps({"enabled": profiler.enabled, "nodes": nodes}, indent=2, ensure_ascii=False)
+
+    header = (f"{'node':<24} {'calls':>7} {'err':>4} {'total ms':>10} {'mean ms':>9} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>9} {'in chars':>11} {'out chars':>11} {'cache h/m':>11}")
+    lines = [f"profiling {'enabled' if profiler.enabled else 'disabled'}", header, "-" * len(header)]
+    for node, entry in sorted(nodes.items(), key=lambda item: -item[1]["total_ms"]):
+        cache = f"{entry.get('cache_hits', 0)}/{entry.get('cache_misses', 0)}"
+        lines.append(
+            f"{node:<24} {entry['calls']:>7} {entry['errors']:>4} {entry['total_ms']:>10.2f} "
+            f"{entry['mean_ms']:>9.3f} {entry['p50_ms']:>8.3f} {entry['p95_ms']:>8.3f} "
+            f"{entry['max_ms']:>9.3f} {entry['in_chars']:>11} {entry['out_chars']:>11} {cache:>11}"
+        )
+    return "\n".join(lines)
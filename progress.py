@@ -0,0 +1,91 @@
+"""
+进度与中断
+Chunked execution with ComfyUI progress reporting and interruption checks
+
+Long line and search operations walk their input in bounded chunks. Between
+chunks they check ComfyUI's interrupt flag (raising its
+InterruptProcessingException, so Cancel works) and advance the node's
+progress bar. An input that fits in one chunk is handed over as is, without
+slicing, a progress bar or the comfy import, so small inputs run exactly as
+before. Outside ComfyUI the checks are no-ops.
+"""
+import threading
+
+# Lines per chunk; about 5-50 ms of work for the line operations
+CHUNK_LINES = 65536
+# Characters per chunk for search operations over a whole text
+CHUNK_CHARS = 4 * 1024 * 1024
+
+_hooks = None
+_hooks_lock = threading.Lock()
+
+
+def _comfy_hooks():
+    """(ProgressBar, throw_exception_if_processing_interrupted), or Nones outside ComfyUI"""
+    global _hooks
+    if _hooks is None:
+        with _hooks_lock:
+            if _hooks is None:
+                try:
+                    import comfy.model_management
+                    import comfy.utils
+                    _hooks = (comfy.utils.ProgressBar,
+                              comfy.model_management.throw_exception_if_processing_interrupted)
+                except ImportError:
+                    _hooks = (None, None)
+    return _hooks
+
+
+class Progress:
+    """进度报告 / Progress bar and interruption checks for one node call
+
+    total is in arbitrary units (lines, characters); advance() moves the bar
+    and raises if the user interrupted the queue.
+    """
+
+    def __init__(self, total):
+        self.total = max(total, 1)
+        self.done = 0
+        progress_bar, self._check = _comfy_hooks()
+        self._bar = progress_bar(self.total) if progress_bar is not None else None
+
+    def check(self):
+        if self._check is not None:
+            self._check()
+
+    def advance(self, amount):
+        self.check()
+        self.done = min(self.done + amount, self.total)
+        if self._bar is not None:
+            self._bar.update_absolute(self.done, self.total)
+
+
+def progress_for(size, chunk):
+    """A Progress for inputs larger than one chunk, else None"""
+    return Progress(size) if size > chunk else None
+
+
+def chunks(items, progress=None, size=CHUNK_LINES):
+    """Yield consecutive slices of a list, advancing progress after each
+
+    Without a progress (a small input) the list itself is the only chunk.
+    """
+    if progress is None:
+        yield items
+        return
+    for start in range(0, len(items), size):
+        progress.check()
+        yield items[start:start + size]
+        progress.advance(min(size, len(items) - start))
+
+
+def spans(length, progress=None, size=CHUNK_CHARS):
+    """Yield (start, end) ranges covering range(length), advancing progress"""
+    if progress is None:
+        yield 0, length
+        return
+    for start in range(0, length, size):
+        progress.check()
+        end = min(start + size, length)
+        yield start, end
+        progress.advance(end - start)
@@ -0,0 +1,333 @@
+"""
+正则保护
+Guarded regex execution with a static ReDoS check and a time budget
+
+A guarded call first rejects patterns with ambiguous nested quantifiers
+such as (a+)+, (\\w*)* or (a+){9}, which backtrack exponentially (or with a
+high polynomial) on near-misses. Nesting alone is fine when a separator the
+inner repeat cannot match delimits the outer iterations, as in (\\d+,)*\\d+.
+It then runs the match in a reusable worker process, a one-process spawn
+pool like parallel.py's. If no answer arrives within the budget the worker
+is killed, the call raises RegexTimeout, and the next call starts a fresh
+worker. The ComfyUI process itself never runs the pattern.
+"""
+import os
+import re
+import signal
+import site
+import threading
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+from .parallel import package_parent
+from .pattern_cache import PatternCache, compile_regex
+
+# Worker start-up (a spawn re-imports the pack) does not count against the budget
+_STARTUP_TIMEOUT = 60.0
+
+
+class UnsafePatternError(re.error):
+    """危险正则 / Pattern rejected by the static ReDoS check"""
+
+
+class RegexTimeout(TimeoutError):
+    """正则超时 / A guarded regex call ran out of its time budget"""
+
+
+# ---- static check ------------------------------------------------------------
+
+_BACKTRACKING_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_ALL_REPEATS = _BACKTRACKING_REPEATS + tuple(
+    op for op in [getattr(sre_constants, "POSSESSIVE_REPEAT", None)] if op is not None)
+
+# Character classes are compared on this alphabet plus the pattern's own
+# characters: Latin-1 and a few letters, digits and spaces beyond it
+_SAMPLE = frozenset(map(chr, range(256))) | frozenset("\u0130\u017f\u0660\u2028\u3000\u4e2d")
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r"\d",
+    sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+    sre_constants.CATEGORY_SPACE: r"\s",
+    sre_constants.CATEGORY_NOT_SPACE: r"\S",
+    sre_constants.CATEGORY_WORD: r"\w",
+    sre_constants.CATEGORY_NOT_WORD: r"\W",
+    sre_constants.CATEGORY_LINEBREAK: r"\n",
+    sre_constants.CATEGORY_NOT_LINEBREAK: r"[^\n]",
+}
+
+
+class _Chars:
+    """Sets of characters a part of the pattern can match, within a sample"""
+
+    def __init__(self, pattern, flags):
+        self.sample = _SAMPLE | frozenset(pattern)
+        self.ignore_case = flags & sre_constants.SRE_FLAG_IGNORECASE
+        self.dotall = flags & sre_constants.SRE_FLAG_DOTALL
+        self.ascii = flags & sre_constants.SRE_FLAG_ASCII
+
+    def variants(self, code):
+        char = chr(code)
+        return {char, char.lower(), char.upper()} if self.ignore_case else {char}
+
+    def atom(self, op, av):
+        if op is sre_constants.LITERAL:
+            return self.variants(av)
+        if op is sre_constants.NOT_LITERAL:
+            return self.sample - self.variants(av)
+        if op is sre_constants.ANY:
+            return self.sample if self.dotall else self.sample - {"\n"}
+        if op is sre_constants.IN:
+            return self.char_class(av)
+        return self.sample
+
+    def char_class(self, items):
+        negate = False
+        chars = set()
+        for op, av in items:
+            if op is sre_constants.NEGATE:
+                negate = True
+            elif op is sre_constants.LITERAL:
+                chars |= self.variants(av)
+            elif op is sre_constants.RANGE:
+                low, high = av
+                chars |= self.variants(low) | self.variants(high)
+                for char in self.sample:
+                    if any(low <= ord(c) <= high for c in self.variants(ord(char))):
+                        chars.add(char)
+            elif op is sre_constants.CATEGORY and av in _CATEGORIES:
+                category = re.compile(_CATEGORIES[av], re.ASCII if self.ascii else 0)
+                chars |= {char for char in self.sample if category.match(char)}
+            else:
+                chars |= self.sample
+        return self.sample - chars if negate else chars
+
+    def first(self, items):
+        """(characters a match of items can start with, whether it can be empty)"""
+        chars = set()
+        for op, av in items:
+            found, nullable = self.first_of(op, av)
+            chars |= found
+            if not nullable:
+                return chars, False
+        return chars, True
+
+    def first_of(self, op, av):
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN):
+            return self.atom(op, av), False
+        if op is sre_constants.SUBPATTERN:
+            return self.first(av[3])
+        if op is sre_constants.BRANCH:
+            chars = set()
+            nullable = False
+            for sub in av[1]:
+                found, empty = self.first(sub)
+                chars |= found
+                nullable |= empty
+            return chars, nullable
+        if op in _ALL_REPEATS:
+            low, _, sub = av
+            chars, nullable = self.first(sub)
+            return chars, nullable or low == 0
+        if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            return self.first(av)
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return set(), True
+        if op is sre_constants.GROUPREF_EXISTS:
+            chars, nullable = self.first(av[1])
+            if av[2] is None:
+                return chars, True
+            found, empty = self.first(av[2])
+            return chars | found, nullable or empty
+        # Backreferences and anything unknown: any character, possibly none
+        return set(self.sample), True
+
+
+def _check(items, chars, follow, outer):
+    """Raise UnsafePatternError for an ambiguous variable repeat inside a repeat
+
+    outer is the innermost enclosing repeat that can run more than once, if
+    any, and follow the characters that can come right after items within
+    its body, including the start of its next iteration. A variable repeat
+    there is ambiguous, and backtracks exponentially on near-misses, when
+    its next iteration could start with a character that follow also
+    accepts, as in (a+)+ or (\\w+\\s?)*; a separator it cannot match, as in
+    (\\d+,)*, makes every split unique.
+    """
+    after = follow
+    for op, av in reversed(items):
+        if op in _BACKTRACKING_REPEATS:
+            low, high, sub = av
+            first, _ = chars.first(sub)
+            if outer is not None and low != high and first & after:
+                raise UnsafePatternError(
+                    f"nested quantifier: {_describe(op, av)} inside {_describe(*outer)} "
+                    f"can backtrack exponentially")
+            if high > 1:
+                _check(sub, chars, first, (op, av))
+            else:
+                _check(sub, chars, after, outer)
+        elif op is sre_constants.SUBPATTERN:
+            _check(av[3], chars, after, outer)
+        elif op is sre_constants.BRANCH:
+            for sub in av[1]:
+                _check(sub, chars, after, outer)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _check(av[1], chars, after, outer)
+        elif op is sre_constants.GROUPREF_EXISTS:
+            _check(av[1], chars, after, outer)
+            if av[2] is not None:
+                _check(av[2], chars, after, outer)
+        elif op is getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+            # Possessive repeats and atomic groups never give back what they
+            # matched, so whatever is inside them cannot backtrack either
+            _check(av[2], chars, after, None)
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            _check(av, chars, after, None)
+        found, nullable = chars.first_of(op, av)
+        after = found | after if nullable else found
+
+
+def _describe(op, av):
+    low, high, _ = av
+    if high == sre_constants.MAXREPEAT:
+        quantifier = {0: "*", 1: "+"}.get(low, f"{{{low},}}")
+    else:
+        quantifier = f"{{{low},{high}}}"
+    return quantifier + ("?" if op is sre_constants.MIN_REPEAT else "")
+
+
+def _check_pattern(pattern, flags):
+    parsed = sre_parse.parse(pattern, flags)
+    state = parsed.state if hasattr(parsed, "state") else parsed.pattern  # Python < 3.11
+    _check(parsed, _Chars(pattern, state.flags), set(), None)
+    return True
+
+
+_checked_cache = PatternCache(max_size=256)
+
+
+def check_pattern(pattern, flags=0):
+    """静态检查正则 / Raise re.error (UnsafePatternError for ReDoS-prone constructs)"""
+    _checked_cache.get((pattern, flags), lambda: _check_pattern(pattern, flags))
+
+
+# ---- worker ------------------------------------------------------------------
+
+def _search(regex, text):
+    match = regex.search(text)
+    return None if match is None else (match.group(0), match.groups())
+
+
+# What the worker can run; results must be picklable (no Match objects)
+_OPERATIONS = {
+    "subn": lambda regex, replacement, text: regex.subn(replacement, text),
+    "search": _search,
+    "findall": lambda regex, text: regex.findall(text),
+    "split": lambda regex, text, maxsplit=0: regex.split(text, maxsplit=maxsplit),
+    # One 0/1 byte per line: whether the pattern is found in it
+    "search_mask": lambda regex, lines: bytes(regex.search(line) is not None for line in lines),
+}
+
+
+def _run_operation(pattern, flags, operation, args):
+    return _OPERATIONS[operation](re.compile(pattern, flags), *args)
+
+
+class RegexGuard:
+    """正则工作进程 / A reusable worker process that runs guarded regex calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.timeouts = 0
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+        # Spawned, not forked from the multi-threaded server; the initializer
+        # lets the worker import the pack without touching our sys.path
+        executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+            initializer=site.addsitedir, initargs=(package_parent(),)
+        )
+        try:
+            # The pid is needed to kill the worker on a timeout
+            self._pid = executor.submit(os.getpid).result(_STARTUP_TIMEOUT)
+        except FutureTimeout:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise RuntimeError("regex worker did not start") from None
+        self._executor = executor
+
+    def _stop(self):
+        if self._executor is not None:
+            try:
+                os.kill(self._pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass  # already gone
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._pid = None
+
+    def run(self, pattern, flags, operation, args, timeout):
+        """Return _OPERATIONS[operation](compiled pattern, *args), run in the
+        worker; raises RegexTimeout after timeout seconds"""
+        from concurrent.futures import TimeoutError as FutureTimeout
+        from concurrent.futures.process import BrokenProcessPool
+
+        check_pattern(pattern, flags)
+        with self._lock:
+            if self._executor is None:
+                self._start()
+            self.calls += 1
+            try:
+                future = self._executor.submit(_run_operation, pattern, flags, operation, args)
+                return future.result(timeout)
+            except FutureTimeout:
+                self._stop()
+                self.timeouts += 1
+                raise RegexTimeout(f"pattern did not finish within {timeout * 1000:g} ms") from None
+            except BrokenProcessPool:
+                # The worker died (e.g. out of memory); start over next call
+                self._stop()
+                raise RuntimeError("regex worker exited unexpectedly") from None
+
+    def shutdown(self):
+        with self._lock:
+            self._stop()
+
+    def info(self):
+        return {
+            "running": self._executor is not None,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+        }
+
+
+regex_guard = RegexGuard()
+
+
+def guarded_regex(pattern, flags, operation, *args, timeout_ms=1000):
+    """受保护的正则调用 / Run a regex operation in the worker under a time budget
+
+    operation is one of subn, search, findall, split and search_mask.
+    Raises re.error for invalid or unsafe patterns and RegexTimeout when
+    the budget runs out.
+    """
+    return regex_guard.run(pattern, flags, operation, args, timeout_ms / 1000)
+
+
+def run_regex(pattern, flags, operation, *args, timeout_ms=0):
+    """运行正则操作 / Run operation in-process, or guarded when timeout_ms > 0"""
+    if timeout_ms > 0:
+        return guarded_regex(pattern, flags, operation, *args, timeout_ms=timeout_ms)
+    return _OPERATIONS[operation](compile_regex(pattern, flags), *args)
+
+
+def regex_guard_info():
+    return regex_guard.info()
@@ -0,0 +1,114 @@
+"""
+节点注册表
+Declarative node registry and import-time report
+
+NODE_REGISTRY lists every node once: (node id, module, class, display
+name). The package builds NODE_CLASS_MAPPINGS and NODE_DISPLAY_NAME_MAPPINGS
+from it, importing each module on its first mention and timing the import.
+Nodes of the BATCH_MODULES also get a list twin (see batching) registered
+as "<node id>_Batch".
+"""
+import importlib
+import os
+import sys
+import time
+
+from .batching import batch_variant
+
+NODE_REGISTRY = (
+    # Basic String Operations
+    ("HAIGC_StringConcatenate", "string_nodes", "StringConcatenate", "String Concatenate 🔗"),
+    ("HAIGC_StringSplit", "string_nodes", "StringSplit", "String Split ✂️"),
+    ("HAIGC_StringReplace", "string_nodes", "StringReplace", "String Replace 🔄"),
+    ("HAIGC_StringTrim", "string_nodes", "StringTrim", "String Trim ✨"),
+    ("HAIGC_StringLength", "string_nodes", "StringLength", "String Length 📏"),
+    ("HAIGC_StringRepeat", "string_nodes", "StringRepeat", "String Repeat 🔁"),
+    ("HAIGC_StringSlice", "string_nodes", "StringSlice", "String Slice 🔪"),
+    ("HAIGC_StringReverse", "string_nodes", "StringReverse", "String Reverse ↩️"),
+    ("HAIGC_StringCase", "string_nodes", "StringCase", "String Case 🔤"),
+    ("HAIGC_StringContains", "string_nodes", "StringContains", "String Contains 🔍"),
+
+    # Advanced String Operations
+    ("HAIGC_StringRegexReplace", "advanced_string_nodes", "StringRegexReplace", "Regex Replace 🎯"),
+    ("HAIGC_StringRegexMatch", "advanced_string_nodes", "StringRegexMatch", "Regex Match 🎯"),
+    ("HAIGC_StringRegexSplit", "advanced_string_nodes", "StringRegexSplit", "Regex Split 🎯"),
+    ("HAIGC_StringFormat", "advanced_string_nodes", "StringFormat", "String Format 📝"),
+    ("HAIGC_StringTemplate", "advanced_string_nodes", "StringTemplate", "String Template 📋"),
+    ("HAIGC_StringJoin", "advanced_string_nodes", "StringJoin", "String Join 🔗"),
+    ("HAIGC_StringPad", "advanced_string_nodes", "StringPad", "String Pad 📦"),
+    ("HAIGC_StringRemoveChars", "advanced_string_nodes", "StringRemoveChars", "Remove Characters 🗑️"),
+    ("HAIGC_StringExtract", "advanced_string_nodes", "StringExtract", "Extract Text 📤"),
+    ("HAIGC_StringCount", "advanced_string_nodes", "StringCount", "Count Occurrences 🔢"),
+    ("HAIGC_StringMultiSearch", "advanced_string_nodes", "StringMultiSearch", "Multi-Term Search 🔎"),
+    ("HAIGC_StringBulkReplace", "advanced_string_nodes", "StringBulkReplace", "Bulk Replace 🔄"),
+    ("HAIGC_StringTemplateBatch", "advanced_string_nodes", "StringTemplateBatch", "Template Batch 📋"),
+    ("HAIGC_StringTemplateRender", "advanced_string_nodes", "StringTemplateRender", "Template Render 🧩"),
+
+    # Text Transform Operations
+    ("HAIGC_TextToLines", "text_transform_nodes", "TextToLines", "Text To Lines 📄"),
+    ("HAIGC_TextFromLines", "text_transform_nodes", "TextFromLines", "Text From Lines 📄"),
+    ("HAIGC_TextSort", "text_transform_nodes", "TextSort", "Text Sort 🔀"),
+    ("HAIGC_TextUnique", "text_transform_nodes", "TextUnique", "Text Unique 🎲"),
+    ("HAIGC_TextNearDedup", "text_transform_nodes", "TextNearDedup", "Text Near Dedup 🧬"),
+    ("HAIGC_TextFilter", "text_transform_nodes", "TextFilter", "Text Filter 🔍"),
+    ("HAIGC_TextMap", "text_transform_nodes", "TextMap", "Text Map 🗺️"),
+    ("HAIGC_TextPipeline", "text_transform_nodes", "TextPipeline", "Text Pipeline ⛓️"),
+    ("HAIGC_TextEncodeBase64", "text_transform_nodes", "TextEncodeBase64", "Encode Base64 🔐"),
+    ("HAIGC_TextDecodeBase64", "text_transform_nodes", "TextDecodeBase64", "Decode Base64 🔓"),
+    ("HAIGC_TextHash", "text_transform_nodes", "TextHash", "Text Hash #️⃣"),
+    ("HAIGC_TextRandomString", "text_transform_nodes", "TextRandomString", "Random String 🎲"),
+    ("HAIGC_TextSample", "text_transform_nodes", "TextSample", "Text Sample 🎯"),
+
+    # Text File Operations
+    ("HAIGC_TextFileSource", "text_io_nodes", "TextFileSource", "Text File Source 📂"),
+    ("HAIGC_TextFileSink", "text_io_nodes", "TextFileSink", "Text File Sink 💾"),
+
+    # Diagnostics
+    ("HAIGC_TextStats", "stats_nodes", "TextStats", "Text Stats 📊"),
+)
+
+# Modules whose nodes also get an INPUT_IS_LIST / OUTPUT_IS_LIST twin
+BATCH_MODULES = ("string_nodes", "advanced_string_nodes", "text_transform_nodes")
+
+# Seconds spent importing each node module, filled in by build_mappings
+IMPORT_REPORT = {}
+# Every class registered so far, by node id
+REGISTERED_CLASSES = {}
+
+
+def build_mappings(package, registry=NODE_REGISTRY):
+    """构建节点映射 / Build (NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS)"""
+    class_mappings = {}
+    display_mappings = {}
+    modules = {}
+
+    for node_id, module_name, class_name, display_name in registry:
+        module = modules.get(module_name)
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(f".{module_name}", package)
+            IMPORT_REPORT[module_name] = time.perf_counter() - start
+            modules[module_name] = module
+        class_mappings[node_id] = getattr(module, class_name)
+        display_mappings[node_id] = display_name
+        if module_name in BATCH_MODULES:
+            class_mappings[f"{node_id}_Batch"] = batch_variant(class_mappings[node_id])
+            display_mappings[f"{node_id}_Batch"] = f"{display_name} (Batch)"
+
+    REGISTERED_CLASSES.update(class_mappings)
+    return class_mappings, display_mappings
+
+
+def import_report():
+    """导入耗时报告 / Import time per node module, slowest first"""
+    total = sum(IMPORT_REPORT.values())
+    lines = [f"[HAIGC Text] imported {len(IMPORT_REPORT)} modules in {total * 1000:.1f} ms"]
+    for module_name, seconds in sorted(IMPORT_REPORT.items(), key=lambda item: -item[1]):
+        lines.append(f"  {module_name:<24} {seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+def report_if_requested():
+    """Print the report when HAIGC_TEXT_IMPORT_REPORT is set"""
+    if os.environ.get("HAIGC_TEXT_IMPORT_REPORT", "") not in ("", "0"):
+        print(import_report(), file=sys.stderr)
@@ -0,0 +1,178 @@
+"""
+结果缓存
+Opt-in memoization of deterministic node results
+
+Disabled by default. Enable it with the HAIGC_TEXT_CACHE_MB environment
+variable or configure_result_cache(max_mb); results are keyed on a blake2b
+digest of the node name and its inputs and held in a byte-budgeted LRU.
+"""
+import functools
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """按字节预算的LRU结果缓存 / Byte-budgeted LRU of node results"""
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self.node_stats = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def lookup(self, node, key):
+        with self._lock:
+            stats = self.node_stats.setdefault(node, [0, 0])
+            entry = self._entries.get(key)
+            if entry is None:
+                stats[1] += 1
+                return None
+            self._entries.move_to_end(key)
+            stats[0] += 1
+            return entry[0]
+
+    def store(self, key, result):
+        size = _result_size(result)
+        with self._lock:
+            # A single result larger than the whole budget is never kept
+            if size > self.max_bytes or key in self._entries:
+                return
+            self._entries[key] = (result, size)
+            self.total_bytes += size
+            self._evict()
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.evictions = 0
+            self.node_stats.clear()
+
+    def info(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "nodes": {
+                    node: {"hits": hits, "misses": misses}
+                    for node, (hits, misses) in self.node_stats.items()
+                },
+            }
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+
+result_cache = ResultCache(
+    max_bytes=int(float(os.environ.get("HAIGC_TEXT_CACHE_MB", "0")) * 1024 * 1024)
+)
+
+
+def configure_result_cache(max_mb):
+    """设置缓存预算(0为禁用) / Set the cache budget in MB, 0 disables it"""
+    result_cache.resize(int(max_mb * 1024 * 1024))
+    if not result_cache.enabled:
+        result_cache.clear()
+
+
+def result_cache_info():
+    return result_cache.info()
+
+
+def clear_result_cache():
+    result_cache.clear()
+
+
+def memoize(func=None, *, skip=None):
+    """缓存节点方法结果 / Memoize a deterministic node method
+
+    skip(arguments) may return True for calls that must not be cached,
+    e.g. a random mode. Calls with arguments that cannot be digested
+    bypass the cache.
+    """
+    if func is None:
+        return functools.partial(memoize, skip=skip)
+
+    node = func.__qualname__.split(".")[0]
+    signature = None
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        nonlocal signature
+        if not result_cache.enabled:
+            return func(self, *args, **kwargs)
+
+        if signature is None:
+            # inspect is slow to import; only pay for it once caching is on
+            import inspect
+            signature = inspect.signature(func)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        arguments.pop("self", None)
+        if skip is not None and skip(arguments):
+            return func(self, *args, **kwargs)
+
+        key = _digest(node, arguments)
+        if key is None:
+            return func(self, *args, **kwargs)
+
+        result = result_cache.lookup(node, key)
+        if result is None:
+            result = func(self, *args, **kwargs)
+            result_cache.store(key, result)
+        return result
+
+    return wrapper
+
+
+def _digest(node, arguments):
+    h = hashlib.blake2b(node.encode("utf-8"), digest_size=16)
+    for name, value in arguments.items():
+        h.update(b"\x00" + name.encode("utf-8") + b"\x00")
+        if not _feed(h, value):
+            return None
+    return h.digest()
+
+
+def _feed(h, value):
+    if isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        h.update(b"s%d:" % len(data))
+        h.update(data)
+    elif value is None or isinstance(value, (bool, int, float)):
+        h.update(b"v" + repr(value).encode("ascii") + b";")
+    elif isinstance(value, (tuple, list)):
+        h.update(b"l%d:" % len(value))
+        for item in value:
+            if not _feed(h, item):
+                return False
+    else:
+        return False
+    return True
+
+
+def _result_size(value):
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_result_size(item) for item in value)
+    return sys.getsizeof(value)
@@ -0,0 +1,80 @@
+"""
+行采样
+Single-pass sampling of lines in O(k) memory
+"""
+import heapq
+import itertools
+import math
+
+
+def reservoir_sample(lines, k, rng):
+    """蓄水池采样 / Uniform sample of k lines (Li's Algorithm L)
+
+    Returns a list of (index, line). Long runs of skipped lines are passed
+    over with islice, so only O(k log(n/k)) random numbers are drawn.
+    """
+    items = enumerate(lines)
+    reservoir = list(itertools.islice(items, k))
+    if len(reservoir) < k:
+        return reservoir
+
+    w = math.exp(math.log(1.0 - rng.random()) / k)
+    while True:
+        skip = math.floor(math.log(1.0 - rng.random()) / math.log(1.0 - w)) if w < 1.0 else 0
+        item = next(itertools.islice(items, skip, skip + 1), None)
+        if item is None:
+            return reservoir
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(1.0 - rng.random()) / k)
+
+
+def weighted_sample(weighted_lines, k, rng):
+    """加权采样 / Weighted sample without replacement (Efraimidis-Spirakis A-Res)
+
+    weighted_lines yields (line, weight); lines with weight <= 0 are never
+    picked. Returns a list of (index, line).
+    """
+    heap = []
+    for index, (line, weight) in enumerate(weighted_lines):
+        if weight <= 0:
+            continue
+        # log(u) / w orders items like u ** (1 / w) without underflow
+        key = math.log(1.0 - rng.random()) / weight
+        if len(heap) < k:
+            heapq.heappush(heap, (key, index, line))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, index, line))
+    return [(index, line) for _, index, line in heap]
+
+
+def stratified_sample(keyed_lines, k, rng):
+    """分层采样 / Uniform sample of up to k lines from every stratum
+
+    keyed_lines yields (stratum, line). Memory is O(k) per stratum.
+    Returns a list of (index, line).
+    """
+    strata = {}
+    for index, (stratum, line) in enumerate(keyed_lines):
+        entry = strata.get(stratum)
+        if entry is None:
+            entry = strata[stratum] = [0, []]
+        entry[0] += 1
+        reservoir = entry[1]
+        if len(reservoir) < k:
+            reservoir.append((index, line))
+        else:
+            slot = rng.randrange(entry[0])
+            if slot < k:
+                reservoir[slot] = (index, line)
+    return [item for _, reservoir in strata.values() for item in reservoir]
+
+
+def split_weight(line, separator):
+    """Split "text<separator>weight"; lines without a numeric weight get 1.0"""
+    if separator and separator in line:
+        text, _, weight = line.rpartition(separator)
+        try:
+            return text, float(weight)
+        except ValueError:
+            pass
+    return line, 1.0
@@ -0,0 +1,46 @@
+"""
+统计节点
+Execution Stats Node
+"""
+from . import profiling
+
+
+class TextStats:
+    """节点执行统计 / Report or control per-node execution profiling
+
+    report returns the table collected since the last reset; enable and
+    disable switch the instrumentation of all HAIGC text nodes on and off
+    (or start ComfyUI with HAIGC_TEXT_PROFILE=1); reset clears the counters.
+    """
+
+    # Never profile the node that reads the profile
+    PROFILE_EXCLUDE = True
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "action": (["report", "reset", "enable", "disable"], {"default": "report"}),
+                "output_format": (["text", "json"], {"default": "text"}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "BOOLEAN")
+    RETURN_NAMES = ("report", "enabled")
+    FUNCTION = "stats"
+    OUTPUT_NODE = True
+    CATEGORY = "HAIGC/Text/Debug"
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        # The stats change with every other node run; never reuse the output
+        return float("nan")
+
+    def stats(self, action, output_format):
+        if action == "enable":
+            profiling.enable()
+        elif action == "disable":
+            profiling.disable()
+        elif action == "reset":
+            profiling.reset()
+        return (profiling.report(output_format), profiling.is_enabled())
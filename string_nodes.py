@@ -2,6 +2,8 @@
 基础字符串操作节点
 Basic String Operation Nodes
 """
+from .result_cache import memoize
+
 
 class StringConcatenate:
     """连接多个字符串 / Concatenate multiple strings"""
@@ -23,7 +25,9 @@ class StringConcatenate:
     RETURN_TYPES = ("STRING",)
     FUNCTION = "concatenate"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本1"
     
+    @memoize
     def concatenate(self, 文本1, 文本2, 文本3="", 文本4="", 分隔符=""):
         texts = [文本1, 文本2]
         if 文本3:
@@ -32,6 +36,10 @@ class StringConcatenate:
             texts.append(文本4)
         result = 分隔符.join(texts)
         return (result,)
+    
+    def concatenate_batch(self, 文本1, 文本2, 文本3="", 文本4="", 分隔符=""):
+        tail = 分隔符.join([文本2] + [text for text in (文本3, 文本4) if text])
+        return ([text + 分隔符 + tail for text in 文本1],)
 
 
 class StringSplit:
@@ -52,6 +60,7 @@ class StringSplit:
     FUNCTION = "split"
     CATEGORY = "HAIGC/Text/Basic"
     
+    @memoize
     def split(self, 文本, 分隔符, 索引):
         parts = 文本.split(分隔符)
         count = len(parts)
@@ -83,13 +92,39 @@ class StringReplace:
     RETURN_TYPES = ("STRING",)
     FUNCTION = "replace"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本"
     
+    @memoize
     def replace(self, 文本, 旧文本, 新文本, 次数):
         if 次数 == -1:
             result = 文本.replace(旧文本, 新文本)
         else:
             result = 文本.replace(旧文本, 新文本, 次数)
         return (result,)
+    
+    def replace_batch(self, 文本, 旧文本, 新文本, 次数):
+        return ([text.replace(旧文本, 新文本, 次数) for text in 文本],)
+
+
+def trim_text(文本, 模式, 字符=""):
+    """按模式修剪 / Trim text the way StringTrim does"""
+    if 模式 == "所有空白":
+        result = " ".join(文本.split())
+    elif 字符:
+        if 模式 == "两端":
+            result = 文本.strip(字符)
+        elif 模式 == "左侧":
+            result = 文本.lstrip(字符)
+        elif 模式 == "右侧":
+            result = 文本.rstrip(字符)
+    else:
+        if 模式 == "两端":
+            result = 文本.strip()
+        elif 模式 == "左侧":
+            result = 文本.lstrip()
+        elif 模式 == "右侧":
+            result = 文本.rstrip()
+    return result
 
 
 class StringTrim:
@@ -110,25 +145,20 @@ class StringTrim:
     RETURN_TYPES = ("STRING",)
     FUNCTION = "trim"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本"
     
+    @memoize
     def trim(self, 文本, 模式, 字符=""):
-        if 模式 == "所有空白":
-            result = " ".join(文本.split())
-        elif 字符:
-            if 模式 == "两端":
-                result = 文本.strip(字符)
-            elif 模式 == "左侧":
-                result = 文本.lstrip(字符)
-            elif 模式 == "右侧":
-                result = 文本.rstrip(字符)
-        else:
-            if 模式 == "两端":
-                result = 文本.strip()
-            elif 模式 == "左侧":
-                result = 文本.lstrip()
-            elif 模式 == "右侧":
-                result = 文本.rstrip()
-        return (result,)
+        return (trim_text(文本, 模式, 字符),)
+    
+    def trim_batch(self, 文本, 模式, 字符=""):
+        strip = _STRIP_METHODS.get(模式)
+        if strip is None:
+            return ([trim_text(text, 模式, 字符) for text in 文本],)
+        return ([strip(text, 字符 or None) for text in 文本],)
+
+
+_STRIP_METHODS = {"两端": str.strip, "左侧": str.lstrip, "右侧": str.rstrip}
 
 
 class StringLength:
@@ -147,7 +177,9 @@ class StringLength:
     RETURN_NAMES = ("长度", "信息")
     FUNCTION = "get_length"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本"
     
+    @memoize
     def get_length(self, 文本, 模式):
         if 模式 == "字符":
             length = len(文本)
@@ -160,6 +192,15 @@ class StringLength:
         
         info = f"长度: {length} {模式}"
         return (length, info)
+    
+    def get_length_batch(self, 文本, 模式):
+        if 模式 == "字符":
+            lengths = list(map(len, 文本))
+        elif 模式 == "字节":
+            lengths = [len(text.encode('utf-8')) for text in 文本]
+        else:
+            return None
+        return (lengths, [f"长度: {length} {模式}" for length in lengths])
 
 
 class StringRepeat:
@@ -181,6 +222,7 @@ class StringRepeat:
     FUNCTION = "repeat"
     CATEGORY = "HAIGC/Text/Basic"
     
+    @memoize
     def repeat(self, 文本, 次数, 分隔符=""):
         if 分隔符:
             result = 分隔符.join([文本] * 次数)
@@ -206,13 +248,19 @@ class StringSlice:
     RETURN_TYPES = ("STRING",)
     FUNCTION = "slice"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本"
     
+    @memoize
     def slice(self, 文本, 起始, 结束, 步长):
         if 结束 == -1:
             result = 文本[起始::步长]
         else:
             result = 文本[起始:结束:步长]
         return (result,)
+    
+    def slice_batch(self, 文本, 起始, 结束, 步长):
+        span = slice(起始, None if 结束 == -1 else 结束, 步长)
+        return ([text[span] for text in 文本],)
 
 
 class StringReverse:
@@ -231,6 +279,7 @@ class StringReverse:
     FUNCTION = "reverse"
     CATEGORY = "HAIGC/Text/Basic"
     
+    @memoize
     def reverse(self, 文本, 模式):
         if 模式 == "字符":
             result = 文本[::-1]
@@ -243,6 +292,39 @@ class StringReverse:
         return (result,)
 
 
+def convert_case_text(文本, 模式):
+    """按模式转换大小写 / Case conversion behind StringCase and the template case filters"""
+    if 模式 == "全大写":
+        result = 文本.upper()
+    elif 模式 == "全小写":
+        result = 文本.lower()
+    elif 模式 == "标题":
+        result = 文本.title()
+    elif 模式 == "首字母大写":
+        result = 文本.capitalize()
+    elif 模式 == "大小写互换":
+        result = 文本.swapcase()
+    elif 模式 == "句子":
+        sentences = 文本.split('. ')
+        result = '. '.join(s.capitalize() for s in sentences)
+    elif 模式 == "驼峰命名":
+        words = 文本.replace('_', ' ').replace('-', ' ').split()
+        result = words[0].lower() + ''.join(w.capitalize() for w in words[1:])
+    elif 模式 == "蛇形命名":
+        import re
+        result = re.sub(r'(?<!^)(?=[A-Z])', '_', 文本).lower()
+        result = result.replace(' ', '_').replace('-', '_')
+    elif 模式 == "短横线命名":
+        import re
+        result = re.sub(r'(?<!^)(?=[A-Z])', '-', 文本).lower()
+        result = result.replace(' ', '-').replace('_', '-')
+    elif 模式 == "帕斯卡命名":
+        words = 文本.replace('_', ' ').replace('-', ' ').split()
+        result = ''.join(w.capitalize() for w in words)
+    
+    return result
+
+
 class StringCase:
     """转换字符串大小写 / Convert string case"""
     
@@ -262,37 +344,23 @@ class StringCase:
     RETURN_TYPES = ("STRING",)
     FUNCTION = "convert_case"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本"
     
+    @memoize
     def convert_case(self, 文本, 模式):
-        if 模式 == "全大写":
-            result = 文本.upper()
-        elif 模式 == "全小写":
-            result = 文本.lower()
-        elif 模式 == "标题":
-            result = 文本.title()
-        elif 模式 == "首字母大写":
-            result = 文本.capitalize()
-        elif 模式 == "大小写互换":
-            result = 文本.swapcase()
-        elif 模式 == "句子":
-            sentences = 文本.split('. ')
-            result = '. '.join(s.capitalize() for s in sentences)
-        elif 模式 == "驼峰命名":
-            words = 文本.replace('_', ' ').replace('-', ' ').split()
-            result = words[0].lower() + ''.join(w.capitalize() for w in words[1:])
-        elif 模式 == "蛇形命名":
-            import re
-            result = re.sub(r'(?<!^)(?=[A-Z])', '_', 文本).lower()
-            result = result.replace(' ', '_').replace('-', '_')
-        elif 模式 == "短横线命名":
-            import re
-            result = re.sub(r'(?<!^)(?=[A-Z])', '-', 文本).lower()
-            result = result.replace(' ', '-').replace('_', '-')
-        elif 模式 == "帕斯卡命名":
-            words = 文本.replace('_', ' ').replace('-', ' ').split()
-            result = ''.join(w.capitalize() for w in words)
-        
-        return (result,)
+        return (convert_case_text(文本, 模式),)
+    
+    def convert_case_batch(self, 文本, 模式):
+        convert = _CASE_METHODS.get(模式)
+        if convert is None:
+            return ([convert_case_text(text, 模式) for text in 文本],)
+        return (list(map(convert, 文本)),)
+
+
+_CASE_METHODS = {
+    "全大写": str.upper, "全小写": str.lower, "标题": str.title,
+    "首字母大写": str.capitalize, "大小写互换": str.swapcase,
+}
 
 
 class StringContains:
@@ -312,7 +380,9 @@ class StringContains:
     RETURN_NAMES = ("包含", "结果", "位置")
     FUNCTION = "contains"
     CATEGORY = "HAIGC/Text/Basic"
+    BATCH_INPUT = "文本"
     
+    @memoize
     def contains(self, 文本, 搜索, 区分大小写):
         if not 区分大小写:
             text_check = 文本.lower()
@@ -326,3 +396,11 @@ class StringContains:
         position = text_check.find(search_check)
         
         return (contains, result, position)
+    
+    def contains_batch(self, 文本, 搜索, 区分大小写):
+        if not 区分大小写:
+            搜索 = 搜索.lower()
+            文本 = [text.lower() for text in 文本]
+        positions = [text.find(搜索) for text in 文本]
+        found = [position != -1 for position in positions]
+        return (found, ["是" if contains else "否" for contains in found], positions)
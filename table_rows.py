@@ -0,0 +1,51 @@
+"""
+变量表读取
+Stream rows of a CSV/TSV/JSONL variable table as dicts
+"""
+import csv
+import io
+import json
+
+TABLE_FORMATS = ["csv", "tsv", "jsonl"]
+
+
+def iter_rows(text="", path="", table_format="csv", encoding="utf-8"):
+    """逐行读取变量表 / Yield each row of a table as a {column: str} dict
+
+    Rows are read one at a time from path when it is given, otherwise from
+    text. CSV/TSV take their column names from the header row; each JSONL
+    line must be an object, and non-string values are written as JSON.
+    """
+    if path:
+        with open(path, "r", encoding=encoding, newline="") as f:
+            yield from _parse(f, table_format)
+    else:
+        yield from _parse(io.StringIO(text, newline=""), table_format)
+
+
+def _parse(f, table_format):
+    if table_format == "jsonl":
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"JSONL line {number} is not an object")
+            yield {key: value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+                   for key, value in row.items()}
+    elif table_format in ("csv", "tsv"):
+        # csv.reader + zip instead of DictReader, which is several times slower
+        reader = csv.reader(f, delimiter="\t" if table_format == "tsv" else ",")
+        header = next(reader, None)
+        if header is None:
+            return
+        width = len(header)
+        for values in reader:
+            if not values:
+                continue
+            # Missing trailing cells are empty; extra cells are dropped
+            if len(values) < width:
+                values += [""] * (width - len(values))
+            yield dict(zip(header, values))
+    else:
+        raise ValueError(f"Unknown table format: {table_format}")
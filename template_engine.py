@@ -0,0 +1,714 @@
+"""
+模板引擎
+Small sandboxed template language compiled to Python render functions
+
+    {{ name }}   {{ subject.pose | lower }}   {{ tags | join(", ") }}
+    {{ style | default("photo") | upper }}
+    {% if quality == "high" and not draft %}...{% elif x %}...{% else %}...{% endif %}
+    {% for tag in tags %}{{ loop.index }}. {{ tag }}{% else %}none{% endfor %}
+    {% set sep = ", " %}   {# comment #}
+    {{- x -}} and {%- ... -%} strip the whitespace before / after the tag
+
+A template is parsed once and turned into the source of a single Python
+function that joins f-strings, compiled and cached by template source.
+The generated code runs without builtins, reads variables only through
+dict keys and list indexes and calls only the filters in FILTERS, so a
+template cannot reach Python attributes, functions or imports.
+"""
+import ast
+import json
+import re
+import threading
+
+from .pattern_cache import PatternCache
+
+
+class TemplateSyntaxError(ValueError):
+    """模板语法错误 / Template syntax error with its line number"""
+
+    def __init__(self, message, line):
+        super().__init__(f"{message} (line {line})")
+        self.line = line
+
+
+class UndefinedError(KeyError):
+    """严格模式下的未定义变量 / Undefined variable in strict mode"""
+
+    def __str__(self):
+        # KeyError would show the repr of the name
+        return f"{self.args[0]!r} is undefined"
+
+
+class _Undefined:
+    """Value of a missing variable: renders as "", is falsy and iterates as empty"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return ""
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __contains__(self, item):
+        return False
+
+    def __repr__(self):
+        return f"Undefined({self.name!r})"
+
+
+UNDEFINED = _Undefined()
+
+
+def to_str(value):
+    """How a value is rendered: JSON spelling for bools, lists and objects"""
+    if value.__class__ is str:
+        return value
+    if value is None or value.__class__ is _Undefined:
+        return ""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _to_str_strict(value):
+    if value.__class__ is _Undefined:
+        raise UndefinedError(value.name or "undefined value")
+    return to_str(value)
+
+
+def _get(obj, key):
+    """obj.key / obj[key]: dict keys and sequence indexes only, never attributes"""
+    if isinstance(obj, dict):
+        return obj[key] if key in obj else _Undefined(key)
+    if isinstance(obj, (list, tuple, str)) and isinstance(key, int) and not isinstance(key, bool):
+        try:
+            return obj[key]
+        except IndexError:
+            pass
+    # Keep the name of an undefined parent for strict-mode errors
+    return obj if isinstance(obj, _Undefined) else _Undefined(key)
+
+
+def _seq(value):
+    if isinstance(value, (list, tuple)):
+        return value
+    if isinstance(value, dict):
+        return list(value)
+    if value is None or value.__class__ is _Undefined:
+        return ()
+    if isinstance(value, str):
+        return list(value)
+    raise TypeError(f"cannot loop over {type(value).__name__}")
+
+
+# ---- filters ---------------------------------------------------------------
+
+_CASE_FILTERS = {
+    "upper": "全大写", "lower": "全小写", "title": "标题", "capitalize": "首字母大写",
+    "swapcase": "大小写互换", "sentence": "句子", "camel": "驼峰命名", "snake": "蛇形命名",
+    "kebab": "短横线命名", "pascal": "帕斯卡命名",
+}
+_TRIM_FILTERS = {"trim": "两端", "ltrim": "左侧", "rtrim": "右侧", "squeeze": "所有空白"}
+_PAD_FILTERS = {"ljust": "left", "rjust": "right", "center": "center"}
+
+
+def _default(value, fallback="", boolean=False):
+    if value is None or value.__class__ is _Undefined or value == "" or (boolean and not value):
+        return fallback
+    return value
+
+
+def _join(value, separator=""):
+    if isinstance(value, (list, tuple)):
+        return separator.join(map(to_str, value))
+    return to_str(value)
+
+
+def _truncate(value, length=255, end="..."):
+    text = to_str(value)
+    if len(text) <= length:
+        return text
+    # Never return more than length characters, even for a long end marker
+    return (text[:max(0, length - len(end))] + end)[:length]
+
+
+def _first(value):
+    return value[0] if isinstance(value, (list, tuple, str)) and value else UNDEFINED
+
+
+def _last(value):
+    return value[-1] if isinstance(value, (list, tuple, str)) and value else UNDEFINED
+
+
+def _split(value, separator=None):
+    text = to_str(value)
+    return [part.strip() for part in text.split(separator)] if separator else text.split()
+
+
+def _number(cast):
+    def convert(value, fallback=0):
+        try:
+            return cast(float(value)) if cast is int else cast(value)
+        except (TypeError, ValueError):
+            return fallback
+    return convert
+
+
+def _case_filter(convert, mode):
+    def case(value):
+        text = to_str(value)
+        # The camelCase conversion needs at least one word
+        return convert(text, mode) if text.strip() else text
+    return case
+
+
+FILTERS = {}
+_filters_lock = threading.Lock()
+
+
+def _load_filters():
+    """Fill FILTERS on first compile; the case, trim and pad filters call the
+    same functions as the StringCase, StringTrim and StringPad nodes"""
+    with _filters_lock:
+        if FILTERS:
+            return FILTERS
+        from .advanced_string_nodes import pad_text
+        from .string_nodes import convert_case_text, trim_text
+
+        filters = {}
+        for name, mode in _CASE_FILTERS.items():
+            filters[name] = _case_filter(convert_case_text, mode)
+        for name, mode in _TRIM_FILTERS.items():
+            filters[name] = lambda value, chars="", mode=mode: trim_text(to_str(value), mode, chars)
+        for name, mode in _PAD_FILTERS.items():
+            filters[name] = lambda value, width, fill=" ", mode=mode: pad_text(to_str(value), width, mode, fill)
+        filters.update({
+            "default": _default,
+            "join": _join,
+            "length": lambda value: len(value) if isinstance(value, (str, list, tuple, dict)) else 0,
+            "replace": lambda value, old, new, count=-1: to_str(value).replace(old, new, count),
+            "truncate": _truncate,
+            "first": _first,
+            "last": _last,
+            "split": _split,
+            "items": lambda value: [[k, v] for k, v in value.items()] if isinstance(value, dict) else [],
+            "string": to_str,
+            "int": _number(int),
+            "float": _number(float),
+        })
+        FILTERS.update(filters)
+        return FILTERS
+
+
+# ---- parsing ---------------------------------------------------------------
+
+_TAG_OPEN = re.compile(r"\{\{-?|\{%-?|\{#-?")
+_CLOSERS = {"{{": "}}", "{%": "%}", "{#": "#}"}
+_EXPR_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[^\W\d]\w*)
+      | (?P<op>==|!=|<=|>=|[<>|().,\[\]=])
+    )""", re.VERBOSE)
+_KEYWORDS = {"and", "or", "not", "in", "true", "false", "none", "True", "False", "None"}
+_LITERALS = {"true": True, "false": False, "none": None, "True": True, "False": False, "None": None}
+_COMPARE = {"==", "!=", "<", ">", "<=", ">=", "in"}
+
+
+def _tokenize(source):
+    """Split a template into ("text" | "expr" | "stmt", content, line) tokens"""
+    tokens = []
+    pos = 0
+    line = 1
+    strip_next = False
+    while True:
+        match = _TAG_OPEN.search(source, pos)
+        text_end = match.start() if match else len(source)
+        text = source[pos:text_end]
+        if strip_next:
+            text = text.lstrip()
+        if match and match.group().endswith("-"):
+            text = text.rstrip()
+        if text:
+            tokens.append(("text", text, line))
+        line += source.count("\n", pos, text_end)
+        if match is None:
+            return tokens
+
+        opener = match.group()[:2]
+        close = source.find(_CLOSERS[opener], match.end())
+        if close < 0:
+            raise TemplateSyntaxError(f"unclosed '{opener}'", line)
+        inner = source[match.end():close]
+        strip_next = inner.endswith("-")
+        if strip_next:
+            inner = inner[:-1]
+        if opener == "{{":
+            tokens.append(("expr", inner.strip(), line))
+        elif opener == "{%":
+            tokens.append(("stmt", inner.strip(), line))
+        line += source.count("\n", text_end, close)
+        pos = close + 2
+
+
+class _ExprParser:
+    """Recursive-descent parser for expressions, producing tuple ASTs"""
+
+    def __init__(self, text, line):
+        self.line = line
+        self.tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _EXPR_TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                raise TemplateSyntaxError(f"unexpected {text[pos:].strip()[:20]!r}", line)
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "name" and value in _KEYWORDS:
+                kind = "keyword"
+            self.tokens.append((kind, value))
+            pos = match.end()
+        self.pos = 0
+
+    def error(self, message):
+        return TemplateSyntaxError(message, self.line)
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, value=None, kind=None):
+        token = self.peek()
+        if (value is not None and token[1] != value) or (kind is not None and token[0] != kind):
+            expected = value or kind
+            found = token[1] if token[1] is not None else "end of expression"
+            raise self.error(f"expected {expected!r}, found {found!r}")
+        self.pos += 1
+        return token[1]
+
+    def at(self, value):
+        token = self.peek()
+        return token[0] in ("op", "keyword") and token[1] == value
+
+    def done(self):
+        if self.pos != len(self.tokens):
+            raise self.error(f"unexpected {self.peek()[1]!r}")
+
+    def expression(self):
+        node = self.and_expr()
+        while self.at("or"):
+            self.pos += 1
+            node = ("or", node, self.and_expr())
+        return node
+
+    def and_expr(self):
+        node = self.not_expr()
+        while self.at("and"):
+            self.pos += 1
+            node = ("and", node, self.not_expr())
+        return node
+
+    def not_expr(self):
+        if self.at("not"):
+            self.pos += 1
+            return ("not", self.not_expr())
+        return self.comparison()
+
+    def comparison(self):
+        node = self.filtered()
+        if self.at("not") and self.peek(1)[1] == "in":
+            self.pos += 2
+            return ("cmp", "not in", node, self.filtered())
+        token = self.peek()
+        if token[0] in ("op", "keyword") and token[1] in _COMPARE:
+            self.pos += 1
+            return ("cmp", token[1], node, self.filtered())
+        return node
+
+    def filtered(self):
+        node = self.postfix()
+        while self.at("|"):
+            self.pos += 1
+            name = self.take(kind="name")
+            if name not in _load_filters():
+                raise self.error(f"unknown filter {name!r}")
+            args = []
+            if self.at("("):
+                self.pos += 1
+                while not self.at(")"):
+                    args.append(self.expression())
+                    if not self.at(")"):
+                        self.take(",")
+                self.take(")")
+            node = ("filter", name, node, args)
+        return node
+
+    def postfix(self):
+        node = self.primary()
+        while True:
+            if self.at("."):
+                self.pos += 1
+                kind, value = self.peek()
+                if kind == "number" and value.isdigit():
+                    self.pos += 1
+                    node = ("get", node, ("lit", int(value)))
+                else:
+                    node = ("get", node, ("lit", self.take(kind="name")))
+            elif self.at("["):
+                self.pos += 1
+                node = ("get", node, self.expression())
+                self.take("]")
+            else:
+                return node
+
+    def primary(self):
+        kind, value = self.peek()
+        if kind is None:
+            raise self.error("expected a value, found end of expression")
+        self.pos += 1
+        if kind == "string":
+            return ("lit", ast.literal_eval(value))
+        if kind == "number":
+            return ("lit", float(value) if "." in value else int(value))
+        if kind == "keyword" and value in _LITERALS:
+            return ("lit", _LITERALS[value])
+        if kind == "name":
+            return ("name", value)
+        if value == "(":
+            node = self.expression()
+            self.take(")")
+            return node
+        if value == "[":
+            items = []
+            while not self.at("]"):
+                items.append(self.expression())
+                if not self.at("]"):
+                    self.take(",")
+            self.take("]")
+            return ("list", items)
+        raise self.error(f"unexpected {value!r}")
+
+
+def _parse_expression(text, line):
+    parser = _ExprParser(text, line)
+    node = parser.expression()
+    parser.done()
+    return node
+
+
+def _parse(tokens):
+    """Build the statement tree: text, out, if, for and set nodes"""
+    root = []
+    body = root
+    # Open blocks: (kind, node, line, body to return to on end)
+    stack = []
+
+    for kind, content, line in tokens:
+        if kind == "text":
+            body.append(("text", content))
+            continue
+        if kind == "expr":
+            body.append(("out", _parse_expression(content, line)))
+            continue
+
+        word, _, rest = content.partition(" ")
+        rest = rest.strip()
+        if word == "if":
+            node = ("if", [(_parse_expression(rest, line), [])], [])
+            body.append(node)
+            stack.append(("if", node, line, body))
+            body = node[1][0][1]
+        elif word == "elif":
+            if not stack or stack[-1][0] != "if" or body is stack[-1][1][2]:
+                raise TemplateSyntaxError("'elif' outside 'if'", line)
+            branch = (_parse_expression(rest, line), [])
+            stack[-1][1][1].append(branch)
+            body = branch[1]
+        elif word == "else":
+            if not stack:
+                raise TemplateSyntaxError("'else' outside a block", line)
+            block_kind, node = stack[-1][:2]
+            body = node[2] if block_kind == "if" else node[4]
+        elif word == "for":
+            targets, sep, iterable = rest.partition(" in ")
+            names = [name.strip() for name in targets.split(",")]
+            if not sep or not all(_is_name(name) for name in names):
+                raise TemplateSyntaxError(f"invalid for loop: {content!r}", line)
+            node = ("for", names, _parse_expression(iterable, line), [], [])
+            body.append(node)
+            stack.append(("for", node, line, body))
+            body = node[3]
+        elif word == "set":
+            name, sep, value = rest.partition("=")
+            if not sep or not _is_name(name.strip()):
+                raise TemplateSyntaxError(f"invalid set: {content!r}", line)
+            body.append(("set", name.strip(), _parse_expression(value, line)))
+        elif word in ("endif", "endfor"):
+            if not stack or stack[-1][0] != word[3:]:
+                raise TemplateSyntaxError(f"unexpected '{word}'", line)
+            body = stack.pop()[3]
+        else:
+            raise TemplateSyntaxError(f"unknown tag {word!r}", line)
+
+    if stack:
+        raise TemplateSyntaxError(f"'{stack[-1][0]}' is never closed", stack[-1][2])
+    return root
+
+
+def _is_name(text):
+    return re.fullmatch(r"[^\W\d]\w*", text) is not None and text not in _KEYWORDS
+
+
+# ---- code generation -------------------------------------------------------
+
+class _CodeGen:
+    """Turn the statement tree into the source of render(ctx)"""
+
+    def __init__(self, strict):
+        self.strict = strict
+        self.lines = []
+        self.constants = {}
+        self.free = {}
+        self.scopes = []
+        # Per scope: [first line of its body, indent, depth of if branches]
+        self.scope_starts = []
+        self.counter = 0
+        self.used_filters = set()
+
+    def var(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value):
+        name = self.constants.get(value)
+        if name is None:
+            name = self.constants[value] = f"k{len(self.constants)}"
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def name(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        var = self.free.get(name)
+        if var is None:
+            var = self.free[name] = self.var("c")
+        return var
+
+    def expr(self, node):
+        kind = node[0]
+        if kind == "lit":
+            value = node[1]
+            return self.constant(value) if isinstance(value, str) else repr(value)
+        if kind == "name":
+            return self.name(node[1])
+        if kind == "get":
+            return f"_get({self.expr(node[1])}, {self.expr(node[2])})"
+        if kind == "filter":
+            _, name, value, args = node
+            self.used_filters.add(name)
+            return f"f_{name}({', '.join([self.expr(value)] + [self.expr(arg) for arg in args])})"
+        if kind == "not":
+            return f"(not {self.expr(node[1])})"
+        if kind in ("and", "or"):
+            return f"({self.expr(node[1])} {kind} {self.expr(node[2])})"
+        if kind == "cmp":
+            return f"({self.expr(node[2])} {node[1]} {self.expr(node[3])})"
+        if kind == "list":
+            return f"[{', '.join(self.expr(item) for item in node[1])}]"
+        raise ValueError(f"unknown expression {kind}")
+
+    def fstring(self, pieces):
+        """One f-string for a run of text and output nodes"""
+        parts = []
+        for node in pieces:
+            if node[0] == "text":
+                parts.append(node[1].replace("{", "{{").replace("}", "}}"))
+            else:
+                # Expressions hold no quotes or backslashes: strings are constants
+                parts.append("{_s(" + self.expr(node[1]) + ")}")
+        return "f" + repr("".join(parts))
+
+    def block(self, nodes, indent):
+        run = []
+        for node in nodes:
+            if node[0] in ("text", "out"):
+                run.append(node)
+                continue
+            if run:
+                self.emit(indent, f"w({self.fstring(run)})")
+                run = []
+            getattr(self, "stmt_" + node[0])(node, indent)
+        if run:
+            self.emit(indent, f"w({self.fstring(run)})")
+
+    def body(self, nodes, indent):
+        start = len(self.lines)
+        self.block(nodes, indent)
+        if len(self.lines) == start:
+            self.emit(indent, "pass")
+
+    def push_scope(self, scope, indent):
+        self.scopes.append(scope)
+        self.scope_starts.append([len(self.lines), indent, 0])
+
+    def pop_scope(self):
+        self.scopes.pop()
+        self.scope_starts.pop()
+
+    def stmt_if(self, node, indent):
+        # if is not a scope, but a set inside it may not run (see stmt_set)
+        self.scope_starts[-1][2] += 1
+        for index, (condition, nodes) in enumerate(node[1]):
+            self.emit(indent, f"{'if' if index == 0 else 'elif'} {self.expr(condition)}:")
+            self.body(nodes, indent + 1)
+        if node[2]:
+            self.emit(indent, "else:")
+            self.body(node[2], indent + 1)
+        self.scope_starts[-1][2] -= 1
+
+    def stmt_for(self, node, indent):
+        _, names, iterable, nodes, else_nodes = node
+        seq = self.var("s")
+        self.emit(indent, f"{seq} = _seq({self.expr(iterable)})")
+        scope = {name: self.var("l") for name in names}
+        uses_loop = _mentions(nodes, "loop")
+        item = scope[names[0]] if len(names) == 1 else self.var("t")
+        if uses_loop:
+            index = self.var("i")
+            count = self.var("n")
+            scope["loop"] = self.var("loop")
+            self.emit(indent, f"{count} = len({seq})")
+            self.emit(indent, f"for {index}, {item} in enumerate({seq}):")
+            self.emit(indent + 1, f"{scope['loop']} = {{{self.constant('index')}: {index} + 1, "
+                                  f"{self.constant('index0')}: {index}, {self.constant('first')}: {index} == 0, "
+                                  f"{self.constant('last')}: {index} == {count} - 1, "
+                                  f"{self.constant('length')}: {count}}}")
+        else:
+            self.emit(indent, f"for {item} in {seq}:")
+        if len(names) > 1:
+            self.emit(indent + 1, f"{', '.join(scope[name] for name in names)} = {item}")
+        self.push_scope(scope, indent + 1)
+        self.body(nodes, indent + 1)
+        self.pop_scope()
+        if else_nodes:
+            self.emit(indent, f"if not {seq}:")
+            self.body(else_nodes, indent + 1)
+
+    def stmt_set(self, node, indent):
+        value = self.expr(node[2])
+        name = node[1]
+        var = self.scopes[-1].get(name)
+        if var is None:
+            start, scope_indent, branches = self.scope_starts[-1]
+            if branches:
+                # Until the branch runs the name keeps its earlier value (an
+                # outer variable or the context), so bind that first
+                earlier = self.name(name)
+                var = self.var("v")
+                self.lines.insert(start, "    " * scope_indent + f"{var} = {earlier}")
+            else:
+                var = self.var("v")
+            self.scopes[-1][name] = var
+        self.emit(indent, f"{var} = {value}")
+
+    def generate(self, tree):
+        self.push_scope({}, 1)
+        if all(node[0] in ("text", "out") for node in tree):
+            # No control flow: the whole template is one f-string
+            body = [f"    return {self.fstring(tree) if tree else repr('')}"]
+        else:
+            self.block(tree, 1)
+            body = ["    out = []", "    w = out.append"] + self.lines + ["    return ''.join(out)"]
+        # A missing variable becomes an Undefined that remembers its name
+        head = [f"    {var} = ctx.get({self.constant(name)}) if {self.constant(name)} in ctx "
+                f"else U({self.constant(name)})" for name, var in self.free.items()]
+        return "\n".join(["def render(ctx):"] + head + body)
+
+
+def _mentions(nodes, name):
+    """True if any expression in the statement tree refers to name"""
+    def in_expr(node):
+        if node[0] == "name":
+            return node[1] == name
+        return any(in_expr(child) for child in node[1:] if isinstance(child, tuple)) or any(
+            in_expr(item) for child in node[1:] if isinstance(child, list) for item in child)
+
+    for node in nodes:
+        kind = node[0]
+        if kind == "out" and in_expr(node[1]):
+            return True
+        if kind == "set" and in_expr(node[2]):
+            return True
+        if kind == "if" and any(in_expr(cond) or _mentions(body, name) for cond, body in node[1]):
+            return True
+        if kind == "if" and _mentions(node[2], name):
+            return True
+        if kind == "for" and (in_expr(node[2]) or _mentions(node[3], name) or _mentions(node[4], name)):
+            return True
+    return False
+
+
+class CompiledTemplate:
+    """编译后的模板 / A template compiled to a render function"""
+
+    def __init__(self, source, strict=False):
+        filters = _load_filters()
+        try:
+            tree = _parse(_tokenize(source))
+            generator = _CodeGen(strict)
+            self.code = generator.generate(tree)
+        except ValueError as e:
+            if isinstance(e, TemplateSyntaxError):
+                raise
+            raise TemplateSyntaxError(str(e), 0) from None
+
+        namespace = {
+            "__builtins__": {},
+            "U": _Undefined,
+            # strict only fails when an undefined value is rendered, so
+            # default() and {% if %} still see it
+            "_s": _to_str_strict if strict else to_str,
+            "_get": _get,
+            "_seq": _seq,
+            "len": len,
+            "enumerate": enumerate,
+        }
+        namespace.update((f"f_{name}", filters[name]) for name in generator.used_filters)
+        namespace.update((name, value) for value, name in generator.constants.items())
+        exec(compile(self.code, "<template>", "exec"), namespace)
+        self._render = namespace["render"]
+        self.source = source
+
+    def render(self, variables):
+        return self._render(variables)
+
+
+_template_cache = PatternCache(max_size=256)
+
+
+def compile_template(source, strict=False):
+    """编译(缓存的)模板 / Build or fetch the compiled template for a source"""
+    return _template_cache.get((source, strict), lambda: CompiledTemplate(source, strict))
+
+
+def render_template(source, variables, strict=False):
+    return compile_template(source, strict).render(variables)
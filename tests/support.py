@@ -0,0 +1,26 @@
+"""
+测试辅助
+Import the pack by its directory name, the way ComfyUI loads custom nodes
+
+Spawned worker processes (regex guard, process pool) re-import the pack by
+that name, so the directory holding it has to be importable.
+"""
+import importlib
+import os
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+
+package = importlib.import_module(os.path.basename(PACKAGE_DIR))
+
+
+def module(name):
+    """A submodule of the pack, e.g. module("regex_guard")"""
+    return importlib.import_module(f"{package.__name__}.{name}")
+
+
+def node(node_id):
+    """An instance of a registered node, e.g. node("HAIGC_TextFilter")"""
+    return package.NODE_CLASS_MAPPINGS[node_id]()
@@ -0,0 +1,46 @@
+import random
+
+from support import module
+
+aho_corasick = module("aho_corasick")
+
+
+def leftmost_longest(terms, text):
+    """Reference: at each free position take the longest term starting there"""
+    terms = list(dict.fromkeys(term for term in terms if term))
+    matches = []
+    pos = 0
+    while pos < len(text):
+        found = [i for i, term in enumerate(terms) if text.startswith(term, pos)]
+        if found:
+            index = max(found, key=lambda i: len(terms[i]))
+            matches.append((pos, index))
+            pos += len(terms[index])
+        else:
+            pos += 1
+    return matches
+
+
+def test_overlapping_terms():
+    automaton = aho_corasick.Automaton(["ab", "c", "abcd", "bcd", "abcde"])
+    assert list(automaton.iter_leftmost_longest("abcx abcd abcdef")) == [
+        (0, 0), (2, 1), (5, 2), (10, 4)]
+
+
+def test_matches_reference_on_random_input():
+    rng = random.Random(7)
+    for _ in range(3000):
+        terms = ["".join(rng.choice("abc") for _ in range(rng.randint(0, 5)))
+                 for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 30)))
+        automaton = aho_corasick.Automaton(terms)
+        assert list(automaton.iter_leftmost_longest(text)) == leftmost_longest(terms, text), (terms, text)
+
+
+def test_matches_are_emitted_before_the_end_of_the_text():
+    def text():
+        yield from "xabx"
+        raise AssertionError("read past the first match")
+
+    matches = aho_corasick.Automaton(["ab", "abc"]).iter_leftmost_longest(text())
+    assert next(matches) == (1, 0)
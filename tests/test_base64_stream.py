@@ -0,0 +1,82 @@
+import base64
+import binascii
+import random
+
+import pytest
+
+from support import module, node
+
+base64_stream = module("base64_stream")
+
+CHUNK_SIZE = base64_stream.CHUNK_SIZE
+
+
+def b64decode_or_error(data):
+    try:
+        return base64.b64decode(data)
+    except binascii.Error:
+        return binascii.Error
+
+
+def decode_chunks_or_error(chunks):
+    try:
+        return b"".join(base64_stream.decode_chunks(chunks))
+    except binascii.Error:
+        return binascii.Error
+
+
+def test_padding_mid_stream_ends_the_input():
+    assert b"".join(base64_stream.decode_chunks([b"YQ==", b"YWJj"])) == b"a"
+    assert b"".join(base64_stream.decode_chunks([b"YQ=", b"=YWJj"])) == b"a"
+
+
+def test_decode_matches_b64decode_for_any_split():
+    rng = random.Random(12)
+    for _ in range(20000):
+        data = bytes(rng.choice(b"YWJjQ=== \n") for _ in range(rng.randint(0, 14)))
+        cuts = sorted(rng.sample(range(len(data) + 1), rng.randint(0, min(4, len(data) + 1))))
+        chunks = [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+        assert decode_chunks_or_error(chunks) == b64decode_or_error(data), chunks
+
+
+@pytest.mark.parametrize("shift", range(5))
+def test_padding_across_a_chunk_boundary(shift):
+    # Skipped spaces move "YQ==" across the end of the node's first slice
+    text = "AAAA" * (CHUNK_SIZE // 4 - 1) + " " * shift + "YQ==YWJj"
+    result = node("HAIGC_TextDecodeBase64").decode(text, "latin-1")[0]
+    assert result == "\0" * (CHUNK_SIZE // 4 * 3 - 3) + "a"
+
+
+ENCODERS = {
+    "standard": base64.b64encode,
+    "urlsafe": base64.urlsafe_b64encode,
+    "mime": base64.encodebytes,
+}
+
+
+def payload(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.mark.parametrize("variant", ["standard", "urlsafe", "mime"])
+def test_text_round_trip_beyond_one_chunk(variant):
+    text = payload(2 * CHUNK_SIZE + 1001).decode("latin-1")
+    encoded = node("HAIGC_TextEncodeBase64").encode(text, "latin-1", variant)[0]
+    assert encoded == ENCODERS[variant](text.encode("latin-1")).decode("ascii")
+    assert node("HAIGC_TextDecodeBase64").decode(encoded, "latin-1", variant)[0] == text
+
+
+@pytest.mark.parametrize("variant", ["urlsafe", "mime"])
+@pytest.mark.parametrize("size", [CHUNK_SIZE, 3 * CHUNK_SIZE + 2])
+def test_file_round_trip_beyond_one_chunk(tmp_path, variant, size):
+    data = payload(size, seed=size)
+    source = tmp_path / "source.bin"
+    source.write_bytes(data)
+    encoded_path = node("HAIGC_TextEncodeBase64").encode(
+        "", "utf-8", variant, str(source), str(tmp_path / "encoded.txt"))[1]
+    with open(encoded_path, "rb") as f:
+        assert f.read() == ENCODERS[variant](data)
+    decoded_path = node("HAIGC_TextDecodeBase64").decode(
+        "", "utf-8", variant, encoded_path, str(tmp_path / "decoded.bin"))[1]
+    with open(decoded_path, "rb") as f:
+        assert f.read() == data
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from support import package
+
+# Nodes whose output depends on more than their inputs
+NONDETERMINISTIC = {"HAIGC_TextRandomString"}
+TEXTS = ["  Hello World. second line  ", "a-b_c Snake Case\nline two", "", "x" * 50 + " 123 abc ABC"]
+
+
+def scalar_and_batch(node_id):
+    classes = package.NODE_CLASS_MAPPINGS
+    return classes[node_id](), classes[f"{node_id}_Batch"]()
+
+
+def default_inputs(cls):
+    inputs = {}
+    for section in ("required", "optional"):
+        for name, spec in cls.INPUT_TYPES().get(section, {}).items():
+            kind = spec[0]
+            options = spec[1] if len(spec) > 1 else {}
+            if isinstance(kind, list):
+                inputs[name] = options.get("default", kind[0])
+            elif "default" in options:
+                inputs[name] = options["default"]
+    if "seed" in inputs:
+        inputs["seed"] = 7
+    return inputs
+
+
+def text_input(cls):
+    required = cls.INPUT_TYPES()["required"]
+    return next(name for name, spec in required.items() if spec[0] == "STRING")
+
+
+def per_element(node, inputs):
+    """What ComfyUI's own list mapping would return for a plain node"""
+    size = max(len(column) for column in inputs.values())
+    rows = [{name: column[min(i, len(column) - 1)] for name, column in inputs.items()} for i in range(size)]
+    results = [getattr(node, node.FUNCTION)(**row) for row in rows]
+    return tuple(list(values) for values in zip(*results))
+
+
+def outcome(call, **inputs):
+    """The outputs, or the exception type for inputs the scalar node rejects"""
+    try:
+        return call(**inputs)
+    except Exception as e:
+        return type(e)
+
+
+def materialize(outputs):
+    # Streams compare by their lines
+    return [[list(value) if hasattr(value, "pipe") else value for value in column] for column in outputs]
+
+
+BATCH_IDS = sorted(node_id[:-len("_Batch")] for node_id in package.NODE_CLASS_MAPPINGS
+                   if node_id.endswith("_Batch") and node_id[:-len("_Batch")] not in NONDETERMINISTIC)
+
+
+@pytest.mark.parametrize("node_id", BATCH_IDS)
+def test_twin_matches_scalar_node_per_element(node_id):
+    node, batch = scalar_and_batch(node_id)
+    inputs = {name: [value] for name, value in default_inputs(type(node)).items()}
+    inputs[text_input(type(node))] = TEXTS
+    assert materialize(batch.run_batch(**inputs)) == materialize(per_element(node, inputs))
+
+
+def test_shorter_lists_are_broadcast():
+    node, batch = scalar_and_batch("HAIGC_StringReplace")
+    inputs = {"文本": ["aa", "ba", "ca"], "旧文本": ["a", "c"], "新文本": ["-"], "次数": [-1, 1, 0]}
+    assert batch.run_batch(**inputs) == per_element(node, inputs) == (["--", "ba", "ca"],)
+
+
+def test_empty_list_gives_empty_outputs():
+    _, batch = scalar_and_batch("HAIGC_StringLength")
+    assert batch.run_batch(文本=[], 模式=["字符"]) == ([], [])
+
+
+KERNEL_CASES = {
+    "HAIGC_StringConcatenate": [{"文本2": "b", "文本3": "", "文本4": "d", "分隔符": ", "},
+                                {"文本2": "", "分隔符": ""}],
+    "HAIGC_StringReplace": [{"旧文本": "a", "新文本": "AA", "次数": count} for count in (-1, 0, 1, 2)]
+                           + [{"旧文本": "", "新文本": "|", "次数": -1}],
+    "HAIGC_StringTrim": [{"模式": mode, "字符": chars} for mode in ("两端", "左侧", "右侧", "所有空白")
+                         for chars in ("", " ab")],
+    "HAIGC_StringLength": [{"模式": mode} for mode in ("字符", "单词", "行", "字节")],
+    "HAIGC_StringSlice": [{"起始": start, "结束": end, "步长": step}
+                          for start, end, step in ((0, -1, 1), (2, 5, 1), (-3, -1, -1), (1, 40, 3))],
+    "HAIGC_StringCase": [{"模式": mode} for mode in ("全大写", "全小写", "标题", "首字母大写", "大小写互换",
+                                                    "句子", "驼峰命名", "蛇形命名", "短横线命名", "帕斯卡命名")],
+    "HAIGC_StringContains": [{"搜索": search, "区分大小写": case} for search in ("a", "AB", "", "zz")
+                             for case in (True, False)],
+    "HAIGC_StringRegexReplace": [{"正则表达式": pattern, "替换为": replacement, "标志": flags}
+                                 for pattern, replacement in ((r"a+", "#"), (r"(\w)(\w)", r"\2\1"),
+                                                              (r"^", ">"), (r"(", "x"), (r"a", r"\9"))
+                                 for flags in ("无", "忽略大小写|多行")],
+    "HAIGC_StringRemoveChars": [{"chars_to_remove": chars, "mode": mode} for chars in ("ab ", "", "aaé")
+                                for mode in ("all", "leading", "trailing", "both_ends")],
+}
+
+
+@pytest.mark.parametrize("node_id", sorted(KERNEL_CASES))
+def test_kernel_matches_scalar_node(node_id):
+    node, batch = scalar_and_batch(node_id)
+    rng = random.Random(node_id)
+    texts = ["".join(rng.choice("aAbB é\n_-.123") for _ in range(rng.randint(0, 30))) for _ in range(200)]
+    main = text_input(type(node))
+    for params in KERNEL_CASES[node_id]:
+        inputs = {name: [value] for name, value in {**default_inputs(type(node)), **params}.items()}
+        inputs[main] = texts
+        expected = outcome(per_element, node=node, inputs=inputs)
+        assert outcome(batch.run_batch, **inputs) == expected, params
+
+
+def test_kernel_runs_when_only_the_text_varies(monkeypatch):
+    node, batch = scalar_and_batch("HAIGC_StringReplace")
+    monkeypatch.setattr(type(node), "replace", lambda *args, **kwargs: pytest.fail("scalar path used"))
+    assert batch.run_batch(文本=["ab", "cb"], 旧文本=["b"], 新文本=["!"], 次数=[-1]) == (["a!", "c!"],)
+
+
+def test_batch_is_changed_maps_the_scalar_hook(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("a\n1\n", encoding="utf-8")
+    cls = package.NODE_CLASS_MAPPINGS["HAIGC_StringTemplateBatch_Batch"]
+    scalar = package.NODE_CLASS_MAPPINGS["HAIGC_StringTemplateBatch"]
+    assert cls.IS_CHANGED(table_file=[str(path), ""]) == (scalar.IS_CHANGED(table_file=str(path)), "")
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from support import module
+
+dedup = module("dedup")
+
+
+def lines(n, seed=3):
+    rng = random.Random(seed)
+    return [rng.choice(["x", "Y", "word "]) * rng.randint(0, 4) + str(rng.randint(0, n // 3)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("case_sensitive", [True, False])
+def test_digest_matches_exact(case_sensitive):
+    corpus = lines(20000)
+    exact = dedup.ExactSeen(case_sensitive)
+    digest = dedup.DigestSeen(case_sensitive)
+    assert [digest.is_new(line) for line in corpus] == [exact.is_new(line) for line in corpus]
+    assert digest.count == len(exact._seen)
+
+
+def test_digest_memory_is_fixed_width():
+    seen = dedup.DigestSeen()
+    for i in range(100000):
+        seen.is_new("a long line that would cost far more as a str " + str(i))
+    assert seen.memory_bytes() < 24 * seen.count + 1024
+
+
+def test_bloom_never_keeps_duplicates():
+    seen = dedup.BloomSeen(expected_lines=1000)
+    corpus = lines(3000)
+    kept = [line for line in corpus if seen.is_new(line)]
+    assert len(kept) == len(set(kept))
+
+
+@pytest.mark.parametrize("case_sensitive", [True, False])
+def test_exact_unique_matches_exact_seen(case_sensitive):
+    corpus = lines(20000)
+    exact = dedup.ExactSeen(case_sensitive)
+    assert list(dedup.exact_unique(corpus, case_sensitive)) == list(filter(exact.is_new, corpus))
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from support import module, node
+
+fuzzy_match = module("fuzzy_match")
+
+
+def reference_distance(pattern, text, transpositions=False, substring=False):
+    """Levenshtein (or optimal string alignment) distance by full DP; with
+    substring the match may start and end anywhere in text"""
+    rows = [[0] * (len(text) + 1) for _ in range(len(pattern) + 1)]
+    for j in range(len(text) + 1):
+        rows[0][j] = 0 if substring else j
+    for i in range(1, len(pattern) + 1):
+        rows[i][0] = i
+        for j in range(1, len(text) + 1):
+            cost = pattern[i - 1] != text[j - 1]
+            best = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + cost)
+            if (transpositions and i > 1 and j > 1 and pattern[i - 1] == text[j - 2]
+                    and pattern[i - 2] == text[j - 1]):
+                best = min(best, rows[i - 2][j - 2] + 1)
+            rows[i][j] = best
+    return min(rows[-1]) if substring else rows[-1][-1]
+
+
+def mutate(rng, text, edits, alphabet):
+    text = list(text)
+    for _ in range(edits):
+        op = rng.randrange(4)
+        pos = rng.randrange(len(text) + 1)
+        if op == 0:
+            text.insert(pos, rng.choice(alphabet))
+        elif text and op == 1:
+            del text[min(pos, len(text) - 1)]
+        elif text and op == 2:
+            text[min(pos, len(text) - 1)] = rng.choice(alphabet)
+        elif len(text) > 1:
+            pos = min(pos, len(text) - 2)
+            text[pos], text[pos + 1] = text[pos + 1], text[pos]
+    return "".join(text)
+
+
+@pytest.mark.parametrize("transpositions", [False, True])
+@pytest.mark.parametrize("substring", [False, True])
+def test_matches_dp_reference(transpositions, substring):
+    rng = random.Random(f"{transpositions}{substring}")
+    for _ in range(1500):
+        alphabet = rng.choice(["ab", "abc", "abcdefgh"])
+        # Long patterns exercise the partition filters, short ones the plain scan
+        pattern = "".join(rng.choice(alphabet) for _ in range(rng.choice([0, 1, 3, 8, 20, 45])))
+        k = rng.randint(0, 4)
+        text = mutate(rng, pattern, rng.randint(0, k + 2), alphabet)
+        if substring:
+            text = ("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15))) + text
+                    + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15))))
+        expected = reference_distance(pattern, text, transpositions, substring)
+        got = fuzzy_match.edit_distance(pattern, text, k, transpositions, substring)
+        assert got == (expected if expected <= k else None), (pattern, text, k)
+
+
+def test_negative_max_distance_is_rejected():
+    with pytest.raises(ValueError):
+        fuzzy_match.compile_fuzzy("abcd", -1)
+
+
+def test_fuzzy_filter_node():
+    result = node("HAIGC_TextFilter").filter_lines("colour\ncolor\ncooler\nred", "fuzzy", "color", 1)
+    assert result[:2] == ("colour\ncolor", 2)
+    assert result[3] == "1\n0"
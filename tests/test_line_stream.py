@@ -0,0 +1,47 @@
+import pytest
+
+from support import module, node
+
+text_list = module("text_list")
+
+CONTENT = "alpha\r\nbeta\n\nbeta\r\ngamma δ\nlast line without newline"
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"\xef\xbb\xbf" + CONTENT.encode("utf-8"))
+    return node("HAIGC_TextFileSource").open_stream(str(path), "utf-8")[0]
+
+
+def test_file_stream_is_re_iterable(source):
+    assert text_list.is_stream(source)
+    assert list(source) == CONTENT.splitlines()
+    # Each iteration reopens the file instead of replaying a spent generator
+    assert list(source) == CONTENT.splitlines()
+
+
+def test_lines_split_across_chunks_match_splitlines(tmp_path, monkeypatch):
+    lines = [f"line {i} " + "x" * (i % 13) for i in range(2000)]
+    path = tmp_path / "big.txt"
+    path.write_bytes("\r\n".join(lines).encode("utf-8") + b"\r\n")
+    monkeypatch.setattr(text_list, "STREAM_CHUNK_SIZE", 100)
+    assert list(text_list.mmap_lines(str(path))) == lines
+
+
+def test_empty_file_has_no_lines(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(text_list.file_stream(str(path))) == []
+
+
+def test_stream_feeds_several_nodes(source, tmp_path):
+    unique = node("HAIGC_TextUnique").unique_lines("", True, True, source)[3]
+    filtered = node("HAIGC_TextFilter").filter_lines("", "contains", "a", text_list=unique)[2]
+    sink = node("HAIGC_TextFileSink")
+    path, count = sink.write_lines("", str(tmp_path / "out.txt"), "overwrite", "utf-8", filtered)
+    assert count == 4
+    with open(path, encoding="utf-8") as f:
+        assert f.read().splitlines() == ["alpha", "beta", "gamma δ", "last line without newline"]
+    # The source stream is still whole for another consumer
+    assert len(list(source)) == 6
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from support import module, node
+
+near_dedup = module("near_dedup")
+text_list = module("text_list")
+
+VARIANTS = [
+    "a red fox jumps over the lazy dog",
+    "The lazy dog, a red fox jumps over!",
+    "over the lazy dog a red fox jumps",
+]
+DISTINCT = [
+    "portrait of an old sailor at dawn",
+    "city skyline in heavy rain at night",
+    "bowl of ripe lemons on a wooden table",
+]
+
+
+def corpus(seed=5, count=3000):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(300)]
+    lines = []
+    for _ in range(count):
+        if lines and rng.random() < 0.4:
+            # A near copy of an earlier line: shuffled, one word swapped
+            line = rng.choice(lines).split()
+            rng.shuffle(line)
+            line[0] = rng.choice(words)
+        else:
+            line = rng.sample(words, 12)
+        lines.append(" ".join(line))
+    return lines
+
+
+def test_word_order_and_punctuation_variants_collapse():
+    result = node("HAIGC_TextNearDedup").near_dedup("\n".join(VARIANTS + DISTINCT), 0.7, "words")
+    assert result[:3] == ("\n".join(VARIANTS[:1] + DISTINCT), 6, 4)
+    assert result[4] == "0\n0\n0\n1\n2\n3"
+
+
+@pytest.mark.parametrize("shingle_mode", near_dedup.SHINGLE_MODES)
+def test_distinct_lines_stay_separate(shingle_mode):
+    result = node("HAIGC_TextNearDedup").near_dedup("\n".join(DISTINCT), 0.5, shingle_mode)
+    assert result[2] == len(DISTINCT)
+
+
+def test_numpy_and_python_backends_agree():
+    pytest.importorskip("numpy")
+    lines = corpus()
+    python = near_dedup.NearDuplicates(0.6, 64, use_numpy=False)
+    numpy = near_dedup.NearDuplicates(0.6, 64, use_numpy=True)
+    assert python.assign(lines) == numpy.assign(lines)
+    assert python.representatives == numpy.representatives
+    assert 0 < len(python.representatives) < len(lines)
+
+
+def test_streaming_matches_in_memory():
+    lines = corpus(count=500)
+    in_memory = node("HAIGC_TextNearDedup").near_dedup("\n".join(lines), 0.6, "words")
+    stream = text_list.LineStream(lambda: iter(lines))
+    streamed = node("HAIGC_TextNearDedup").near_dedup("", 0.6, "words", stream)
+    assert streamed[0] == "" and streamed[-1] == "near: streaming"
+    assert list(streamed[3]) == list(in_memory[3])
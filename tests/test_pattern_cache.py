@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from support import module, node
+
+pattern_cache = module("pattern_cache")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = pattern_cache.PatternCache(max_size=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    assert cache.get("a", lambda: 0) == 1
+    cache.get("c", lambda: 3)
+    assert len(cache) == 2
+    # "b" was the least recently used, so it is rebuilt
+    assert cache.get("b", lambda: 20) == 20
+    assert cache.get("c", lambda: 0) == 3
+    assert cache.info() == {"size": 2, "max_size": 2, "hits": 2, "misses": 4}
+
+
+def test_resize_evicts_down_to_the_new_size():
+    cache = pattern_cache.PatternCache(max_size=4)
+    for key in "abcd":
+        cache.get(key, lambda: key)
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.get("d", lambda: None) == "d"
+
+
+def test_failed_compile_is_not_cached():
+    with pytest.raises(re.error):
+        pattern_cache.compile_regex("(")
+    with pytest.raises(re.error):
+        pattern_cache.compile_regex("(")
+    assert pattern_cache.regex_cache.get(("(", 0), lambda: "rebuilt") == "rebuilt"
+    pattern_cache.clear_regex_cache()
+
+
+def test_nodes_share_compiled_patterns():
+    pattern_cache.clear_regex_cache()
+    pattern = r"p\d+x"
+    node("HAIGC_TextFilter").filter_lines("p1x\nq", "regex_match", pattern)
+    assert node("HAIGC_StringRegexReplace").regex_replace("p22x", pattern, "-", "无") == ("-", 1)
+    info = pattern_cache.regex_cache_info()
+    assert (info["misses"], info["hits"]) == (1, 1)
+    assert pattern_cache.compile_regex(pattern) is pattern_cache.compile_regex(pattern)
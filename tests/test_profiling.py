@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from support import module, node, package
+
+profiling = module("profiling")
+result_cache = module("result_cache")
+
+CLASSES = package.NODE_CLASS_MAPPINGS
+
+
+@pytest.fixture
+def profiler():
+    profiling.reset()
+    yield profiling.profiler
+    profiling.disable()
+    profiling.reset()
+
+
+def originals():
+    return {cls: cls.__dict__.get(cls.FUNCTION) for cls in CLASSES.values()}
+
+
+def test_disable_restores_every_function(profiler):
+    before = originals()
+    profiling.enable()
+    assert profiling.is_enabled()
+    cls = CLASSES["HAIGC_StringConcatenate"]
+    assert cls.__dict__[cls.FUNCTION] is not before[cls]
+    # The stats node is never instrumented
+    assert CLASSES["HAIGC_TextStats"].__dict__["stats"] is before[CLASSES["HAIGC_TextStats"]]
+    profiling.disable()
+    assert not profiling.is_enabled()
+    assert originals() == before
+
+
+def test_enabling_twice_wraps_once(profiler):
+    profiling.enable()
+    profiling.enable()
+    node("HAIGC_StringConcatenate").concatenate("ab", "c")
+    assert profiler.snapshot()["StringConcatenate"]["calls"] == 1
+
+
+def test_calls_sizes_and_errors_are_recorded(profiler):
+    profiling.enable()
+    concatenate = node("HAIGC_StringConcatenate")
+    for _ in range(3):
+        concatenate.concatenate("ab", "cde", 分隔符="-")
+    entry = profiler.snapshot()["StringConcatenate"]
+    assert entry["calls"] == 3
+    assert entry["errors"] == 0
+    assert entry["in_chars"] == 3 * 6
+    assert entry["out_chars"] == 3 * len("ab-cde")
+    assert sum(entry["histogram_us"].values()) == 3
+
+    with pytest.raises(TypeError):
+        concatenate.concatenate("ab")
+    assert profiler.snapshot()["StringConcatenate"]["errors"] == 1
+
+
+def test_stats_node_reports_cache_hits(profiler):
+    result_cache.configure_result_cache(1)
+    try:
+        stats = node("HAIGC_TextStats")
+        assert stats.stats("enable", "text")[1] is True
+        for _ in range(2):
+            node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True)
+        report = json.loads(stats.stats("report", "json")[0])
+        assert report["enabled"]
+        entry = report["nodes"]["TextSort"]
+        assert (entry["calls"], entry["cache_hits"], entry["cache_misses"]) == (2, 1, 1)
+        assert "TextStats" not in report["nodes"]
+        assert stats.stats("disable", "text")[1] is False
+    finally:
+        result_cache.configure_result_cache(0)
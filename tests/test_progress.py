@@ -0,0 +1,77 @@
+import pytest
+
+from support import module, node
+
+progress = module("progress")
+text_list = module("text_list")
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeComfy:
+    """Stands in for comfy.utils.ProgressBar and the interrupt check"""
+
+    def __init__(self, interrupt_after=None):
+        self.updates = []
+        self.checks = 0
+        self.interrupt_after = interrupt_after
+
+    def progress_bar(self, total):
+        comfy = self
+
+        class Bar:
+            def update_absolute(self, value, total):
+                comfy.updates.append((value, total))
+        return Bar()
+
+    def check(self):
+        self.checks += 1
+        if self.interrupt_after is not None and self.checks > self.interrupt_after:
+            raise Interrupted()
+
+
+@pytest.fixture
+def comfy(monkeypatch):
+    fake = FakeComfy()
+    monkeypatch.setattr(progress, "_hooks", (fake.progress_bar, fake.check))
+    return fake
+
+
+def test_small_input_is_one_chunk_without_progress():
+    items = list(range(10))
+    assert progress.progress_for(len(items), progress.CHUNK_LINES) is None
+    chunks = list(progress.chunks(items))
+    assert chunks == [items] and chunks[0] is items
+    assert list(progress.spans(10)) == [(0, 10)]
+
+
+def test_chunks_cover_the_input_and_move_the_bar(comfy):
+    items = list(range(10))
+    chunks = list(progress.chunks(items, progress.Progress(len(items)), size=4))
+    assert chunks == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert comfy.updates == [(4, 10), (8, 10), (10, 10)]
+
+
+def test_spans_cover_the_length(comfy):
+    assert list(progress.spans(10, progress.Progress(10), size=4)) == [(0, 4), (4, 8), (8, 10)]
+    assert comfy.updates[-1] == (10, 10)
+
+
+def test_outside_comfyui_the_hooks_are_no_ops():
+    bar = progress.Progress(5)
+    bar.advance(10)
+    assert bar.done == 5
+
+
+def test_interrupt_stops_a_large_node(comfy):
+    comfy.interrupt_after = 1
+    lines = text_list.TextList(f"line {i}" for i in range(progress.CHUNK_LINES * 3))
+    with pytest.raises(Interrupted):
+        node("HAIGC_TextFilter").filter_lines("", "contains", "1", text_list=lines)
+    comfy.interrupt_after = None
+    comfy.checks = 0
+    result = node("HAIGC_TextSort").sort_text("", "length", True, lines)
+    assert len(result[1]) == len(lines)
+    assert comfy.updates[-1] == (len(lines) * 2, len(lines) * 2)
@@ -0,0 +1,57 @@
+import pytest
+
+from support import module, node
+
+regex_guard = module("regex_guard")
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(a+)+$",
+    r"(\w*)*",
+    r"(a+){9}",
+    r"(?:x(a|b+)*y)+",
+    r"(\w+\s?)*$",
+    r"(?:\d+,?)*",
+    r"(?i)(?:A+a)*",
+    r"(.*a)*",
+    r"([a-z]+.)*end",
+])
+def test_ambiguous_nested_quantifiers_are_rejected(pattern):
+    with pytest.raises(regex_guard.UnsafePatternError):
+        regex_guard.check_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(?:\d+,)*\d+",
+    r"(?:[a-z]+ )*end",
+    r"((ab)*c)*",
+    r"(?:\w+\s)*\w+$",
+    r"^(?:[a-z0-9]+-)*[a-z0-9]+$",
+    r"(?:\d+\.)+\d+",
+    r"(a{3})+",
+    r"(?>a+)+",
+    r"(a++)+",
+    r"(a+)?",
+    r"\b(cat|dog)\b",
+])
+def test_unambiguous_patterns_are_accepted(pattern):
+    regex_guard.check_pattern(pattern)
+
+
+def test_invalid_pattern_raises_re_error():
+    with pytest.raises(regex_guard.re.error):
+        regex_guard.check_pattern("(")
+
+
+def test_guarded_call_matches_in_process_result():
+    text = "1,2,3 and 45,6"
+    expected = regex_guard.run_regex(r"(?:\d+,)*\d+", 0, "findall", text)
+    assert regex_guard.run_regex(r"(?:\d+,)*\d+", 0, "findall", text, timeout_ms=5000) == expected
+
+
+def test_timeout_is_reported_and_worker_restarts():
+    # Branch ambiguity is not caught statically, so only the budget stops it
+    match = node("HAIGC_StringRegexMatch")
+    result = match.regex_match("a" * 40 + "!", "^(a|aa)+$", "第一个", "无", 200)
+    assert result[0].startswith("正则超时")
+    assert match.regex_match("hello world", r"o\s?w", "第一个", "无", 5000)[0] == "o w"
@@ -0,0 +1,35 @@
+import pytest
+
+from support import module, package
+
+registry = module("registry")
+
+SCALAR_IDS = sorted(node_id for node_id in package.NODE_CLASS_MAPPINGS if not node_id.endswith("_Batch"))
+BATCH_IDS = sorted(node_id for node_id in package.NODE_CLASS_MAPPINGS if node_id.endswith("_Batch"))
+
+
+@pytest.mark.parametrize("node_id", SCALAR_IDS)
+def test_node_is_a_plain_comfyui_node(node_id):
+    cls = package.NODE_CLASS_MAPPINGS[node_id]
+    assert callable(getattr(cls(), cls.FUNCTION))
+    assert len(getattr(cls, "RETURN_NAMES", cls.RETURN_TYPES)) == len(cls.RETURN_TYPES)
+    # ComfyUI maps list inputs over these nodes itself
+    assert not getattr(cls, "INPUT_IS_LIST", False)
+    assert node_id in package.NODE_DISPLAY_NAME_MAPPINGS
+
+
+def test_every_node_of_the_batch_modules_has_a_twin():
+    expected = {f"{node_id}_Batch" for node_id, module_name, _, _ in registry.NODE_REGISTRY
+                if module_name in registry.BATCH_MODULES}
+    assert set(BATCH_IDS) == expected
+
+
+@pytest.mark.parametrize("node_id", BATCH_IDS)
+def test_batch_twin_takes_and_returns_lists(node_id):
+    cls = package.NODE_CLASS_MAPPINGS[node_id]
+    scalar = package.NODE_CLASS_MAPPINGS[node_id[:-len("_Batch")]]
+    assert cls.INPUT_IS_LIST is True
+    assert cls.OUTPUT_IS_LIST == (True,) * len(scalar.RETURN_TYPES)
+    assert cls.RETURN_TYPES == scalar.RETURN_TYPES
+    assert cls.INPUT_TYPES() == scalar.INPUT_TYPES()
+    assert package.NODE_DISPLAY_NAME_MAPPINGS[node_id].endswith("(Batch)")
@@ -0,0 +1,57 @@
+import pytest
+
+from support import module, node
+
+result_cache = module("result_cache")
+text_list = module("text_list")
+
+
+@pytest.fixture
+def cache():
+    result_cache.configure_result_cache(1)
+    result_cache.clear_result_cache()
+    yield result_cache.result_cache
+    result_cache.configure_result_cache(0)
+
+
+def stats(node_name):
+    return result_cache.result_cache_info()["nodes"].get(node_name, {"hits": 0, "misses": 0})
+
+
+def test_disabled_by_default():
+    assert not result_cache.result_cache.enabled
+    node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True)
+    assert result_cache.result_cache_info()["entries"] == 0
+
+
+def test_repeated_call_is_a_hit(cache):
+    first = node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True)
+    second = node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True)
+    assert second is first
+    assert stats("TextSort") == {"hits": 1, "misses": 1}
+
+
+def test_changed_input_is_a_miss(cache):
+    node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True)
+    # Defaults are bound, so passing one explicitly is the same call
+    node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True, limit=0)
+    result = node("HAIGC_TextSort").sort_text("b\na", "alphabetical", True, descending=True)
+    assert result[0] == "b\na"
+    assert stats("TextSort") == {"hits": 1, "misses": 2}
+
+
+def test_skipped_and_undigestable_calls_bypass_the_cache(cache):
+    node("HAIGC_TextSort").sort_text("b\na", "random", True)
+    node("HAIGC_TextSort").sort_text("", "alphabetical", True, text_list=text_list.LineStream(lambda: iter(["b", "a"])))
+    assert cache.info()["entries"] == 0
+
+
+def test_eviction_and_disabling_invalidate(cache):
+    result_cache.configure_result_cache(0.0005)
+    for i in range(20):
+        node("HAIGC_TextSort").sort_text("x" * 100 + str(i), "alphabetical", True)
+    info = result_cache.result_cache_info()
+    assert info["evictions"] > 0
+    assert info["bytes"] <= info["max_bytes"]
+    result_cache.configure_result_cache(0)
+    assert result_cache.result_cache_info()["entries"] == 0
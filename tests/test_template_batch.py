@@ -0,0 +1,79 @@
+import json
+from string import Template
+
+import pytest
+
+from support import module, node
+
+advanced = module("advanced_string_nodes")
+text_list = module("text_list")
+
+
+def render(template, table, table_format="csv", missing="keep", **kwargs):
+    return node("HAIGC_StringTemplateBatch").render_rows(template, table, table_format, missing, **kwargs)
+
+
+def test_renders_one_line_per_row():
+    result = render("a $color $animal", "color,animal\nred,fox\nblue,whale")
+    assert result[0] == "a red fox\na blue whale"
+    assert list(result[1]) == ["a red fox", "a blue whale"]
+    assert result[2] == 2
+
+
+@pytest.mark.parametrize("template", [
+    "$a and ${b}!", "$$a costs $5", "${a}${a}$missing", "no fields", "$a $", "${b}x$"
+])
+def test_dollar_syntax_matches_string_template(template):
+    row = {"a": "1", "b": "two"}
+    assert advanced._compile_template(template).render(row) == Template(template).safe_substitute(row)
+    assert advanced._compile_template(template).render(row, "empty") == \
+        Template(template).safe_substitute({"missing": "", **row})
+    try:
+        expected = Template(template).substitute(row)
+    except (KeyError, ValueError) as e:
+        expected = type(e)
+    try:
+        got = advanced._compile_template(template).render(row, "error")
+    except (KeyError, ValueError) as e:
+        got = type(e)
+    assert got == expected
+
+
+def test_missing_modes():
+    table = "a\n1"
+    assert render("$a-$b", table)[0] == "1-$b"
+    assert render("$a-$b", table, missing="empty")[0] == "1-"
+    assert render("$a-$b", table, missing="error")[0] == "Template Error: 'b'"
+
+
+def test_tsv_and_jsonl_tables():
+    assert render("$x/$y", "x\ty\n1\t2\n3", "tsv")[0] == "1/2\n3/"
+    jsonl = "\n".join(json.dumps(row) for row in [{"x": "a", "y": [1, 2]}, {"x": "b", "y": None}])
+    assert render("$x=$y", jsonl + "\n\n", "jsonl")[0] == "a=[1, 2]\nb=null"
+    assert render("$x", "[1]", "jsonl")[0].startswith("Template Error:")
+
+
+def test_engine_syntax():
+    template = "{{ name | upper }}{% if n %}!{% endif %}"
+    # The dollar syntax leaves engine markup alone
+    assert render(template, "name,n\nfox,1")[0] == template
+    assert render(template, "name,n\nfox,1\nowl,", syntax="engine")[0] == "FOX!\nOWL"
+
+
+def test_file_table_to_file_output(tmp_path):
+    table = tmp_path / "rows.csv"
+    table.write_text("id\n" + "\n".join(str(i) for i in range(1000)), encoding="utf-8")
+    result = render("p$id", "", table_file=str(table), output_file=str(tmp_path / "out" / "p.txt"))
+    assert result[0] == ""
+    assert result[2] == 1000
+    assert text_list.is_stream(result[1])
+    assert list(result[1]) == [f"p{i}" for i in range(1000)]
+    with open(result[3], encoding="utf-8") as f:
+        assert f.read() == "".join(f"p{i}\n" for i in range(1000))
+
+
+def test_template_is_compiled_once():
+    advanced._template_cache.clear()
+    render("$a!", "a\n1\n2\n3")
+    render("$a!", "a\n4")
+    assert (advanced._template_cache.misses, advanced._template_cache.hits) == (1, 1)
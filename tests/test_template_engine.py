@@ -0,0 +1,39 @@
+import pytest
+
+from support import module
+
+template_engine = module("template_engine")
+render = template_engine.render_template
+
+
+def test_output_filters_and_loops():
+    source = "{% for n in names %}{{ loop.index }}.{{ n | upper }}{% if not loop.last %}, {% endif %}{% endfor %}"
+    assert render(source, {"names": ["a", "b"]}) == "1.A, 2.B"
+
+
+@pytest.mark.parametrize("variables, expected", [
+    ({"x": False}, "[]"),
+    ({"x": True}, "[1]"),
+    ({"x": False, "y": 7}, "[7]"),
+])
+def test_set_in_a_branch_that_does_not_run(variables, expected):
+    assert render("{% if x %}{% set y = 1 %}{% endif %}[{{ y }}]", variables) == expected
+
+
+def test_set_in_a_branch_keeps_the_outer_value():
+    assert render("{% set y = 5 %}{% if x %}{% set y = 1 %}{% endif %}[{{ y }}]", {"x": False}) == "[5]"
+
+
+def test_set_in_a_loop_branch_is_per_iteration():
+    source = "{% for i in [1, 2, 3] %}{% if i == 2 %}{% set z = i %}{% endif %}{{ z }},{% endfor %}"
+    assert render(source, {"z": 0}) == "0,2,0,"
+
+
+def test_strict_mode_reports_a_name_never_set():
+    with pytest.raises(template_engine.UndefinedError, match="'y' is undefined"):
+        render("{% if x %}{% set y = 1 %}{% endif %}[{{ y }}]", {"x": False}, strict=True)
+
+
+def test_unknown_filter_reports_its_line():
+    with pytest.raises(template_engine.TemplateSyntaxError, match="line 2"):
+        template_engine.compile_template("ok\n{{ x | nope }}")
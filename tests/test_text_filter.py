@@ -0,0 +1,27 @@
+from support import module, node
+
+text_list = module("text_list")
+
+LINES = ["cat one", "dog two", "cat three", "bird"]
+
+
+def stream_of(lines):
+    return text_list.LineStream(lambda: iter(lines))
+
+
+def test_guarded_regex_filter_matches_unguarded():
+    text = "\n".join(LINES)
+    unguarded = node("HAIGC_TextFilter").filter_lines(text, "regex_match", "^cat")
+    guarded = node("HAIGC_TextFilter").filter_lines(text, "regex_match", "^cat", timeout_ms=5000)
+    assert guarded[:2] == unguarded[:2] == ("cat one\ncat three", 2)
+
+
+def test_guarded_regex_filter_refuses_streams():
+    result = node("HAIGC_TextFilter").filter_lines("", "regex_match", "cat", 0, stream_of(LINES), 500)
+    assert result[0].startswith("Regex Error: timeout_ms")
+    assert result[1] == 0
+
+
+def test_streamed_regex_filter():
+    result = node("HAIGC_TextFilter").filter_lines("", "regex_match", "cat", 0, stream_of(LINES))
+    assert list(result[2]) == ["cat one", "cat three"]
@@ -0,0 +1,33 @@
+import hashlib
+import itertools
+
+from support import module, node
+
+text_list = module("text_list")
+transform = module("text_transform_nodes")
+
+LINES = [f"line {i}" for i in range(3 * transform._HASH_BATCH_LINES * 4 + 7)]
+EXPECTED = [hashlib.sha256(line.encode("utf-8")).hexdigest() for line in LINES]
+
+
+def test_threaded_per_line_matches_serial():
+    text = "\n".join(LINES[:100])
+    serial = node("HAIGC_TextHash").hash_text(text, "sha256", "hex", mode="per_line")
+    threaded = node("HAIGC_TextHash").hash_text(text, "sha256", "hex", mode="per_line", threads=4)
+    assert serial == threaded
+    assert serial[0].split("\n") == EXPECTED[:100]
+
+
+def test_stream_survives_a_larger_pool():
+    stream = text_list.LineStream(lambda: iter(LINES))
+    digests = node("HAIGC_TextHash").hash_text("", "sha256", "hex", stream, "per_line", threads=2)[1]
+    consumed = iter(digests)
+    head = list(itertools.islice(consumed, 10))
+    # A later call with more threads replaces the shared pool mid-stream
+    node("HAIGC_TextHash").hash_text("x\ny", "sha256", "hex", mode="per_line", threads=256)
+    assert head + list(consumed) == EXPECTED
+
+
+def test_blake2b_64_is_a_64_bit_key():
+    digests = node("HAIGC_TextHash").hash_text("a\nb", "blake2b_64", "hex", mode="per_line")[0]
+    assert digests.split("\n") == [hashlib.blake2b(line, digest_size=8).hexdigest() for line in (b"a", b"b")]
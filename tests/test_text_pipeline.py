@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from support import node
+
+TEXT = "b\n\na\nb\nccc"
+
+
+def run(steps, text=TEXT):
+    return node("HAIGC_TextPipeline").run_pipeline(text, json.dumps(steps))
+
+
+def test_filter_map_unique_sort():
+    result = run([
+        {"op": "filter", "mode": "min_length", "length": 1},
+        {"op": "map", "operation": "add_prefix", "value": "- "},
+        {"op": "unique"},
+        {"op": "sort", "mode": "alphabetical"},
+    ])
+    assert result[:2] == ("- a\n- b\n- ccc", 3)
+
+
+@pytest.mark.parametrize("step, message", [
+    ({"op": "map", "operation": "add_prefix", "value": [1]}, "value must be a string"),
+    ({"op": "filter", "mode": "min_length", "length": "3"}, "length must be an integer"),
+    ({"op": "filter", "mode": "min_length", "length": True}, "length must be an integer"),
+    ({"op": "unique", "case_sensitive": "no"}, "case_sensitive must be true or false"),
+    ({"op": "unique", "false_positive_rate": "0.1"}, "false_positive_rate must be a number"),
+    ({"op": "sort", "mode": 3}, "mode must be a string"),
+    ({"op": "filter", "mode": "bogus"}, "Unknown filter mode"),
+    ({"op": "filter", "mode": "fuzzy", "filter_value": "abc", "length": -1}, "max_distance must be >= 0"),
+    ({"op": "explode"}, "Unknown pipeline op"),
+])
+def test_invalid_steps_are_reported(step, message):
+    result = run([step])
+    assert result[0].startswith("Pipeline Error:")
+    assert message in result[0]
+    assert result[1] == 0
+
+
+def test_invalid_json_is_reported():
+    assert node("HAIGC_TextPipeline").run_pipeline(TEXT, "[{")[0].startswith("Pipeline Error:")
+
+
+def test_text_filter_unknown_mode_keeps_no_lines():
+    assert node("HAIGC_TextFilter").filter_lines("a\nb", "bogus", "x")[:2] == ("", 0)
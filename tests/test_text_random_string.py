@@ -0,0 +1,45 @@
+import random
+import string
+
+import pytest
+
+from support import node
+
+
+def generate(**kwargs):
+    return node("HAIGC_TextRandomString").generate(**{"length": 12, "charset": "alphanumeric", **kwargs})
+
+
+def test_seeded_output_ignores_the_global_state():
+    random.seed(1)
+    first = generate(seed=5, count=50)
+    random.seed(2)
+    assert generate(seed=5, count=50) == first
+    assert generate(seed=6, count=50) != first
+
+
+@pytest.mark.parametrize("options", [{"seed": 7}, {}, {"secure": True}])
+def test_global_random_state_is_left_alone(options):
+    random.seed(3)
+    expected = random.random()
+    random.seed(3)
+    generate(count=100, **options)
+    assert random.random() == expected
+
+
+def test_unseeded_calls_differ():
+    assert generate(count=20) != generate(count=20)
+
+
+@pytest.mark.parametrize("length, count", [(1, 1), (7, 70000), (65537, 3)])
+def test_bulk_output_has_count_strings_of_length(length, count):
+    result, lines = generate(length=length, count=count, charset="hex", seed=9)
+    assert len(lines) == count
+    assert all(len(line) == length for line in lines)
+    assert set("".join(lines)) <= set(string.hexdigits.lower())
+    assert result == "\n".join(lines)
+
+
+def test_custom_chars():
+    lines = generate(charset="custom", custom_chars="ab", count=10, secure=True)[1]
+    assert set("".join(lines)) <= {"a", "b"}
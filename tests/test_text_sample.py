@@ -0,0 +1,60 @@
+import collections
+import random
+
+import pytest
+
+from support import module, node
+
+sampling = module("sampling")
+text_list = module("text_list")
+
+LINES = [f"line {i}" for i in range(5000)]
+TEXT = "\n".join(LINES)
+
+
+def sample(mode="reservoir", k=10, seed=1, **kwargs):
+    return node("HAIGC_TextSample").sample_lines(TEXT, mode, k, seed, **kwargs)
+
+
+# Every line weighs 1 and falls in the stratum "line"
+@pytest.mark.parametrize("mode, separator", [("reservoir", "|"), ("weighted", "|"), ("stratified_prefix", " ")])
+def test_seed_reproduces_the_sample(mode, separator):
+    random.seed(1)
+    first = sample(mode, seed=42, separator=separator)
+    random.seed(2)
+    assert sample(mode, seed=42, separator=separator) == first
+    assert sample(mode, seed=43, separator=separator) != first
+
+
+def test_stream_input_gives_the_same_sample():
+    stream = text_list.LineStream(lambda: iter(LINES))
+    assert list(sample(seed=5, text_list=stream)[1]) == list(sample(seed=5)[1])
+
+
+def test_reservoir_keeps_input_order():
+    lines = sample(k=50, seed=3)[1]
+    assert len(lines) == 50 == len(set(lines))
+    assert [LINES.index(line) for line in lines] == sorted(LINES.index(line) for line in lines)
+    assert sample(k=6000, seed=3)[2] == len(LINES)
+
+
+def test_reservoir_is_uniform():
+    counts = collections.Counter()
+    rng = random.Random(0)
+    for _ in range(4000):
+        counts.update(index for index, _ in sampling.reservoir_sample(range(20), 5, rng))
+    # Each of the 20 items is picked a quarter of the time: 1000 expected
+    assert all(850 < count < 1150 for count in counts.values())
+
+
+def test_weighted_strips_weights_and_skips_zero():
+    text = "a|0\nb|5\nc|0\nd"
+    result = node("HAIGC_TextSample").sample_lines(text, "weighted", 5, 1)
+    assert result[0] == "b\nd"
+
+
+def test_stratified_prefix_caps_each_stratum():
+    text = "\n".join(f"{key}|{i}" for key in "xyz" for i in range(30))
+    lines = node("HAIGC_TextSample").sample_lines(text, "stratified_prefix", 4, 1)[1]
+    strata = collections.Counter(line.split("|")[0] for line in lines)
+    assert strata == {"x": 4, "y": 4, "z": 4}
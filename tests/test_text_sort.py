@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from support import module, node
+
+progress = module("progress")
+transform = module("text_transform_nodes")
+TextList = module("text_list").TextList
+
+LINES = ["file10", "File2", "file1", "x -3.5", "x 2e1", "none"]
+
+
+def sort(mode, lines=LINES, **kwargs):
+    return node("HAIGC_TextSort").sort_text("\n".join(lines), mode, False, **kwargs)[0].split("\n")
+
+
+def test_natural():
+    assert sort("natural", ["file10", "File2", "file1"]) == ["file1", "File2", "file10"]
+
+
+def test_numeric_puts_lines_without_numbers_last():
+    assert sort("numeric", ["b 10", "none", "a -3.5", "c 2e1"]) == ["a -3.5", "b 10", "c 2e1", "none"]
+    assert sort("numeric", ["b 10", "none", "a -3.5", "c 2e1"], descending=True) == ["c 2e1", "b 10", "a -3.5", "none"]
+
+
+def test_limit_matches_full_sort():
+    for mode in ("alphabetical", "natural", "numeric", "length", "casefold"):
+        assert sort(mode, limit=3) == sort(mode)[:3]
+
+
+def test_spilled_sort_streams_instead_of_joining():
+    lines = [f"{i * 7919 % 100003:06d} padding to make the corpus larger" for i in range(60000)]
+    result, sorted_list, info = node("HAIGC_TextSort").sort_text("\n".join(lines), "alphabetical", False,
+                                                                max_memory_mb=1)
+    assert result == ""
+    assert "streamed to text_list" in info
+    assert list(sorted_list) == sorted(lines)
+
+
+@pytest.mark.parametrize("mode", ["alphabetical", "reverse", "length", "natural", "numeric", "casefold"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_large_sort_matches_in_memory_sort(mode, descending):
+    rng = random.Random(mode)
+    lines = TextList(rng.choice(["a", "B", "file", "x y"]) + str(rng.randint(0, 50)) * rng.randint(0, 2)
+                     for _ in range(progress.CHUNK_LINES + 5000))
+    expected = transform._sort_lines(lines, mode, False, descending)
+    result = node("HAIGC_TextSort").sort_text("", mode, False, lines, descending=descending)
+    assert result[2].startswith("in-memory sort")
+    assert list(result[1]) == expected
@@ -0,0 +1,88 @@
+"""
+文本文件节点
+Text File Source / Sink Nodes
+"""
+import os
+
+from .text_list import TEXT_LIST, file_signature, file_stream, input_lines, resolve_path
+
+
+class TextFileSource:
+    """文件行流 / Stream lines from a text file
+
+    The file is memory-mapped and read lazily: nothing is loaded until a
+    downstream node iterates the TEXT_LIST, and then only one chunk at a
+    time. Relative paths are resolved against ComfyUI's input directory.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "path": ("STRING", {"default": ""}),
+                "encoding": (["utf-8", "gbk", "latin-1"], {"default": "utf-8"}),
+            }
+        }
+
+    RETURN_TYPES = (TEXT_LIST, "STRING", "INT")
+    RETURN_NAMES = ("text_list", "path", "size_bytes")
+    FUNCTION = "open_stream"
+    CATEGORY = "HAIGC/Text/IO"
+
+    @classmethod
+    def IS_CHANGED(cls, path, **kwargs):
+        # Rerun when the file changes
+        return file_signature(path)
+
+    def open_stream(self, path, encoding):
+        full_path = resolve_path(path)
+        if not os.path.isfile(full_path):
+            raise FileNotFoundError(f"Text file not found: {full_path}")
+        size = os.path.getsize(full_path)
+        return (file_stream(full_path, encoding), full_path, size)
+
+
+class TextFileSink:
+    """写入文件 / Write lines to a text file
+
+    Lines are written as they are produced, so a stream from TextFileSource
+    through filter/map/unique nodes is never held in memory. Relative paths
+    are resolved against ComfyUI's output directory.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"default": "", "multiline": True}),
+                "path": ("STRING", {"default": "haigc_text.txt"}),
+                "mode": (["overwrite", "append"], {"default": "overwrite"}),
+                "encoding": (["utf-8", "gbk", "latin-1"], {"default": "utf-8"}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "INT")
+    RETURN_NAMES = ("path", "count")
+    FUNCTION = "write_lines"
+    OUTPUT_NODE = True
+    CATEGORY = "HAIGC/Text/IO"
+
+    def write_lines(self, text, path, mode, encoding, text_list=None):
+        full_path = resolve_path(path, output=True)
+        directory = os.path.dirname(full_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        count = 0
+        file_mode = "w" if mode == "overwrite" else "a"
+        with open(full_path, file_mode, encoding=encoding, newline="\n", buffering=1024 * 1024) as f:
+            write = f.write
+            for line in input_lines(text, text_list):
+                write(line)
+                write("\n")
+                count += 1
+
+        return (full_path, count)
@@ -0,0 +1,137 @@
+"""
+行列表类型
+TEXT_LIST type passed between line-oriented nodes
+
+A TEXT_LIST value is either a TextList (lines in memory) or a LineStream
+(lines produced lazily, e.g. from a memory-mapped file).
+"""
+import mmap
+import os
+
+try:
+    import folder_paths
+except ImportError:
+    folder_paths = None
+
+TEXT_LIST = "TEXT_LIST"
+
+# Bytes decoded per step when streaming a file; bounds memory per stream
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class TextList(tuple):
+    """不可变行列表 / Immutable list of lines
+
+    Line nodes take and return this directly, so a chain of them never joins
+    and re-splits the corpus. It is immutable because ComfyUI hands the same
+    output object to every connected node and keeps it in its output cache.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, lines=()):
+        if type(lines) is cls:
+            return lines
+        return super().__new__(cls, lines)
+
+    def __repr__(self):
+        return f"TextList({len(self)} lines)"
+
+
+class LineStream:
+    """惰性行流 / Lazy, re-iterable sequence of lines
+
+    Every iteration calls the factory again, so a stream can be consumed by
+    several downstream nodes without ever being held in memory.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __iter__(self):
+        return iter(self._factory())
+
+    def pipe(self, stage):
+        """Return a new stream of stage(lines) over this stream"""
+        return LineStream(lambda: stage(iter(self)))
+
+    def __repr__(self):
+        return "LineStream()"
+
+
+def is_stream(value):
+    return isinstance(value, LineStream)
+
+
+def mmap_lines(path, encoding="utf-8", errors="replace"):
+    """逐行读取映射文件 / Yield the lines of a file through a memory map
+
+    Lines are split on "\n" with a trailing "\r" removed, matching
+    str.splitlines() for LF and CRLF files. Only one chunk of the file is
+    decoded at a time.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 3 if encoding == "utf-8" and mm[:3] == b"\xef\xbb\xbf" else 0
+            while pos < size:
+                end = min(pos + STREAM_CHUNK_SIZE, size)
+                if end < size:
+                    newline = mm.rfind(b"\n", pos, end)
+                    if newline == -1:
+                        newline = mm.find(b"\n", end)
+                    end = size if newline == -1 else newline + 1
+                
+                chunk = mm[pos:end].decode(encoding, errors)
+                pos = end
+                lines = chunk.split("\n")
+                if chunk.endswith("\n"):
+                    lines.pop()
+                if "\r" in chunk:
+                    lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+                yield from lines
+
+
+def file_stream(path, encoding="utf-8"):
+    return LineStream(lambda: mmap_lines(path, encoding))
+
+
+def resolve_path(path, output=False):
+    """Resolve a relative path against ComfyUI's input/output directory"""
+    path = os.path.expanduser(path.strip())
+    if os.path.isabs(path) or folder_paths is None:
+        return os.path.abspath(path)
+    base = folder_paths.get_output_directory() if output else folder_paths.get_input_directory()
+    return os.path.join(base, path)
+
+
+def file_signature(path):
+    """IS_CHANGED value for a file input: changes whenever the file changes"""
+    if not path:
+        return ""
+    try:
+        stat = os.stat(resolve_path(path))
+    except OSError:
+        return "missing"
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def input_lines(text, text_list):
+    """输入行 / Lines of the TEXT_LIST input when connected, else of the STRING input"""
+    if text_list is None:
+        return text.splitlines()
+    return text_list
+
+
+def output_lines(lines, text_list):
+    """输出行 / Return (text, TextList) for a node's line outputs
+
+    The text output is only joined when the input came in as a STRING; with
+    a TEXT_LIST input it is left empty so list chains stay copy-free.
+    """
+    lines = TextList(lines)
+    if text_list is None:
+        return "\n".join(lines), lines
+    return "", lines
@@ -3,9 +3,39 @@
 Text Transform Nodes
 """
 import base64
+import functools
 import hashlib
+import heapq
+import importlib.util
+import itertools
+import json
+import os
 import random
+import re
 import string
+import threading
+import zlib
+from collections import deque
+
+from .base64_stream import (
+    BASE64_VARIANTS, decode_chunks, decode_text, encode_chunks, iter_file_chunks, iter_text_chunks,
+)
+from .dedup import DEDUP_MODES, exact_unique, make_seen
+from .fuzzy_match import compile_fuzzy
+from .near_dedup import SHINGLE_MODES, NearDuplicates
+from .parallel import backend, split_list
+from .pattern_cache import compile_regex
+from .progress import CHUNK_LINES, Progress, chunks, progress_for
+from .regex_guard import RegexTimeout, check_pattern, run_regex
+from .result_cache import memoize
+from .sampling import reservoir_sample, split_weight, stratified_sample, weighted_sample
+from .text_list import (
+    TEXT_LIST, TextList, file_signature, file_stream, input_lines, is_stream, output_lines, resolve_path,
+)
+
+# Heavier helpers (concurrent.futures, tempfile, secrets, xxhash) are only
+# imported by the node paths that use them, keeping ComfyUI startup short
+_HAS_XXHASH = importlib.util.find_spec("xxhash") is not None
 
 
 class TextToLines:
@@ -21,11 +51,12 @@ class TextToLines:
             }
         }
     
-    RETURN_TYPES = ("STRING", "INT")
-    RETURN_NAMES = ("lines", "count")
+    RETURN_TYPES = ("STRING", "INT", TEXT_LIST)
+    RETURN_NAMES = ("lines", "count", "text_list")
     FUNCTION = "to_lines"
     CATEGORY = "HAIGC/Text/Transform"
     
+    @memoize
     def to_lines(self, text, remove_empty, strip_lines):
         lines = text.splitlines()
         
@@ -38,7 +69,7 @@ class TextToLines:
         result = "\n".join(lines)
         count = len(lines)
         
-        return (result, count)
+        return (result, count, TextList(lines))
 
 
 class TextFromLines:
@@ -51,6 +82,9 @@ class TextFromLines:
                 "lines": ("STRING", {"default": "", "multiline": True}),
                 "separator": ("STRING", {"default": "\n"}),
                 "add_numbering": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
             }
         }
     
@@ -58,8 +92,9 @@ class TextFromLines:
     FUNCTION = "from_lines"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def from_lines(self, lines, separator, add_numbering):
-        line_list = lines.splitlines()
+    @memoize
+    def from_lines(self, lines, separator, add_numbering, text_list=None):
+        line_list = input_lines(lines, text_list)
         
         if add_numbering:
             line_list = [f"{i+1}. {line}" for i, line in enumerate(line_list)]
@@ -68,6 +103,99 @@ class TextFromLines:
         return (result,)
 
 
+SORT_MODES = ["alphabetical", "reverse", "length", "random", "natural", "numeric", "casefold"]
+
+_DIGIT_RUNS = re.compile(r"(\d+)")
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def _natural_key(fold):
+    """Key splitting lines into text and digit runs, "file2" < "file10"
+    
+    re.split with a capturing group puts text at even and digits at odd
+    positions, so keys of different lines always compare str to str and
+    int to int.
+    """
+    split = _DIGIT_RUNS.split
+    
+    def key(line):
+        parts = split(fold(line) if fold else line)
+        parts[1::2] = map(int, parts[1::2])
+        return parts
+    return key
+
+
+def _numeric_key(reverse):
+    """Key on the first number in a line; lines without one sort last"""
+    search = _NUMBER.search
+    missing = float("-inf") if reverse else float("inf")
+    
+    def key(line):
+        match = search(line)
+        return float(match.group()) if match else missing
+    return key
+
+
+def _sort_key(mode, case_sensitive, descending=False):
+    """Return (key, reverse) for an ordering mode of TextSort
+    
+    Keys are functions of a single line, so list.sort, heapq.nsmallest and
+    the external merge all compute them once per line.
+    """
+    reverse = (mode == "reverse") != descending
+    if mode == "length":
+        key = len
+    elif mode == "natural":
+        key = _natural_key(None if case_sensitive else str.lower)
+    elif mode == "numeric":
+        key = _numeric_key(reverse)
+    elif mode == "casefold":
+        key = str.casefold
+    else:
+        key = None if case_sensitive else str.lower
+    return key, reverse
+
+
+def _sort_lines(lines, mode, case_sensitive, descending=False, limit=0):
+    """Drop blank lines and sort the rest as TextSort does
+    
+    With a limit only the first limit lines of the order are kept, picked
+    with a heap in O(n log limit) time and O(limit) memory.
+    """
+    lines = (line for line in lines if line.strip())
+    
+    if mode == "random":
+        lines = list(lines)
+        if limit > 0:
+            return random.sample(lines, min(limit, len(lines)))
+        random.shuffle(lines)
+        return lines
+    
+    key, reverse = _sort_key(mode, case_sensitive, descending)
+    if limit > 0:
+        # Same result and tie order as sorted(...)[:limit]
+        pick = heapq.nlargest if reverse else heapq.nsmallest
+        return pick(limit, lines, key=key)
+    
+    lines = list(lines)
+    lines.sort(key=key, reverse=reverse)
+    return lines
+
+
+def _sort_large(lines, mode, case_sensitive, descending, progress):
+    """_sort_lines for a large list with progress and interruption
+    
+    The blank filter and the sort run as the same single passes as for a
+    small input; the interrupt is checked and the bar moved between them.
+    """
+    kept = [line for line in lines if line.strip()]
+    progress.advance(len(lines))
+    key, reverse = _sort_key(mode, case_sensitive, descending)
+    kept.sort(key=key, reverse=reverse)
+    progress.advance(progress.total)
+    return kept
+
+
 class TextSort:
     """排序文本行 / Sort text lines"""
     
@@ -76,38 +204,63 @@ class TextSort:
         return {
             "required": {
                 "text": ("STRING", {"default": "", "multiline": True}),
-                "mode": (["alphabetical", "reverse", "length", "random"], {"default": "alphabetical"}),
+                "mode": (SORT_MODES, {"default": "alphabetical"}),
                 "case_sensitive": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
+                # 0 sorts in memory; otherwise runs above this size spill to disk
+                "max_memory_mb": ("INT", {"default": 0, "min": 0, "max": 65536}),
+                # 0 keeps every line; otherwise only the first N of the order
+                "limit": ("INT", {"default": 0, "min": 0, "max": 100000000}),
+                "descending": ("BOOLEAN", {"default": False}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", TEXT_LIST, "STRING")
+    RETURN_NAMES = ("result", "text_list", "info")
     FUNCTION = "sort_text"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def sort_text(self, text, mode, case_sensitive):
-        lines = [line for line in text.splitlines() if line.strip()]
+    @memoize(skip=lambda args: args["mode"] == "random")
+    def sort_text(self, text, mode, case_sensitive, text_list=None, max_memory_mb=0, limit=0,
+                  descending=False):
+        lines = input_lines(text, text_list)
         
-        if mode == "alphabetical":
-            if case_sensitive:
-                lines.sort()
-            else:
-                lines.sort(key=str.lower)
+        if limit > 0:
+            # A top-k heap never holds more than limit lines, so no spilling
+            lines = _sort_lines(lines, mode, case_sensitive, descending, limit)
+            result, sorted_list = output_lines(lines, text_list)
+            return (result, sorted_list, f"partial sort: top {len(lines)} lines (limit {limit})")
         
-        elif mode == "reverse":
-            if case_sensitive:
-                lines.sort(reverse=True)
+        # Large list inputs are sorted with progress and interruption checks
+        large = not is_stream(lines) and len(lines) > CHUNK_LINES
+        if max_memory_mb <= 0 or mode == "random":
+            if large and mode != "random":
+                # The filter pass, then the sort counted as a second
+                progress = Progress(len(lines) * 2)
+                lines = _sort_large(lines, mode, case_sensitive, descending, progress)
             else:
-                lines.sort(key=str.lower, reverse=True)
+                lines = _sort_lines(lines, mode, case_sensitive, descending)
+            result, sorted_list = output_lines(lines, text_list)
+            return (result, sorted_list, f"in-memory sort: {len(lines)} lines")
         
-        elif mode == "length":
-            lines.sort(key=len)
+        from .external_sort import external_sort
         
-        elif mode == "random":
-            random.shuffle(lines)
+        key, reverse = _sort_key(mode, case_sensitive, descending)
+        non_blank = (line for line in lines if line.strip())
+        progress = Progress(len(lines)) if large else None
+        lines, runs = external_sort(non_blank, key, reverse, max_memory_mb * 1024 * 1024, progress)
         
-        result = "\n".join(lines)
-        return (result,)
+        if not runs:
+            result, sorted_list = output_lines(lines, text_list)
+            return (result, sorted_list, f"in-memory sort: {len(lines)} lines "
+                                         f"(within {max_memory_mb} MB ceiling)")
+        
+        # Spilled: the merged runs are passed on lazily as a LineStream and
+        # never joined, even for a STRING input, or the ceiling would not hold
+        return ("", lines, f"external sort: {runs} runs merged "
+                           f"(memory ceiling {max_memory_mb} MB), streamed to text_list")
 
 
 class TextUnique:
@@ -120,40 +273,182 @@ class TextUnique:
                 "text": ("STRING", {"default": "", "multiline": True}),
                 "case_sensitive": ("BOOLEAN", {"default": True}),
                 "preserve_order": ("BOOLEAN", {"default": True}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
+                # digest keeps 64-bit hashes only; bloom uses a fixed-size bit array
+                "dedup_mode": (DEDUP_MODES, {"default": "exact"}),
+                "false_positive_rate": ("FLOAT", {"default": 0.001, "min": 0.000001, "max": 0.5, "step": 0.0001}),
+                "expected_lines": ("INT", {"default": 1000000, "min": 1, "max": 2147483647}),
             }
         }
     
-    RETURN_TYPES = ("STRING", "INT", "INT")
-    RETURN_NAMES = ("result", "original_count", "unique_count")
+    RETURN_TYPES = ("STRING", "INT", "INT", TEXT_LIST, "STRING")
+    RETURN_NAMES = ("result", "original_count", "unique_count", "text_list", "info")
     FUNCTION = "unique_lines"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def unique_lines(self, text, case_sensitive, preserve_order):
-        lines = text.splitlines()
+    @memoize
+    def unique_lines(self, text, case_sensitive, preserve_order, text_list=None,
+                     dedup_mode="exact", false_positive_rate=0.001, expected_lines=1000000):
+        seen_options = (dedup_mode, case_sensitive, expected_lines, false_positive_rate)
+        lines = input_lines(text, text_list)
+        if is_stream(lines):
+            # Counts are unknown until a downstream node consumes the stream
+            stream = lines.pipe(functools.partial(_unique_stage, *seen_options))
+            return ("", -1, -1, stream, f"{dedup_mode}: streaming")
         original_count = len(lines)
+        progress = progress_for(original_count, CHUNK_LINES)
         
-        if preserve_order:
-            seen = set()
-            unique_lines = []
-            for line in lines:
-                check_line = line if case_sensitive else line.lower()
-                if check_line not in seen:
-                    seen.add(check_line)
-                    unique_lines.append(line)
-        else:
+        if dedup_mode == "exact" and not preserve_order:
             if case_sensitive:
-                unique_lines = list(set(lines))
+                seen = set()
+                for chunk in chunks(lines, progress):
+                    seen.update(chunk)
+                unique_lines = list(seen)
             else:
                 seen = {}
-                for line in lines:
-                    if line.lower() not in seen:
-                        seen[line.lower()] = line
+                for chunk in chunks(lines, progress):
+                    for line in chunk:
+                        seen.setdefault(line.lower(), line)
                 unique_lines = list(seen.values())
+            info = f"exact: {len(unique_lines)} keys"
+        elif dedup_mode == "exact":
+            # The set test stays inline; a call per line would cost more than it
+            seen = set()
+            unique_lines = []
+            for chunk in chunks(lines, progress):
+                for line in chunk:
+                    check_line = line if case_sensitive else line.lower()
+                    if check_line not in seen:
+                        seen.add(check_line)
+                        unique_lines.append(line)
+            info = f"exact: {len(seen)} keys"
+        else:
+            # Digest and bloom modes always keep the first occurrence in order
+            seen = make_seen(*seen_options)
+            unique_lines = []
+            for chunk in chunks(lines, progress):
+                unique_lines += filter(seen.is_new, chunk)
+            info = seen.describe()
         
-        result = "\n".join(unique_lines)
+        result, unique_list = output_lines(unique_lines, text_list)
         unique_count = len(unique_lines)
         
-        return (result, original_count, unique_count)
+        return (result, original_count, unique_count, unique_list, info)
+
+
+class TextNearDedup:
+    """近似去重文本行 / Remove near-duplicate lines
+    
+    Lines whose shingle sets have an estimated Jaccard similarity of at
+    least threshold to an earlier cluster's first line join that cluster
+    (MinHash + LSH, see near_dedup). The first line of each cluster is kept;
+    cluster_ids gives the cluster of every input line.
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"default": "", "multiline": True}),
+                "threshold": ("FLOAT", {"default": 0.7, "min": 0.05, "max": 1.0, "step": 0.01}),
+                # words ignores word order; chars also catches typos
+                "shingle_mode": (SHINGLE_MODES, {"default": "words"}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
+                "num_perm": ("INT", {"default": 128, "min": 16, "max": 512, "step": 16}),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING", "INT", "INT", TEXT_LIST, "STRING", "STRING")
+    RETURN_NAMES = ("result", "original_count", "cluster_count", "text_list", "cluster_ids", "info")
+    FUNCTION = "near_dedup"
+    CATEGORY = "HAIGC/Text/Transform"
+    
+    @memoize
+    def near_dedup(self, text, threshold, shingle_mode, text_list=None, num_perm=128):
+        lines = input_lines(text, text_list)
+        if is_stream(lines):
+            stream = lines.pipe(functools.partial(_near_dedup_stage, threshold, num_perm, shingle_mode))
+            return ("", -1, -1, stream, "", "near: streaming")
+        
+        near = NearDuplicates(threshold, num_perm, shingle_mode)
+        cluster_ids = []
+        for chunk in chunks(lines, progress_for(len(lines), CHUNK_LINES)):
+            cluster_ids += near.assign(chunk)
+        
+        result, unique_list = output_lines(near.representatives, text_list)
+        return (result, len(lines), len(near.representatives), unique_list,
+                "\n".join(map(str, cluster_ids)), near.describe())
+
+
+def _near_dedup_stage(threshold, num_perm, shingle_mode, lines):
+    near = NearDuplicates(threshold, num_perm, shingle_mode)
+    while True:
+        batch = list(itertools.islice(lines, CHUNK_LINES))
+        if not batch:
+            return
+        # A line that opens a new cluster is its representative
+        known = len(near.representatives)
+        near.assign(batch)
+        yield from near.representatives[known:]
+
+
+def _line_filter(mode, filter_value, length=0):
+    """Resolve a TextFilter mode to a per-line predicate once per call
+
+    Raises re.error for an invalid regex_match pattern.
+    """
+    if mode == "contains":
+        return lambda line: filter_value in line
+    elif mode == "not_contains":
+        return lambda line: filter_value not in line
+    elif mode == "starts_with":
+        return lambda line: line.startswith(filter_value)
+    elif mode == "ends_with":
+        return lambda line: line.endswith(filter_value)
+    elif mode == "regex_match":
+        return compile_regex(filter_value).search
+    elif mode == "min_length":
+        return lambda line: len(line) >= length
+    elif mode == "max_length":
+        return lambda line: len(line) <= length
+    elif mode in _FUZZY_MODES:
+        pattern = compile_fuzzy(filter_value, length, *_FUZZY_MODES[mode])
+        return lambda line: pattern.distance(line) is not None
+    raise ValueError(f"Unknown filter mode: {mode}")
+
+
+def _chunk_filter(mode, filter_value, length, keep):
+    """A list -> kept lines function for TextFilter's in-memory path
+    
+    The plain modes test each line inline in a list comprehension, as the
+    node's original loop did, instead of calling keep once per line.
+    """
+    if mode == "contains":
+        return lambda chunk: [line for line in chunk if filter_value in line]
+    elif mode == "not_contains":
+        return lambda chunk: [line for line in chunk if filter_value not in line]
+    elif mode == "min_length":
+        return lambda chunk: [line for line in chunk if len(line) >= length]
+    elif mode == "max_length":
+        return lambda chunk: [line for line in chunk if len(line) <= length]
+    return lambda chunk: list(filter(keep, chunk))
+
+
+def _keep_none(line):
+    return False
+
+
+# Fuzzy filter modes: (transpositions, substring); length is the maximum distance
+_FUZZY_MODES = {
+    "fuzzy": (False, False),
+    "fuzzy_contains": (False, True),
+    "fuzzy_damerau": (True, False),
+    "fuzzy_contains_damerau": (True, True),
+}
 
 
 class TextFilter:
@@ -165,60 +460,155 @@ class TextFilter:
             "required": {
                 "text": ("STRING", {"default": "", "multiline": True}),
                 "mode": (["contains", "not_contains", "starts_with", "ends_with", 
-                         "regex_match", "min_length", "max_length"], {"default": "contains"}),
+                         "regex_match", "min_length", "max_length",
+                         *_FUZZY_MODES], {"default": "contains"}),
                 "filter_value": ("STRING", {"default": ""}),
             },
             "optional": {
+                # Also the maximum edit distance of the fuzzy modes
                 "length": ("INT", {"default": 0, "min": 0, "max": 9999}),
+                "text_list": (TEXT_LIST,),
+                # >0 runs regex_match in a worker process with this budget;
+                # not for streamed input, where a timeout would surface downstream
+                "timeout_ms": ("INT", {"default": 0, "min": 0, "max": 600000}),
             }
         }
     
-    RETURN_TYPES = ("STRING", "INT")
-    RETURN_NAMES = ("result", "count")
+    RETURN_TYPES = ("STRING", "INT", TEXT_LIST, "STRING")
+    RETURN_NAMES = ("result", "count", "text_list", "distances")
     FUNCTION = "filter_lines"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def filter_lines(self, text, mode, filter_value, length=0):
-        import re
-        lines = text.splitlines()
-        filtered = []
+    @memoize
+    def filter_lines(self, text, mode, filter_value, length=0, text_list=None, timeout_ms=0):
+        guarded = mode == "regex_match" and timeout_ms > 0
+        # An invalid pattern is reported once instead of per line
+        try:
+            keep = _line_filter(mode, filter_value, length)
+            if guarded:
+                check_pattern(filter_value)
+        except re.error as e:
+            return (f"Regex Error: {str(e)}", 0, TextList(), "")
+        except ValueError:
+            # An unknown mode keeps no lines, as the node always has
+            keep = _keep_none
         
-        for line in lines:
-            if mode == "contains":
-                if filter_value in line:
-                    filtered.append(line)
-            
-            elif mode == "not_contains":
-                if filter_value not in line:
-                    filtered.append(line)
-            
-            elif mode == "starts_with":
-                if line.startswith(filter_value):
-                    filtered.append(line)
-            
-            elif mode == "ends_with":
-                if line.endswith(filter_value):
-                    filtered.append(line)
-            
-            elif mode == "regex_match":
-                try:
-                    if re.search(filter_value, line):
-                        filtered.append(line)
-                except re.error:
-                    pass
-            
-            elif mode == "min_length":
-                if len(line) >= length:
-                    filtered.append(line)
-            
-            elif mode == "max_length":
-                if len(line) <= length:
-                    filtered.append(line)
+        lines = input_lines(text, text_list)
+        if is_stream(lines):
+            if guarded:
+                return ("Regex Error: timeout_ms is not supported for streamed input, set it to 0",
+                        0, TextList(), "")
+            return ("", -1, lines.pipe(functools.partial(filter, keep)), "")
+        distances = ""
+        if guarded:
+            try:
+                mask = run_regex(filter_value, 0, "search_mask", list(lines), timeout_ms=timeout_ms)
+            except RegexTimeout as e:
+                return (f"Regex Timeout: {str(e)}", 0, TextList(), "")
+            filtered = list(itertools.compress(lines, mask))
+        elif mode in _FUZZY_MODES:
+            filtered, found = _fuzzy_filter(lines, filter_value, length, *_FUZZY_MODES[mode])
+            # One distance per kept line, in the same order
+            distances = "\n".join(map(str, found))
+        else:
+            filtered = _parallel_regex_filter(lines, filter_value) if mode == "regex_match" else None
+            if filtered is None:
+                select = _chunk_filter(mode, filter_value, length, keep)
+                filtered = []
+                for chunk in chunks(lines, progress_for(len(lines), CHUNK_LINES)):
+                    filtered += select(chunk)
         
-        result = "\n".join(filtered)
+        result, filtered_list = output_lines(filtered, text_list)
         count = len(filtered)
         
-        return (result, count)
+        return (result, count, filtered_list, distances)
+
+
+def _regex_match_mask(lines, pattern):
+    """Worker side of the regex_match filter: one 0/1 byte per line"""
+    search = compile_regex(pattern).search
+    return bytes(search(line) is not None for line in lines)
+
+
+def _parallel_regex_filter(lines, pattern):
+    """Filter lines in the process pool, or None if they are below its threshold"""
+    if not backend.enabled:
+        return None
+    size = sum(map(len, lines))
+    if not backend.should_split(size):
+        return None
+    # Only the keep/drop mask comes back from the workers, not the lines
+    chunks = split_list(lines, backend.chunk_count(size))
+    masks = backend.map_chunks(_regex_match_mask, chunks, pattern)
+    return [line for chunk, mask in zip(chunks, masks) for line in itertools.compress(chunk, mask)]
+
+
+def _fuzzy_match_chunk(lines, pattern, max_distance, transpositions, substring):
+    """Worker side of the fuzzy filters: a 0/1 byte per line and the kept distances"""
+    fuzzy = compile_fuzzy(pattern, max_distance, transpositions, substring)
+    mask = bytearray(len(lines))
+    distances = []
+    for i, line in enumerate(lines):
+        found = fuzzy.distance(line)
+        if found is not None:
+            mask[i] = 1
+            distances.append(found)
+    return bytes(mask), distances
+
+
+def _fuzzy_filter(lines, pattern, max_distance, transpositions, substring):
+    """Return (kept lines, their edit distances), in the pool for large inputs"""
+    if backend.enabled:
+        size = sum(map(len, lines))
+        if backend.should_split(size):
+            parts = split_list(lines, backend.chunk_count(size))
+            results = backend.map_chunks(_fuzzy_match_chunk, parts, pattern, max_distance,
+                                         transpositions, substring)
+            filtered = []
+            distances = []
+            for part, (mask, found) in zip(parts, results):
+                filtered += itertools.compress(part, mask)
+                distances += found
+            return filtered, distances
+    fuzzy = compile_fuzzy(pattern, max_distance, transpositions, substring)
+    filtered = []
+    distances = []
+    for chunk in chunks(lines, progress_for(len(lines), CHUNK_LINES)):
+        kept, found = fuzzy.match_lines(chunk)
+        filtered += kept
+        distances += found
+    return filtered, distances
+
+
+def _line_mapper(operation, value, value2=""):
+    """Resolve a TextMap operation to a (line_number, line) transform once per call"""
+    if operation == "add_prefix":
+        return lambda i, line: value + line
+    
+    elif operation == "add_suffix":
+        return lambda i, line: line + value
+    
+    elif operation == "wrap":
+        suffix = value2 if value2 else value
+        return lambda i, line: value + line + suffix
+    
+    elif operation == "quote":
+        quote_char = value if value else '"'
+        return lambda i, line: f"{quote_char}{line}{quote_char}"
+    
+    elif operation == "number":
+        separator = value if value else ". "
+        return lambda i, line: f"{i}{separator}{line}"
+    
+    elif operation == "bullet":
+        bullet = value if value else "• "
+        return lambda i, line: bullet + line
+    
+    elif operation == "indent":
+        indent = value if value else "    "
+        return lambda i, line: indent + line
+    
+    raise ValueError(f"Unknown map operation: {operation}")
 
 
 class TextMap:
@@ -235,50 +625,183 @@ class TextMap:
             },
             "optional": {
                 "value2": ("STRING", {"default": ""}),
+                "text_list": (TEXT_LIST,),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", TEXT_LIST)
+    RETURN_NAMES = ("result", "text_list")
     FUNCTION = "map_lines"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def map_lines(self, text, operation, value, value2=""):
-        lines = text.splitlines()
-        result_lines = []
+    @memoize
+    def map_lines(self, text, operation, value, value2="", text_list=None):
+        transform = _line_mapper(operation, value, value2)
+        lines = input_lines(text, text_list)
+        if is_stream(lines):
+            return ("", lines.pipe(functools.partial(_map_stage, transform)))
+        result_lines = [transform(i, line) for i, line in enumerate(lines, 1)]
         
-        for i, line in enumerate(lines, 1):
-            if operation == "add_prefix":
-                result_lines.append(value + line)
-            
-            elif operation == "add_suffix":
-                result_lines.append(line + value)
-            
-            elif operation == "wrap":
-                suffix = value2 if value2 else value
-                result_lines.append(value + line + suffix)
-            
-            elif operation == "quote":
-                quote_char = value if value else '"'
-                result_lines.append(f"{quote_char}{line}{quote_char}")
-            
-            elif operation == "number":
-                separator = value if value else ". "
-                result_lines.append(f"{i}{separator}{line}")
-            
-            elif operation == "bullet":
-                bullet = value if value else "• "
-                result_lines.append(bullet + line)
-            
-            elif operation == "indent":
-                indent = value if value else "    "
-                result_lines.append(indent + line)
+        return output_lines(result_lines, text_list)
+
+
+def _map_stage(transform, lines):
+    return (transform(i, line) for i, line in enumerate(lines, 1))
+
+
+def _unique_stage(dedup_mode, case_sensitive, expected_lines, false_positive_rate, lines):
+    if dedup_mode == "exact":
+        return exact_unique(lines, case_sensitive)
+    seen = make_seen(dedup_mode, case_sensitive, expected_lines, false_positive_rate)
+    return filter(seen.is_new, lines)
+
+
+def _sort_stage(mode, case_sensitive, descending, limit, lines):
+    return iter(_sort_lines(lines, mode, case_sensitive, descending, limit))
+
+
+def _run_stages(stages, lines):
+    for stage in stages:
+        lines = stage(lines)
+    return lines
+
+
+_PARAM_TYPES = {str: "a string", bool: "true or false", int: "an integer", float: "a number"}
+
+
+def _step_param(step, name, default):
+    """A step parameter, checked against the type of its default"""
+    value = step.get(name, default)
+    expected = type(default)
+    if expected is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif expected is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    else:
+        valid = isinstance(value, expected)
+    if not valid:
+        raise ValueError(f"{step.get('op')} step: {name} must be {_PARAM_TYPES[expected]}, got {value!r}")
+    return value
+
+
+def _compile_pipeline(steps):
+    """Turn pipeline steps into a list of iterator -> iterator stages"""
+    if not isinstance(steps, list):
+        raise ValueError("steps must be a JSON list")
+    
+    stages = []
+    for step in steps:
+        if not isinstance(step, dict):
+            raise ValueError(f"Invalid step: {step!r}")
+        op = step.get("op")
         
-        result = "\n".join(result_lines)
-        return (result,)
+        if op == "filter":
+            keep = _line_filter(_step_param(step, "mode", "contains"),
+                                _step_param(step, "filter_value", ""),
+                                _step_param(step, "length", 0))
+            stages.append(functools.partial(filter, keep))
+        
+        elif op == "map":
+            transform = _line_mapper(_step_param(step, "operation", "add_prefix"),
+                                     _step_param(step, "value", ""),
+                                     _step_param(step, "value2", ""))
+            stages.append(functools.partial(_map_stage, transform))
+        
+        elif op == "unique":
+            dedup_mode = _step_param(step, "dedup_mode", "exact")
+            if dedup_mode not in DEDUP_MODES:
+                raise ValueError(f"Unknown dedup mode: {dedup_mode}")
+            stages.append(functools.partial(_unique_stage, dedup_mode,
+                                            _step_param(step, "case_sensitive", True),
+                                            _step_param(step, "expected_lines", 1000000),
+                                            _step_param(step, "false_positive_rate", 0.001)))
+        
+        elif op == "sort":
+            mode = _step_param(step, "mode", "alphabetical")
+            if mode not in SORT_MODES:
+                raise ValueError(f"Unknown sort mode: {mode}")
+            stages.append(functools.partial(_sort_stage, mode,
+                                            _step_param(step, "case_sensitive", False),
+                                            _step_param(step, "descending", False),
+                                            _step_param(step, "limit", 0)))
+        
+        else:
+            raise ValueError(f"Unknown pipeline op: {op}")
+    
+    return stages
+
+
+_DEFAULT_PIPELINE_STEPS = """[
+  {"op": "filter", "mode": "min_length", "length": 1},
+  {"op": "map", "operation": "add_prefix", "value": ""},
+  {"op": "unique", "case_sensitive": true},
+  {"op": "sort", "mode": "alphabetical", "case_sensitive": false}
+]"""
+
+
+class TextPipeline:
+    """单次扫描行流水线 / Fused single-pass line pipeline
+    
+    Steps are a JSON list of filter / map / unique / sort operations whose
+    parameters use the input names of TextFilter, TextMap, TextUnique and
+    TextSort. Each mode is resolved once; filter, map and unique stream line
+    by line and only a sort step collects the lines it has to order. Unique
+    steps always keep the first occurrence of each line.
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"default": "", "multiline": True}),
+                "steps": ("STRING", {"default": _DEFAULT_PIPELINE_STEPS, "multiline": True}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING", "INT", TEXT_LIST)
+    RETURN_NAMES = ("result", "count", "text_list")
+    FUNCTION = "run_pipeline"
+    CATEGORY = "HAIGC/Text/Transform"
+    
+    @memoize(skip=lambda args: "random" in args["steps"])
+    def run_pipeline(self, text, steps, text_list=None):
+        try:
+            stages = _compile_pipeline(json.loads(steps))
+        except (ValueError, re.error) as e:
+            return (f"Pipeline Error: {str(e)}", 0, TextList())
+        
+        lines = input_lines(text, text_list)
+        if is_stream(lines):
+            return ("", -1, lines.pipe(functools.partial(_run_stages, stages)))
+        lines = list(_run_stages(stages, iter(lines)))
+        
+        result, line_list = output_lines(lines, text_list)
+        return (result, len(lines), line_list)
+
+
+def _write_chunks(path, chunks):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return path
+
+
+def _uses_files(args):
+    return bool(args["input_file"] or args["output_file"])
 
 
 class TextEncodeBase64:
-    """Base64编码 / Base64 encode"""
+    """Base64编码 / Base64 encode
+    
+    Works in fixed-size chunks. With input_file / output_file the payload is
+    streamed file to file and never held in memory whole.
+    """
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -286,23 +809,46 @@ class TextEncodeBase64:
             "required": {
                 "text": ("STRING", {"default": "", "multiline": True}),
                 "encoding": (["utf-8", "ascii", "latin-1"], {"default": "utf-8"}),
+            },
+            "optional": {
+                "variant": (BASE64_VARIANTS, {"default": "standard"}),
+                "input_file": ("STRING", {"default": ""}),
+                "output_file": ("STRING", {"default": ""}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("result", "path")
     FUNCTION = "encode"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def encode(self, text, encoding):
+    @classmethod
+    def IS_CHANGED(cls, input_file=None, **kwargs):
+        return file_signature(input_file)
+    
+    @memoize(skip=_uses_files)
+    def encode(self, text, encoding, variant="standard", input_file="", output_file=""):
         try:
-            encoded = base64.b64encode(text.encode(encoding)).decode('ascii')
-            return (encoded,)
+            if input_file:
+                chunks = iter_file_chunks(resolve_path(input_file))
+            else:
+                chunks = iter_text_chunks(text, encoding)
+            encoded = encode_chunks(chunks, variant)
+            
+            if output_file:
+                return ("", _write_chunks(resolve_path(output_file, output=True), encoded))
+            return ("".join(chunk.decode('ascii') for chunk in encoded), "")
         except Exception as e:
-            return (f"Encoding Error: {str(e)}",)
+            return (f"Encoding Error: {str(e)}", "")
 
 
 class TextDecodeBase64:
-    """Base64解码 / Base64 decode"""
+    """Base64解码 / Base64 decode
+    
+    Works in fixed-size chunks; characters outside the base64 alphabet are
+    skipped as before. With output_file the raw bytes are written as-is and
+    encoding is not applied.
+    """
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -310,61 +856,257 @@ class TextDecodeBase64:
             "required": {
                 "text": ("STRING", {"default": ""}),
                 "encoding": (["utf-8", "ascii", "latin-1"], {"default": "utf-8"}),
+            },
+            "optional": {
+                "variant": (BASE64_VARIANTS, {"default": "standard"}),
+                "input_file": ("STRING", {"default": ""}),
+                "output_file": ("STRING", {"default": ""}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("result", "path")
     FUNCTION = "decode"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def decode(self, text, encoding):
+    @classmethod
+    def IS_CHANGED(cls, input_file=None, **kwargs):
+        return file_signature(input_file)
+    
+    @memoize(skip=_uses_files)
+    def decode(self, text, encoding, variant="standard", input_file="", output_file=""):
         try:
-            decoded = base64.b64decode(text).decode(encoding)
-            return (decoded,)
+            if input_file:
+                chunks = iter_file_chunks(resolve_path(input_file))
+            else:
+                chunks = iter_text_chunks(text, 'ascii')
+            decoded = decode_chunks(chunks, variant)
+            
+            if output_file:
+                return ("", _write_chunks(resolve_path(output_file, output=True), decoded))
+            return (decode_text(decoded, encoding), "")
         except Exception as e:
-            return (f"Decoding Error: {str(e)}",)
+            return (f"Decoding Error: {str(e)}", "")
+
+
+# crc32 is a 32-bit checksum, not a dedup key: n distinct lines collide about
+# n^2 / 2^33 times (~116 for a million). blake2b_64 is the 64-bit key that is
+# always available; xxh64 / xxh3_64 are faster when xxhash is installed.
+HASH_ALGORITHMS = ["md5", "sha1", "sha256", "sha512", "blake2b", "blake2s", "blake2b_64", "crc32"]
+if _HAS_XXHASH:
+    HASH_ALGORITHMS += ["xxh64", "xxh3_64"]
+
+# Characters encoded / bytes read per update when hashing large inputs
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Lines per task handed to the hashing thread pool
+_HASH_BATCH_LINES = 4096
+
+_hash_executor = None
+_hash_executor_size = 0
+_hash_executor_lock = threading.Lock()
+
+
+class _Crc32:
+    """crc32 with the hashlib update()/digest() interface
+    
+    A fast checksum for detecting corruption; at 32 bits it is too short to
+    tell a large set of lines apart.
+    """
+    
+    def __init__(self, data=b""):
+        self.value = zlib.crc32(data)
+    
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+    
+    def digest(self):
+        return self.value.to_bytes(4, "big")
+
+
+def _hasher_factory(algorithm, digest_size=0):
+    """Return a constructor taking optional initial data, like hashlib.sha256"""
+    if algorithm == "crc32":
+        return _Crc32
+    if algorithm == "blake2b_64":
+        return functools.partial(hashlib.blake2b, digest_size=8)
+    if algorithm.startswith("xxh"):
+        if not _HAS_XXHASH:
+            raise ValueError(f"{algorithm} requires the xxhash package")
+        import xxhash
+        return getattr(xxhash, algorithm)
+    if algorithm in ("blake2b", "blake2s") and digest_size > 0:
+        return functools.partial(getattr(hashlib, algorithm), digest_size=digest_size)
+    return getattr(hashlib, algorithm)
+
+
+def _digest_formatter(output_format):
+    if output_format == "hex":
+        return bytes.hex
+    return lambda digest: base64.b64encode(digest).decode('ascii')
+
+
+def _get_hash_executor(threads):
+    global _hash_executor, _hash_executor_size
+    with _hash_executor_lock:
+        if _hash_executor_size < threads:
+            from concurrent.futures import ThreadPoolExecutor
+            
+            # A smaller pool is dropped, not shut down: lazy streams may still
+            # submit to it, and its threads exit once it is garbage collected
+            _hash_executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="haigc_hash")
+            _hash_executor_size = threads
+        return _hash_executor
+
+
+def _digest_batch(new_hasher, formatter, lines):
+    return [formatter(new_hasher(line.encode('utf-8')).digest()) for line in lines]
+
+
+def _hash_lines(lines, new_hasher, formatter, threads):
+    """Yield one formatted digest per line, in order
+
+    With threads > 1 batches of lines are hashed on a shared pool, keeping
+    at most two batches per thread in flight. hashlib only releases the GIL
+    for buffers over 2 KB, so this pays off for long lines; short lines are
+    best hashed with threads=1 and a short digest such as blake2b_64/xxh64.
+    """
+    digest_batch = functools.partial(_digest_batch, new_hasher, formatter)
+    iterator = iter(lines)
+    
+    if threads <= 1:
+        while True:
+            batch = list(itertools.islice(iterator, _HASH_BATCH_LINES))
+            if not batch:
+                return
+            yield from digest_batch(batch)
+    
+    executor = _get_hash_executor(threads)
+    pending = deque()
+    while True:
+        batch = list(itertools.islice(iterator, _HASH_BATCH_LINES))
+        if batch:
+            pending.append(executor.submit(digest_batch, batch))
+        if pending and (not batch or len(pending) >= threads * 2):
+            yield from pending.popleft().result()
+        elif not batch:
+            return
 
 
 class TextHash:
-    """文本哈希 / Text hash"""
+    """文本哈希 / Text hash
+    
+    Hashes the text, a TEXT_LIST (as if joined with "\\n") or a file read in
+    chunks. per_line mode returns one digest per line instead.
+    """
     
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "text": ("STRING", {"default": "", "multiline": True}),
-                "algorithm": (["md5", "sha1", "sha256", "sha512"], {"default": "sha256"}),
+                "algorithm": (HASH_ALGORITHMS, {"default": "sha256"}),
                 "output_format": (["hex", "base64"], {"default": "hex"}),
+            },
+            "optional": {
+                "text_list": (TEXT_LIST,),
+                "mode": (["whole", "per_line"], {"default": "whole"}),
+                "file_path": ("STRING", {"default": ""}),
+                # blake2b: 1-64 bytes, blake2s: 1-32 bytes; 0 uses the full size
+                "digest_size": ("INT", {"default": 0, "min": 0, "max": 64}),
+                "threads": ("INT", {"default": 1, "min": 1, "max": 256}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", TEXT_LIST, "INT")
+    RETURN_NAMES = ("hash", "text_list", "count")
     FUNCTION = "hash_text"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def hash_text(self, text, algorithm, output_format):
+    @classmethod
+    def IS_CHANGED(cls, file_path=None, **kwargs):
+        # Only file inputs can change unseen
+        return file_signature(file_path)
+    
+    @memoize(skip=lambda args: bool(args["file_path"]))
+    def hash_text(self, text, algorithm, output_format, text_list=None,
+                  mode="whole", file_path="", digest_size=0, threads=1):
         try:
-            if algorithm == "md5":
-                h = hashlib.md5(text.encode('utf-8'))
-            elif algorithm == "sha1":
-                h = hashlib.sha1(text.encode('utf-8'))
-            elif algorithm == "sha256":
-                h = hashlib.sha256(text.encode('utf-8'))
-            elif algorithm == "sha512":
-                h = hashlib.sha512(text.encode('utf-8'))
+            new_hasher = _hasher_factory(algorithm, digest_size)
+            formatter = _digest_formatter(output_format)
+            
+            if file_path:
+                file_path = resolve_path(file_path)
+                if mode == "whole":
+                    return (formatter(self._hash_file(new_hasher, file_path)), TextList(), 1)
+                text_list = file_stream(file_path)
             
-            if output_format == "hex":
-                result = h.hexdigest()
+            if mode == "per_line":
+                lines = input_lines(text, text_list)
+                if is_stream(lines):
+                    stream = lines.pipe(lambda it: _hash_lines(it, new_hasher, formatter, threads))
+                    return ("", stream, -1)
+                digests = TextList(_hash_lines(lines, new_hasher, formatter, threads))
+                result = "" if text_list is not None else "\n".join(digests)
+                return (result, digests, len(digests))
+            
+            h = new_hasher()
+            if text_list is None:
+                # Encode in slices so a huge string is never copied whole
+                for start in range(0, len(text), _HASH_CHUNK_SIZE):
+                    h.update(text[start:start + _HASH_CHUNK_SIZE].encode('utf-8'))
             else:
-                result = base64.b64encode(h.digest()).decode('ascii')
+                # Same digest as the lines joined with "\n", fed one line at a time
+                separator = b""
+                for line in text_list:
+                    h.update(separator)
+                    h.update(line.encode('utf-8'))
+                    separator = b"\n"
             
-            return (result,)
+            return (formatter(h.digest()), TextList(), 1)
         except Exception as e:
-            return (f"Hash Error: {str(e)}",)
+            return (f"Hash Error: {str(e)}", TextList(), 0)
+    
+    def _hash_file(self, new_hasher, path):
+        h = new_hasher()
+        buffer = bytearray(_HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                h.update(view[:size])
+        return h.digest()
+
+
+def _random_chars(rng, chars, k):
+    """Return k characters drawn uniformly from chars
+    
+    Single-byte charsets map random bytes through bytes.translate, dropping
+    the bytes above the largest multiple of len(chars) so every character
+    stays equally likely; other charsets fall back to rng.choices.
+    """
+    size = len(chars)
+    if size > 256 or max(map(ord, chars)) > 255:
+        return ''.join(rng.choices(chars, k=k))
+    
+    limit = 256 - 256 % size
+    table = bytes(ord(chars[b % size]) for b in range(256))
+    rejected = bytes(range(limit, 256))
+    out = bytearray()
+    while len(out) < k:
+        need = k - len(out)
+        out += rng.randbytes(need + need // 4 + 16).translate(table, rejected)
+    return out[:k].decode('latin-1')
 
 
 class TextRandomString:
-    """生成随机字符串 / Generate random string"""
+    """生成随机字符串 / Generate random strings
+    
+    Each call uses its own generator, so the global random state is left
+    alone: random.Random(seed) when seeded, otherwise a freshly seeded
+    Random, or secrets.SystemRandom when secure is on.
+    """
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -377,16 +1119,25 @@ class TextRandomString:
             "optional": {
                 "custom_chars": ("STRING", {"default": ""}),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 999999}),
+                "count": ("INT", {"default": 1, "min": 1, "max": 10000000}),
+                # Only used without a seed; seeded output is reproducible by design
+                "secure": ("BOOLEAN", {"default": False}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", TEXT_LIST)
+    RETURN_NAMES = ("result", "text_list")
     FUNCTION = "generate"
     CATEGORY = "HAIGC/Text/Transform"
     
-    def generate(self, length, charset, custom_chars="", seed=0):
+    def generate(self, length, charset, custom_chars="", seed=0, count=1, secure=False):
         if seed > 0:
-            random.seed(seed)
+            rng = random.Random(seed)
+        elif secure:
+            import secrets
+            rng = secrets.SystemRandom()
+        else:
+            rng = random.Random()
         
         if charset == "alphanumeric":
             chars = string.ascii_letters + string.digits
@@ -403,10 +1154,85 @@ class TextRandomString:
         elif charset == "custom":
             chars = custom_chars if custom_chars else string.ascii_letters
         
-        result = ''.join(random.choice(chars) for _ in range(length))
+        # Draw characters in blocks of several strings and slice them apart
+        per_block = max(1, 65536 // length)
+        results = []
+        for start in range(0, count, per_block):
+            block_count = min(per_block, count - start)
+            block = _random_chars(rng, chars, length * block_count)
+            results.extend(block[i:i + length] for i in range(0, len(block), length))
         
-        # Reset random seed
-        if seed > 0:
-            random.seed()
+        return ("\n".join(results), TextList(results))
+
+
+class TextSample:
+    """采样文本行 / Sample lines
+    
+    One pass over the lines (or a streamed file) keeping only the sample:
+    reservoir picks k lines uniformly, weighted reads a trailing
+    "<separator><weight>" on each line (stripped from the output), and the
+    stratified modes keep up to k lines per stratum, keyed by the text
+    before the separator or by the pattern's first group (whole match if it
+    has none). Uses its own RNG; seed 0 draws a new sample every run.
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "text": ("STRING", {"default": "", "multiline": True}),
+                "mode": (["reservoir", "weighted", "stratified_prefix", "stratified_regex"],
+                         {"default": "reservoir"}),
+                "k": ("INT", {"default": 10, "min": 1, "max": 10000000}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 999999}),
+            },
+            "optional": {
+                "separator": ("STRING", {"default": "|"}),
+                "pattern": ("STRING", {"default": ""}),
+                "keep_order": ("BOOLEAN", {"default": True}),
+                "text_list": (TEXT_LIST,),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING", TEXT_LIST, "INT")
+    RETURN_NAMES = ("result", "text_list", "count")
+    FUNCTION = "sample_lines"
+    CATEGORY = "HAIGC/Text/Transform"
+    
+    @memoize(skip=lambda args: args["seed"] == 0)
+    def sample_lines(self, text, mode, k, seed, separator="|", pattern="",
+                     keep_order=True, text_list=None):
+        rng = random.Random(seed) if seed > 0 else random.Random()
+        lines = input_lines(text, text_list)
         
-        return (result,)
+        if mode == "reservoir":
+            sample = reservoir_sample(lines, k, rng)
+        elif mode == "weighted":
+            sample = weighted_sample((split_weight(line, separator) for line in lines), k, rng)
+        elif mode == "stratified_prefix":
+            keyed = ((line.split(separator, 1)[0] if separator else "", line) for line in lines)
+            sample = stratified_sample(keyed, k, rng)
+        elif mode == "stratified_regex":
+            try:
+                regex = compile_regex(pattern)
+            except re.error as e:
+                return (f"Regex Error: {str(e)}", TextList(), 0)
+            group = 1 if regex.groups else 0
+            keyed = ((_stratum(regex, group, line), line) for line in lines)
+            sample = stratified_sample(keyed, k, rng)
+        else:
+            raise ValueError(f"Unknown sample mode: {mode}")
+        
+        if keep_order:
+            sample.sort()
+        else:
+            rng.shuffle(sample)
+        
+        result_lines = TextList(line for _, line in sample)
+        result = "" if text_list is not None else "\n".join(result_lines)
+        return (result, result_lines, len(result_lines))
+
+
+def _stratum(regex, group, line):
+    match = regex.search(line)
+    return match.group(group) if match else ""